@@ -1,40 +1,90 @@
+import gc
+import threading
 from PySide6.QtCore import QThread, Signal
 import pandas as pd
+from progress import AnalysisCancelled
+
+# Доля шкалы прогресса на каждый этап: загрузка, построение графиков, запись отчета
+PROGRESS_STAGES = {
+    'load': (0, 40, "Загрузка данных"),
+    'figures': (40, 85, "Построение графиков"),
+    'report': (85, 100, "Генерация отчета"),
+}
 
 class AnalysisThread(QThread):
     update_progress = Signal(int)
     update_status = Signal(str)
     analysis_complete = Signal(object)
+    analysis_cancelled = Signal()
     error_occurred = Signal(str)
 
-    def __init__(self, file_path, options, filter_condition=None):
+    def __init__(self, file_path, options, filter_condition=None, streaming=False):
         super().__init__()
         self.file_path = file_path
         self.options = options
         self.filter_condition = filter_condition
+        self.streaming = streaming
+        self.cancel_event = threading.Event()
+        self._last_percent = -1
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def on_progress(self, stage, done, total):
+        start, end, label = PROGRESS_STAGES[stage]
+        percent = start + (end - start) * done // max(total, 1)
+        # Сигналы шлем только при смене процента, иначе чтение файла завалит очередь событий
+        if percent == self._last_percent:
+            return
+        self._last_percent = percent
+        self.update_progress.emit(percent)
+        if stage == 'load':
+            self.update_status.emit(f"{label}: {done / 1024 / 1024:.0f} из {total / 1024 / 1024:.0f} MB")
+        else:
+            self.update_status.emit(f"{label}: {done} из {total}")
 
     def run(self):
+        cancelled = False
         try:
             self.update_status.emit("Загрузка данных...")
-            self.update_progress.emit(10)
+            self.update_progress.emit(0)
 
             # Импорт здесь чтобы избежать циклических зависимостей
             from visualizer import UnifiedBrowserVisualizer
-            visualizer = UnifiedBrowserVisualizer(self.file_path)
+            if self.streaming:
+                # В потоковом режиме фильтр применяется к каждому блоку при чтении
+                visualizer = UnifiedBrowserVisualizer(self.file_path, streaming=True,
+                                                      stream_query=self.filter_condition,
+                                                      progress_callback=self.on_progress,
+                                                      cancel_event=self.cancel_event)
+            else:
+                # Parquet, Feather и JSONL тоже фильтруются при чтении
+                visualizer = UnifiedBrowserVisualizer(self.file_path, load=False, stream_query=self.filter_condition,
+                                                      progress_callback=self.on_progress,
+                                                      cancel_event=self.cancel_event)
+                # Читаем только столбцы, нужные выбранным графикам и фильтру
+                visualizer.columns = visualizer.plan_columns(self.options, self.filter_condition)
+                visualizer.load_data()
 
             self.update_status.emit("Обработка данных...")
-            self.update_progress.emit(30)
 
-            if self.filter_condition:
-                visualizer.data = visualizer.data.query(self.filter_condition)
+            if self.filter_condition and not self.streaming:
+                visualizer.apply_filter(self.filter_condition)
+            visualizer.progress.check()
 
             visualizer.process_data(self.options)
             self.update_status.emit("Генерация отчета...")
-            self.update_progress.emit(80)
 
             report_path = visualizer.generate_report()
             self.update_progress.emit(100)
             self.analysis_complete.emit(report_path)
 
+        except AnalysisCancelled:
+            cancelled = True
         except Exception as e:
-            self.error_occurred.emit(str(e))
\ No newline at end of file
+            self.error_occurred.emit(str(e))
+        if cancelled:
+            # Обрывки загрузки и графики держат только локальные ссылки этого метода
+            visualizer = None
+            gc.collect()
+            self.analysis_cancelled.emit()
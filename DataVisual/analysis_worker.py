@@ -0,0 +1,197 @@
+import gc
+import queue
+import threading
+from pathlib import Path
+from PySide6.QtCore import Signal
+from analysis_thread import AnalysisThread
+from dataset_cache import get_dataset_cache, file_fingerprint, file_version
+from columnar_readers import supports_pushdown
+from column_plan import plan_columns
+from progress import AnalysisCancelled
+from shared_frame import SharedFrame
+
+class AnalysisWorker(AnalysisThread):
+    # Долгоживущий поток: держит загруженный набор данных всю сессию и выполняет задания из очереди
+    job_finished = Signal(str)
+
+    def __init__(self):
+        super().__init__(None, {})
+        self.jobs = queue.Queue()
+        self.visualizer = None
+        self._source = None
+        self._columns = None
+        self._attached = []
+        self.busy = False
+        self._busy_lock = threading.Lock()
+        self._pending_runs = 0
+
+    def submit(self, kind, *args):
+        self.submit_run([(kind, args)])
+
+    def submit_run(self, jobs):
+        # Задания одного запуска ставятся в очередь одним элементом: поток не может освободиться
+        # между ними, и отмена или новый запуск не вклиниваются в середину
+        with self._busy_lock:
+            self._pending_runs += 1
+            self.busy = True
+        self.jobs.put(list(jobs))
+
+    def cancel(self):
+        # Отмена относится только к текущему запуску и не должна сорвать следующий
+        if self.busy:
+            super().cancel()
+
+    @staticmethod
+    def analysis_jobs(file_path, options, filter_condition=None, streaming=False, sheet_name=0):
+        jobs = [('load', (file_path, streaming, filter_condition, options, sheet_name))]
+        if not streaming:
+            jobs.append(('filter', (filter_condition,)))
+        jobs.append(('build', (options,)))
+        jobs.append(('report', ()))
+        return jobs
+
+    def submit_analysis(self, file_path, options, filter_condition=None, streaming=False, sheet_name=0):
+        self.submit_run(self.analysis_jobs(file_path, options, filter_condition, streaming, sheet_name))
+
+    def stop(self):
+        self.cancel_event.set()
+        self.jobs.put(None)
+        self.wait()
+
+    def run(self):
+        while True:
+            run_jobs = self.jobs.get()
+            if run_jobs is None:
+                self.busy = False
+                break
+            for kind, args in run_jobs:
+                if not self._run_job(kind, args):
+                    # Остальные задания запуска зависят от прерванного, выполнять их не имеет смысла
+                    break
+            self._run_finished()
+
+    def _run_job(self, kind, args):
+        cancelled = False
+        try:
+            self._last_percent = -1
+            getattr(self, f"_job_{kind}")(*args)
+            self.job_finished.emit(kind)
+            return True
+        except AnalysisCancelled:
+            cancelled = True
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+        if cancelled:
+            # Отмена снимает и запуски, поставленные в очередь после текущего
+            self._drop_pending()
+            if kind == 'load':
+                self.visualizer = None
+                self._source = None
+            elif self.visualizer is not None:
+                self.visualizer.figures = []
+            gc.collect()
+            self.analysis_cancelled.emit()
+        return False
+
+    def _run_finished(self):
+        with self._busy_lock:
+            self._pending_runs -= 1
+            if self._pending_runs <= 0:
+                self._pending_runs = 0
+                self.busy = False
+                self.cancel_event.clear()
+
+    def _drop_pending(self):
+        try:
+            while True:
+                run_jobs = self.jobs.get_nowait()
+                if run_jobs is None:
+                    self.jobs.put(None)
+                    return
+                self._run_finished()
+        except queue.Empty:
+            pass
+
+    def _job_load(self, file_path, streaming=False, stream_query=None, options=None, sheet_name=0):
+        from visualizer import UnifiedBrowserVisualizer
+        schema = None
+        columns = None
+        if options is not None and not streaming:
+            schema = UnifiedBrowserVisualizer(file_path, load=False, sheet_name=sheet_name).sniff_schema()
+            columns = plan_columns(schema, options, stream_query)
+        # Фильтр влияет на загруженные данные в потоковом режиме и для форматов с фильтрацией при чтении
+        if not (streaming or supports_pushdown(file_path)):
+            stream_query = None
+        source = (str(Path(file_path).resolve()), file_fingerprint(file_path), streaming, stream_query, sheet_name)
+        if self.visualizer is not None and source == self._source:
+            # Уже загруженный набор подходит, если в нем есть все нужные столбцы
+            if self._columns is None or (columns is not None and set(columns) <= set(self._columns)):
+                return
+            if schema is not None:
+                self._extend_columns(schema, columns)
+                return
+        self.update_status.emit("Загрузка данных...")
+        # Прежний набор отпускаем до загрузки нового, чтобы не держать оба в памяти
+        self.visualizer = None
+        self._source = None
+        gc.collect()
+        self._release_attached()
+        self.visualizer = UnifiedBrowserVisualizer(file_path, streaming=streaming,
+                                                   stream_query=stream_query,
+                                                   progress_callback=self.on_progress,
+                                                   cancel_event=self.cancel_event, columns=columns,
+                                                   sheet_name=sheet_name)
+        self._source = source
+        self._columns = columns
+
+    def _extend_columns(self, schema, columns):
+        # Новым графикам нужны столбцы, которых нет в наборе: дочитываем только их, а загруженные
+        # и построенные по ним графики остаются
+        self.update_status.emit("Загрузка столбцов...")
+        wanted = set(self._columns) | set(columns if columns is not None else schema.columns)
+        self.visualizer.extend_columns([col for col in schema.columns if col in wanted], complete=columns is None)
+        self._columns = self.visualizer.columns
+
+    def _job_attach(self, file_path, name, size, fingerprint, columns=None):
+        # Набор данных уже загружен другим процессом: подключаемся к нему без чтения файла.
+        # columns — столбцы переданной проекции, недостающие дочитываются как при обычной загрузке
+        self.update_status.emit("Подключение данных...")
+        self.visualizer = None
+        self._source = None
+        gc.collect()
+        self._release_attached()
+        from visualizer import UnifiedBrowserVisualizer
+        visualizer = UnifiedBrowserVisualizer(file_path, load=False, progress_callback=self.on_progress,
+                                              cancel_event=self.cancel_event)
+        shared = SharedFrame(name, size)
+        visualizer.adopt_data(shared.attach(), fingerprint, columns)
+        self._attached.append(shared)
+        self.visualizer = visualizer
+        self._source = (str(Path(file_path).resolve()), file_version(fingerprint), False, None, 0)
+        self._columns = list(columns) if columns is not None else None
+
+    def release_data(self):
+        self.visualizer = None
+        self._source = None
+        get_dataset_cache().invalidate()
+        gc.collect()
+        self._release_attached()
+
+    def _release_attached(self):
+        # Отображение блока закрывается, когда его столбцы больше нигде не используются;
+        # пока они лежат в кэше наборов, блок остается подключенным до следующей попытки
+        self._attached = [shared for shared in self._attached if not shared.release()]
+
+    def _job_filter(self, condition):
+        self.update_status.emit("Обработка данных...")
+        self.visualizer.apply_filter(condition)
+
+    def _job_build(self, options):
+        self.visualizer.figures = []
+        self.visualizer.process_data(options)
+
+    def _job_report(self):
+        self.update_status.emit("Генерация отчета...")
+        report_path = self.visualizer.generate_report()
+        self.update_progress.emit(100)
+        self.analysis_complete.emit(report_path)
@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from filters import FilterSpec, OPERATORS, CONTAINS
+
+# Коды завершения для планировщиков задач
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+CHART_OPTIONS = ("data_info", "histograms", "boxplot", "scatter", "correlation", "line_chart", "bar_chart",
+                 "pie_chart", "violin_plot", "scatter_matrix", "3d_plot", "heatmap", "radar_chart", "time_series")
+DEFAULT_CHARTS = ("data_info", "histograms", "boxplot")
+CONFIG_KEYS = ("charts", "filter", "where", "any", "output", "workers", "streaming", "plotlyjs", "compress", "no_cache", "sheet")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="datavisual",
+        description="Генерация HTML-отчетов по файлам данных без графического интерфейса")
+    parser.add_argument("files", nargs="+", help="CSV, Excel, Parquet, Feather или JSONL файлы для анализа")
+    parser.add_argument("-c", "--charts",
+                        help=f"Графики через запятую или 'all'. Доступно: {', '.join(CHART_OPTIONS)}")
+    parser.add_argument("-f", "--filter", help="Условие DataFrame.query, например \"age > 30\"")
+    parser.add_argument("-w", "--where", nargs=3, action="append", metavar=("COLUMN", "OP", "VALUE"),
+                        help=f"Типизированное условие; операторы: {', '.join([*OPERATORS, CONTAINS])}")
+    parser.add_argument("--any", action="store_true", default=None,
+                        help="Объединять условия --where через OR вместо AND")
+    parser.add_argument("-o", "--output",
+                        help="Каталог для отчетов или путь к .html, если файл один (по умолчанию текущий каталог)")
+    parser.add_argument("--config", help="JSON-файл с параметрами; аргументы командной строки важнее")
+    parser.add_argument("-j", "--workers", type=int, help="Число процессов (по умолчанию по числу ядер)")
+    parser.add_argument("--streaming", action="store_true", default=None,
+                        help="Потоковый режим для больших CSV")
+    parser.add_argument("--sheet", help="Лист Excel: имя или номер с нуля (по умолчанию первый)")
+    parser.add_argument("--plotlyjs", choices=("inline", "cdn"), help="Как подключать plotly.js в отчет")
+    parser.add_argument("--compress", action="store_true", default=None,
+                        help="Сжимать графики gzip (нужен браузер с DecompressionStream)")
+    parser.add_argument("--no-cache", dest="no_cache", action="store_true", default=None,
+                        help="Не использовать кэш наборов данных на диске")
+    return parser
+
+
+def load_config(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError("Файл конфигурации должен содержать JSON-объект")
+    unknown = set(config) - set(CONFIG_KEYS)
+    if unknown:
+        raise ValueError(f"Неизвестные параметры в конфигурации: {', '.join(sorted(unknown))}")
+    return config
+
+
+def resolve_settings(args):
+    settings = {"charts": None, "filter": None, "where": None, "any": False, "output": ".", "workers": None,
+                "streaming": False, "plotlyjs": "inline", "compress": False, "no_cache": False, "sheet": 0}
+    if args.config:
+        settings.update(load_config(args.config))
+    for key in CONFIG_KEYS:
+        value = getattr(args, key)
+        if value is not None:
+            settings[key] = value
+    if isinstance(settings["sheet"], str) and settings["sheet"].isdigit():
+        settings["sheet"] = int(settings["sheet"])
+    return settings
+
+
+def parse_charts(charts):
+    if charts is None:
+        charts = DEFAULT_CHARTS
+    elif isinstance(charts, str):
+        charts = [name.strip() for name in charts.split(",") if name.strip()]
+    if "all" in charts:
+        charts = CHART_OPTIONS
+    unknown = [name for name in charts if name not in CHART_OPTIONS]
+    if unknown:
+        raise ValueError(f"Неизвестные типы графиков: {', '.join(unknown)}")
+    if not charts:
+        raise ValueError("Не выбрано ни одной опции визуализации")
+    return {name: name in charts for name in CHART_OPTIONS}
+
+
+def parse_filter(settings):
+    if settings["filter"] and settings["where"]:
+        raise ValueError("Укажите либо --filter, либо --where, но не оба")
+    if settings["where"]:
+        return FilterSpec([tuple(clause) for clause in settings["where"]], 'or' if settings["any"] else 'and')
+    return settings["filter"] or None
+
+
+def output_paths(files, output):
+    # Один файл можно записать по точному пути, иначе отчеты складываются в каталог по именам исходников
+    if len(files) == 1 and output.lower().endswith((".html", ".htm")):
+        return [Path(output)]
+    directory = Path(output)
+    paths, used = [], set()
+    for file_path in files:
+        stem = Path(file_path).stem
+        name, index = f"{stem}.html", 2
+        while name in used:
+            name, index = f"{stem}_{index}.html", index + 1
+        used.add(name)
+        paths.append(directory / name)
+    return paths
+
+
+def build_report(job):
+    # Выполняется в отдельном процессе: ошибка одного файла не останавливает остальные
+    file_path, report_path, options, filter_condition, settings, figure_workers = job
+    started = time.perf_counter()
+    try:
+        from visualizer import UnifiedBrowserVisualizer
+        streaming = settings["streaming"]
+        visualizer = UnifiedBrowserVisualizer(file_path, use_cache=not settings["no_cache"], load=False,
+                                              streaming=streaming, stream_query=filter_condition,
+                                              max_workers=figure_workers, sheet_name=settings["sheet"])
+        if not streaming:
+            visualizer.columns = visualizer.plan_columns(options, filter_condition)
+        visualizer.load_data()
+        if visualizer.stats is None:
+            visualizer.apply_filter(filter_condition)
+        visualizer.process_data(options)
+        visualizer.generate_report(compress=settings["compress"], plotlyjs=settings["plotlyjs"],
+                                   output_path=str(report_path), open_browser=False)
+        return file_path, str(report_path), None, time.perf_counter() - started
+    except Exception as e:
+        return file_path, None, f"{type(e).__name__}: {str(e)}", time.perf_counter() - started
+
+
+def run_jobs(jobs, workers):
+    if workers == 1 or len(jobs) == 1:
+        for job in jobs:
+            yield build_report(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(build_report, job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        settings = resolve_settings(args)
+        options = parse_charts(settings["charts"])
+        filter_condition = parse_filter(settings)
+    except (OSError, ValueError) as e:
+        print(f"Ошибка параметров: {str(e)}", file=sys.stderr)
+        return EXIT_USAGE
+
+    files = args.files
+    workers = max(1, min(settings["workers"] or os.cpu_count() or 1, len(files)))
+    # Когда файлы обрабатываются параллельно, графики внутри процесса строятся в одном потоке
+    figure_workers = 1 if workers > 1 else None
+    jobs = [(file_path, report_path, options, filter_condition, settings, figure_workers)
+            for file_path, report_path in zip(files, output_paths(files, settings["output"]))]
+
+    failed = 0
+    for file_path, report_path, error, elapsed in run_jobs(jobs, workers):
+        if error is None:
+            print(f"{file_path} -> {report_path} ({elapsed:.1f} с)")
+        else:
+            failed += 1
+            print(f"Ошибка при обработке {file_path}: {error}", file=sys.stderr)
+    print(f"Готово: {len(files) - failed} из {len(files)}", file=sys.stderr)
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
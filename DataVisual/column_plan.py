@@ -0,0 +1,51 @@
+from columnar_readers import filter_columns
+
+# Сколько первых числовых столбцов берет каждый график (None — все числовые)
+NUMERIC_NEEDS = {
+    "histograms": 3,
+    "boxplot": 3,
+    "scatter": 2,
+    "correlation": None,
+    "heatmap": None,
+    "line_chart": 1,
+    "bar_chart": 1,
+    "violin_plot": 1,
+    "radar_chart": 1,
+    "scatter_matrix": 4,
+    "3d_plot": 3,
+    "time_series": 1,
+}
+CATEGORY_OPTIONS = ("bar_chart", "pie_chart", "violin_plot", "radar_chart")
+# Информация о данных описывает каждый столбец, поэтому с ней читается весь файл
+ALL_COLUMNS_OPTIONS = ("data_info",)
+
+
+def _category_prefix(schema):
+    # Столбец дат может остаться строковым (например, в Excel) и тогда считается категорией;
+    # берем столбцы до первого не похожего на дату включительно, чтобы первая категория была прочитана
+    columns = []
+    for col in schema.category_cols:
+        columns.append(col)
+        if col not in schema.time_formats:
+            break
+    return columns
+
+
+def plan_columns(schema, options, filter_condition=None):
+    # Возвращает столбцы в порядке файла или None, если нужен весь файл. Графики выбирают первые
+    # N числовых (первую категорию) по порядку, поэтому читаем именно префиксы этих списков
+    enabled = [key for key, value in options.items() if value]
+    if any(key in ALL_COLUMNS_OPTIONS for key in enabled):
+        return None
+    if not all(isinstance(col, str) for col in schema.columns):
+        return None
+    wanted = set(filter_columns(filter_condition, schema.columns))
+    needs = [NUMERIC_NEEDS[key] for key in enabled if key in NUMERIC_NEEDS]
+    if needs:
+        count = None if None in needs else max(needs)
+        wanted.update(schema.numeric_cols[:count])
+    if any(key in CATEGORY_OPTIONS for key in enabled):
+        wanted.update(_category_prefix(schema))
+    if "time_series" in enabled and schema.time_cols:
+        wanted.add(schema.time_cols[0])
+    return [col for col in schema.columns if col in wanted] or None
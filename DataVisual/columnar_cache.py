@@ -0,0 +1,124 @@
+import hashlib
+import os
+from pathlib import Path
+from dataset_cache import file_version, read_fingerprint
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'datavisual'
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024 * 1024
+
+
+def _digest(value):
+    return hashlib.blake2b(repr(value).encode(), digest_size=8).hexdigest()
+
+
+class ColumnarCache:
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir or os.environ.get('DATAVISUAL_CACHE_DIR', DEFAULT_CACHE_DIR))
+        self.max_bytes = max_bytes
+
+    @property
+    def available(self):
+        return pa is not None
+
+    def _source_key(self, fingerprint):
+        return hashlib.blake2b(fingerprint[0].encode(), digest_size=8).hexdigest()
+
+    def _version_prefix(self, fingerprint):
+        return f"{self._source_key(fingerprint)}-{_digest(file_version(fingerprint))}"
+
+    def _entry_path(self, fingerprint):
+        # Частичные чтения одной версии файла лежат рядом с полным набором: <файл>-<версия>-<строки>-<столбцы>.
+        # Строки (фильтр при чтении и лист) и столбцы хэшируются отдельно, чтобы найти все проекции одного чтения
+        name = self._version_prefix(fingerprint)
+        if fingerprint != file_version(fingerprint):
+            columns, condition, sheet_name = fingerprint[4]
+            name += f"-{_digest((condition, sheet_name))}-{_digest(columns)}"
+        return self.cache_dir / f"{name}.feather"
+
+    def load(self, fingerprint, columns=None):
+        if not self.available:
+            return None
+        return self._read(self._entry_path(fingerprint), columns)
+
+    def load_subset(self, fingerprint):
+        # Проекция, которой нет на диске, берется из сохраненного чтения тех же строк с большим набором столбцов
+        if not self.available:
+            return None
+        columns, condition, sheet_name = fingerprint[4]
+        full = self._entry_path(read_fingerprint(file_version(fingerprint), None, condition, sheet_name))
+        rows = f"{self._version_prefix(fingerprint)}-{_digest((condition, sheet_name))}-*.feather"
+        for path in [full, *self.cache_dir.glob(rows)]:
+            try:
+                names = pa.ipc.open_file(pa.memory_map(str(path))).schema.names
+            except Exception:
+                continue
+            if set(columns) <= set(names):
+                return self._read(path, columns)
+        return None
+
+    def _read(self, path, columns=None):
+        if not path.exists():
+            return None
+        try:
+            if columns is not None:
+                # Столбцы возвращаются в порядке файла, как при чтении с usecols
+                names = pa.ipc.open_file(pa.memory_map(str(path))).schema.names
+                columns = [name for name in names if name in set(columns)]
+            table = feather.read_table(path, columns=columns, memory_map=True)
+            data = table.to_pandas(split_blocks=True)
+        except Exception as e:
+            print(f"Ошибка чтения кэша {path}: {str(e)}")
+            return None
+        os.utime(path)
+        return data
+
+    def save(self, fingerprint, data):
+        if not self.available:
+            return None
+        # Feather хранит только строковые имена столбцов и индекс по умолчанию
+        if not all(isinstance(col, str) for col in data.columns):
+            return None
+        path = self._entry_path(fingerprint)
+        tmp_path = path.with_suffix('.tmp')
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._drop_stale(fingerprint)
+            feather.write_feather(data.reset_index(drop=True), tmp_path, compression='uncompressed')
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Ошибка записи кэша {path}: {str(e)}")
+            tmp_path.unlink(missing_ok=True)
+            return None
+        self._prune()
+        return path
+
+    def _drop_stale(self, fingerprint):
+        current = self._version_prefix(fingerprint)
+        for path in self.cache_dir.glob(f"{self._source_key(fingerprint)}-*.feather"):
+            if not path.stem.startswith(current):
+                path.unlink(missing_ok=True)
+
+    def _prune(self):
+        entries = sorted(self.cache_dir.glob('*.feather'), key=lambda p: p.stat().st_mtime, reverse=True)
+        total = 0
+        for path in entries:
+            total += path.stat().st_size
+            if total > self.max_bytes:
+                path.unlink(missing_ok=True)
+
+    def clear(self):
+        for path in self.cache_dir.glob('*.feather'):
+            path.unlink(missing_ok=True)
+
+
+_columnar_cache = ColumnarCache()
+
+
+def get_columnar_cache():
+    return _columnar_cache
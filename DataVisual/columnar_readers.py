@@ -0,0 +1,143 @@
+import functools
+import operator
+import os
+from pathlib import Path
+from filters import FilterSpec, OPERATORS, CONTAINS, coerce_value, filter_frame
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+
+COLUMNAR_FORMATS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+    '.ipc': 'feather',
+    '.jsonl': 'json',
+    '.ndjson': 'json',
+}
+# pandas сохраняет индекс в Parquet отдельным столбцом; для графиков он не нужен
+INDEX_COLUMN_PREFIX = '__index_level_'
+
+
+def columnar_format(path):
+    return COLUMNAR_FORMATS.get(Path(path).suffix.lower())
+
+
+def supports_pushdown(path):
+    # Фильтр для таких файлов применяется при чтении, как в потоковом режиме для CSV
+    return pa is not None and columnar_format(path) is not None
+
+
+def open_dataset(path):
+    if pa is None:
+        raise ImportError("Для чтения Parquet, Feather и JSONL нужен pyarrow")
+    return ds.dataset(str(path), format=columnar_format(path))
+
+
+def _clause_expression(clause, schema):
+    if clause.column not in schema.names:
+        raise KeyError(f"Столбец '{clause.column}' не найден")
+    arrow_type = schema.field(clause.column).type
+    field = ds.field(clause.column)
+    is_string = pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)
+    if clause.op == CONTAINS:
+        return pc.match_substring(field, str(clause.value), ignore_case=True) if is_string else None
+    if not (is_string or pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type)
+            or pa.types.is_boolean(arrow_type)):
+        # Категории, даты и вложенные типы фильтруются после чтения тем же движком, что и в памяти
+        return None
+    value = coerce_value(clause.value, arrow_type.to_pandas_dtype())
+    expression = OPERATORS[clause.op](field, value)
+    if clause.op == '!=':
+        # В pandas пропуск не равен никакому значению, а в Arrow сравнение с null дает null
+        expression = expression | field.is_null()
+    return expression
+
+
+def filter_expression(condition, schema):
+    # Возвращает выражение для Arrow и признак того, что оно полностью заменяет фильтр
+    if not isinstance(condition, FilterSpec) or not condition:
+        return None, not condition
+    expressions = [_clause_expression(clause, schema) for clause in condition.clauses]
+    pushed = [expression for expression in expressions if expression is not None]
+    exact = len(pushed) == len(expressions)
+    if not pushed or (condition.how == 'or' and not exact):
+        return None, False
+    combine = operator.and_ if condition.how == 'and' else operator.or_
+    return functools.reduce(combine, pushed), exact
+
+
+def filter_columns(condition, names):
+    if isinstance(condition, FilterSpec):
+        return [clause.column for clause in condition.clauses]
+    if condition:
+        # Строку DataFrame.query не разбираем: берем столбцы, чьи имена в нее входят; лишний столбец не помешает
+        return [name for name in names if str(name) in condition]
+    return []
+
+
+def _pieces(dataset, expression):
+    # Для Parquet группы строк отбрасываются по статистике min/max еще до чтения
+    pieces = []
+    total = 0
+    for fragment in dataset.get_fragments():
+        if isinstance(fragment, ds.ParquetFileFragment):
+            fragment.ensure_complete_metadata()
+            metadata = fragment.metadata
+            total += sum(metadata.row_group(i).total_byte_size for i in range(metadata.num_row_groups))
+            selected = fragment.split_by_row_group(expression) if expression is not None else \
+                fragment.split_by_row_group()
+            for piece in selected:
+                pieces.append((piece, sum(group.total_byte_size for group in piece.row_groups)))
+        else:
+            size = os.path.getsize(fragment.path)
+            total += size
+            pieces.append((fragment, size))
+    return pieces, total
+
+
+def read_columnar(path, columns=None, condition=None, progress=None):
+    dataset = open_dataset(path)
+    schema = dataset.schema
+    expression, exact = filter_expression(condition, schema)
+    names = [name for name in schema.names if not name.startswith(INDEX_COLUMN_PREFIX)]
+    if columns is not None:
+        missing = [col for col in columns if col not in schema.names]
+        if missing:
+            raise KeyError(f"Столбцы не найдены: {', '.join(map(str, missing))}")
+        wanted = set(columns)
+        if not exact:
+            # Условия, не переданные в Arrow, проверяются после чтения, поэтому их столбцы тоже нужны
+            wanted.update(filter_columns(condition, names))
+        names = [name for name in names if name in wanted]
+    pieces, total = _pieces(dataset, expression)
+    batches = []
+    done = 0
+    for piece, nbytes in pieces:
+        for batch in piece.to_batches(schema=schema, columns=names, filter=expression):
+            if progress is not None:
+                progress.check()
+            batches.append(batch)
+        done += nbytes
+        if progress is not None:
+            progress.report('load', done, total)
+    table = pa.Table.from_batches(batches, schema=pa.schema([schema.field(name) for name in names]))
+    del batches
+    frame = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    if not exact:
+        frame = filter_frame(frame, condition).reset_index(drop=True)
+        if columns is not None:
+            frame = frame[[col for col in frame.columns if col in set(columns)]]
+    return frame
+
+
+def read_columnar_sample(path, head_rows):
+    dataset = open_dataset(path)
+    names = [name for name in dataset.schema.names if not name.startswith(INDEX_COLUMN_PREFIX)]
+    return dataset.head(head_rows, columns=names).to_pandas()
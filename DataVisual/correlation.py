@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from figure_executor import DEFAULT_MAX_WORKERS
+
+CORR_BLOCK_ROWS = 65_536
+
+
+def _block_sums(block):
+    # Частичные суммы для попарной корреляции только по строкам, где заданы оба столбца
+    mask = np.isfinite(block)
+    if mask.all():
+        ones = np.ones_like(block)
+        return ones.T @ ones, block.T @ ones, (block * block).T @ ones, block.T @ block
+    values = np.where(mask, block, 0).astype(np.float32)
+    weights = mask.astype(np.float32)
+    return weights.T @ weights, values.T @ weights, (values * values).T @ weights, values.T @ values
+
+
+def correlation_matrix(frame, method='pearson', sample_rows=None, max_workers=None, seed=0):
+    if method not in ('pearson', 'spearman'):
+        raise ValueError(f"Неподдерживаемый метод корреляции: {method}")
+    if sample_rows and len(frame) > sample_rows:
+        rows = np.sort(np.random.default_rng(seed).choice(len(frame), sample_rows, replace=False))
+        frame = frame.iloc[rows]
+    if method == 'spearman':
+        frame = frame.rank()
+    values = frame.to_numpy(dtype=np.float64, na_value=np.nan)
+    # Центрирование в float64 до перехода на float32 снижает потерю точности в суммах
+    values = (values - np.nanmean(values, axis=0)).astype(np.float32)
+    blocks = [values[start:start + CORR_BLOCK_ROWS] for start in range(0, len(values), CORR_BLOCK_ROWS)]
+    workers = min(max_workers or DEFAULT_MAX_WORKERS, len(blocks))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(_block_sums, blocks))
+    else:
+        partials = [_block_sums(block) for block in blocks]
+    n, sx, sxx, sxy = (np.sum([p[i] for p in partials], axis=0, dtype=np.float64) for i in range(4))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = n * sxy - sx * sx.T
+        var = (n * sxx - sx * sx) * (n * sxx - sx * sx).T
+        corr = np.clip(cov / np.sqrt(var), -1, 1)
+    corr[n < 2] = np.nan
+    np.fill_diagonal(corr, np.where(np.diag(n) >= 2, 1.0, np.nan))
+    return pd.DataFrame(corr, index=frame.columns, columns=frame.columns)
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+# Сколько байт с начала и с конца файла участвует в хэше содержимого
+HASH_BLOCK_SIZE = 1024 * 1024
+DEFAULT_MEMORY_BUDGET = 2 * 1024 * 1024 * 1024
+
+
+def file_fingerprint(file_path):
+    path = Path(file_path).resolve()
+    stat = path.stat()
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(stat.st_size).encode())
+    with open(path, 'rb') as f:
+        digest.update(f.read(HASH_BLOCK_SIZE))
+        if stat.st_size > 2 * HASH_BLOCK_SIZE:
+            f.seek(stat.st_size // 2)
+            digest.update(f.read(HASH_BLOCK_SIZE))
+            f.seek(-HASH_BLOCK_SIZE, os.SEEK_END)
+            digest.update(f.read(HASH_BLOCK_SIZE))
+        elif stat.st_size > HASH_BLOCK_SIZE:
+            digest.update(f.read())
+    return (str(path), stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+
+
+def read_fingerprint(fingerprint, columns=None, condition=None, sheet_name=0):
+    # Частичное чтение (часть столбцов или строк, другой лист книги) хранится в кэше отдельно от полного набора
+    if columns is None and not condition and sheet_name == 0:
+        return fingerprint
+    return fingerprint + ((tuple(columns) if columns is not None else None, condition or None, sheet_name),)
+
+
+def file_version(fingerprint):
+    # Отпечаток самого файла без уточнения о частичном чтении
+    return fingerprint[:4]
+
+
+def same_file_version(fingerprint, other):
+    return file_version(fingerprint) == file_version(other)
+
+
+class CachedDataset:
+    def __init__(self, fingerprint, data):
+        self.fingerprint = fingerprint
+        self.data = data
+        self.meta = {}
+        self.nbytes = int(data.memory_usage(deep=True).sum())
+
+
+class DatasetCache:
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def total_bytes(self):
+        with self._lock:
+            return sum(entry.nbytes for entry in self._entries.values())
+
+    def get(self, file_path, fingerprint=None):
+        fingerprint = fingerprint or file_fingerprint(file_path)
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                self.misses += 1
+                self._drop_stale(fingerprint)
+                return None
+            self._entries.move_to_end(fingerprint)
+            self.hits += 1
+            return entry
+
+    def put(self, file_path, data, fingerprint=None):
+        fingerprint = fingerprint or file_fingerprint(file_path)
+        entry = CachedDataset(fingerprint, data)
+        with self._lock:
+            self._drop_stale(fingerprint)
+            if entry.nbytes > self.memory_budget:
+                # Набор данных больше всего бюджета — не кэшируем, чтобы не вытеснять остальные
+                return entry
+            self._entries[fingerprint] = entry
+            self._evict()
+        return entry
+
+    def versions_of(self, fingerprint):
+        # Все закэшированные чтения той же версии файла: полный набор и частичные варианты
+        with self._lock:
+            return [entry for key, entry in self._entries.items() if same_file_version(key, fingerprint)]
+
+    def set_memory_budget(self, memory_budget):
+        with self._lock:
+            self.memory_budget = memory_budget
+            self._evict()
+
+    def invalidate(self, file_path=None):
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+                return
+            path = str(Path(file_path).resolve())
+            for key in [key for key in self._entries if key[0] == path]:
+                del self._entries[key]
+
+    def _drop_stale(self, fingerprint):
+        # Файл изменился на диске — старые версии больше не нужны
+        for key in [key for key in self._entries
+                    if key[0] == fingerprint[0] and not same_file_version(key, fingerprint)]:
+            del self._entries[key]
+
+    def _evict(self):
+        while self._entries and self.total_bytes > self.memory_budget:
+            self._entries.popitem(last=False)
+
+    def __contains__(self, file_path):
+        fingerprint = file_fingerprint(file_path)
+        with self._lock:
+            return fingerprint in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+_dataset_cache = DatasetCache()
+
+
+def get_dataset_cache():
+    return _dataset_cache
@@ -0,0 +1,75 @@
+import numpy as np
+
+DEFAULT_POINT_BUDGETS = {
+    'scatter': 20_000,
+    'line': 5_000,
+    '3d': 10_000,
+    'scatter_matrix': 5_000,
+    'time_series': 5_000,
+}
+# Во сколько раз строк больше бюджета, чтобы вместо выборки рисовать плотность
+DENSITY_FACTOR = 50
+STRATA_BINS = 20
+
+
+def lttb(x, y, n_out):
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # Largest-Triangle-Three-Buckets: из каждой корзины берем точку с наибольшей площадью
+    # треугольника с предыдущей выбранной точкой и средним следующей корзины
+    xf = x.astype(np.float64) if x.dtype.kind in 'iuf' else x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xf[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        area = np.abs((xf[prev] - avg_x) * (y[start:end] - y[prev])
+                      - (xf[prev] - xf[start:end]) * (avg_y - y[prev]))
+        prev = start + int(np.argmax(area))
+        selected[i + 1] = prev
+    return selected
+
+
+def stratified_sample(frame, columns, n, bins=STRATA_BINS, seed=0):
+    if len(frame) <= n:
+        return frame
+    # Делим пространство на ячейки сетки и берем из каждой пропорциональную долю,
+    # но не меньше одной точки, чтобы редкие области и выбросы не пропадали
+    cell = np.zeros(len(frame), dtype=np.int64)
+    for col in columns:
+        values = frame[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        finite = values[np.isfinite(values)]
+        if len(finite) == 0:
+            continue
+        edges = np.linspace(finite.min(), finite.max(), bins + 1)[1:-1]
+        cell = cell * bins + np.searchsorted(edges, np.nan_to_num(values, nan=finite.min()))
+    _, cell = np.unique(cell, return_inverse=True)
+    counts = np.bincount(cell)
+    quota = np.maximum(1, np.floor(counts * n / len(frame))).astype(np.int64)
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(frame)), cell))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(len(frame)) - starts[cell[order]]
+    keep = np.sort(order[rank < quota[cell[order]]])
+    return frame.iloc[keep]
+
+
+def density_grid(x, y, bins=200):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    mask = np.isfinite(x) & np.isfinite(y)
+    counts, x_edges, y_edges = np.histogram2d(x[mask], y[mask], bins=bins)
+    return counts.T, (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2
+
+
+def points_note(shown, total):
+    if shown >= total:
+        return f"Показаны все {total} точек"
+    return f"Показано {shown} из {total} точек"
@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+CATEGORY_RATIO = 0.5
+INT_CANDIDATES = [np.int8, np.int16, np.int32]
+UINT_CANDIDATES = [np.uint8, np.uint16, np.uint32]
+NULLABLE_INT = {np.int8: 'Int8', np.int16: 'Int16', np.int32: 'Int32',
+                np.uint8: 'UInt8', np.uint16: 'UInt16', np.uint32: 'UInt32'}
+
+
+def current_rss():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+class PeakRSSMonitor:
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.start_rss = 0
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak_rss = max(self.peak_rss, current_rss())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.start_rss = self.peak_rss = current_rss()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, current_rss())
+
+
+def smallest_int_dtype(c_min, c_max):
+    candidates = UINT_CANDIDATES if c_min >= 0 else INT_CANDIDATES
+    for dtype in candidates:
+        info = np.iinfo(dtype)
+        if info.min <= c_min and c_max <= info.max:
+            return dtype
+    return None
+
+
+def plan_dtypes(data, category_ratio=CATEGORY_RATIO):
+    plan = {}
+    if data is None or len(data) == 0:
+        return plan
+    numeric = data.select_dtypes(include=['integer', 'floating'])
+    objects = data.select_dtypes(include=['object'])
+    # Все статистики считаются одним пакетным вызовом на блок, а не по столбцу
+    bounds = numeric.agg(['min', 'max']) if len(numeric.columns) else None
+    float_flags = {}
+    for col in numeric.select_dtypes(include=['floating']).columns:
+        values = numeric[col].to_numpy()
+        missing = np.isnan(values)
+        with np.errstate(invalid='ignore'):
+            integral = bool(np.all(missing | (np.modf(values)[0] == 0)))
+        float_flags[col] = (integral, bool(missing.any()))
+    unique_counts = objects.nunique() if len(objects.columns) else {}
+    for col in numeric.columns:
+        c_min, c_max = bounds[col]['min'], bounds[col]['max']
+        dtype = data[col].dtype
+        if pd.isna(c_min):
+            continue
+        if pd.api.types.is_integer_dtype(dtype):
+            target = smallest_int_dtype(c_min, c_max)
+            if target is not None and np.dtype(target) != dtype:
+                plan[col] = np.dtype(target)
+        else:
+            integral, has_nan = float_flags[col]
+            target = smallest_int_dtype(c_min, c_max) if integral else None
+            if target is not None:
+                plan[col] = NULLABLE_INT[target] if has_nan else np.dtype(target)
+            elif dtype == np.float64 and np.finfo(np.float32).min <= c_min and c_max <= np.finfo(np.float32).max:
+                plan[col] = np.dtype(np.float32)
+    for col in objects.columns:
+        if unique_counts[col] / len(data) < category_ratio:
+            plan[col] = 'category'
+    return plan
+
+
+def apply_dtype_plan(data, plan):
+    columns = {}
+    rows = []
+    for col in data.columns:
+        series = data[col]
+        if col not in plan:
+            columns[col] = series
+            continue
+        before = series.memory_usage(index=False, deep=True)
+        converted = series.astype(plan[col])
+        after = converted.memory_usage(index=False, deep=True)
+        columns[col] = converted
+        rows.append({'Column': col, 'From': str(series.dtype), 'To': str(converted.dtype),
+                     'BytesBefore': before, 'BytesAfter': after, 'BytesSaved': before - after})
+    # Один пересбор фрейма вместо присваивания столбцов по одному
+    result = pd.DataFrame(columns, index=data.index)
+    report = pd.DataFrame(rows, columns=['Column', 'From', 'To', 'BytesBefore', 'BytesAfter', 'BytesSaved'])
+    return result, report
@@ -0,0 +1,129 @@
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+EXCEL_CHUNK_ROWS = 50_000
+
+
+def excel_engine(path):
+    # calamine (Rust) разбирает книгу в разы быстрее openpyxl и читает и .xlsx, и .xls
+    if python_calamine is not None:
+        return 'calamine'
+    if Path(path).suffix.lower() == '.xlsx' and openpyxl is not None:
+        return 'openpyxl-stream'
+    return None
+
+
+def sheet_names(path):
+    # Имена листов без разбора ячеек: окно предлагает выбрать лист до загрузки
+    if python_calamine is not None:
+        return list(python_calamine.CalamineWorkbook.from_path(str(path)).sheet_names)
+    if Path(path).suffix.lower() == '.xlsx' and openpyxl is not None:
+        workbook = openpyxl.load_workbook(path, read_only=True)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+    with pd.ExcelFile(path) as workbook:
+        return list(workbook.sheet_names)
+
+
+def _column_names(header):
+    # Те же имена, что дает pandas.read_excel для пустых и повторяющихся заголовков
+    names = []
+    seen = {}
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _worksheet(workbook, sheet_name):
+    if isinstance(sheet_name, int):
+        return workbook.worksheets[sheet_name]
+    if sheet_name not in workbook.sheetnames:
+        raise ValueError(f"Лист '{sheet_name}' не найден в книге")
+    return workbook[sheet_name]
+
+
+def read_excel_streaming(path, sheet_name=0, nrows=None, usecols=None, progress=None,
+                         chunk_rows=EXCEL_CHUNK_ROWS):
+    # read_only-режим openpyxl отдает строки по одной, не строя дерево всех ячеек листа;
+    # строки собираются в DataFrame блоками, чтобы объекты Python не копились на весь лист
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = _worksheet(workbook, sheet_name)
+        width = sheet.max_column
+        rows = sheet.iter_rows(values_only=True, max_col=width)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        columns = _column_names(header)
+        positions = list(range(len(columns)))
+        if usecols is not None:
+            missing = [col for col in usecols if col not in columns]
+            if missing:
+                raise ValueError(f"Столбцы не найдены: {', '.join(map(str, missing))}")
+            positions = [i for i, col in enumerate(columns) if col in set(usecols)]
+        names = [columns[i] for i in positions]
+        total_rows = max((sheet.max_row or 1) - 1, 1)
+        if nrows is not None:
+            total_rows = min(total_rows, nrows)
+        size = os.path.getsize(path)
+        parts = []
+        chunk = []
+        read = 0
+        for row in rows:
+            if nrows is not None and read >= nrows:
+                break
+            chunk.append([row[i] if i < len(row) else None for i in positions])
+            read += 1
+            if len(chunk) == chunk_rows:
+                parts.append(pd.DataFrame.from_records(chunk, columns=names))
+                chunk = []
+                if progress is not None:
+                    progress.check()
+                    # Шкала загрузки в байтах: пересчитываем долю прочитанных строк в размер файла
+                    progress.report('load', size * min(read, total_rows) // total_rows, size)
+        if chunk or not parts:
+            parts.append(pd.DataFrame.from_records(chunk, columns=names))
+    finally:
+        workbook.close()
+    data = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+    if progress is not None:
+        progress.report('load', size, size)
+    data = data.infer_objects()
+    for col in data.select_dtypes(include=['object']).columns:
+        # Пустые ячейки openpyxl отдает как None, а pandas.read_excel — как NaN
+        data[col] = data[col].where(data[col].notna(), np.nan)
+    return data
+
+
+def read_excel(path, sheet_name=0, nrows=None, usecols=None, progress=None):
+    engine = excel_engine(path)
+    if engine == 'openpyxl-stream':
+        return read_excel_streaming(path, sheet_name, nrows=nrows, usecols=usecols, progress=progress)
+    if progress is not None:
+        progress.check()
+    data = pd.read_excel(path, sheet_name=sheet_name, nrows=nrows, usecols=usecols, engine=engine)
+    if progress is not None:
+        size = os.path.getsize(path)
+        progress.report('load', size, size)
+    return data
+
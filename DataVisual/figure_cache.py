@@ -0,0 +1,120 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+from dataset_cache import same_file_version
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+# Бюджет в мегабайтах можно задать через окружение; 0 отключает кэш графиков
+MEMORY_BUDGET_ENV = 'DATAVISUAL_FIGURE_CACHE_MB'
+
+
+def _value_nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_value_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return 8 * len(value) + sum(_value_nbytes(item) for item in value)
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return 8
+
+
+def figure_nbytes(fig):
+    # Оценка по массивам трасс: именно они занимают память у точечных, матричных и 3D графиков
+    return sum(_value_nbytes(trace.to_plotly_json()) for trace in fig.data)
+
+
+class CachedFigures:
+    def __init__(self, figures):
+        self.figures = list(figures)
+        self.nbytes = sum(figure_nbytes(fig) for fig in self.figures)
+
+
+def default_memory_budget():
+    value = os.environ.get(MEMORY_BUDGET_ENV)
+    return int(float(value) * 1024 * 1024) if value else DEFAULT_MEMORY_BUDGET
+
+
+class FigureCache:
+    # Хранятся готовые объекты go.Figure: повторный запуск отдает их без построения и без разбора JSON.
+    # Цена — после записи отчета графики не освобождаются, пока их не вытеснит бюджет (оценка по массивам
+    # трасс, а не измеренная память) или загрузка другого файла; для экономии памяти бюджет можно уменьшить
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, memory_budget=None):
+        self.max_entries = max_entries
+        self.memory_budget = default_memory_budget() if memory_budget is None else memory_budget
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(scope, method_name, args, params):
+        # scope = (версия файла, лист, условие фильтра, потоковый режим[, загруженные столбцы]):
+        # графики другого файла, фильтра или, для графиков по всем столбцам, другой проекции не подходят
+        return (scope, method_name, tuple(args), params)
+
+    @property
+    def total_bytes(self):
+        with self._lock:
+            return sum(entry.nbytes for entry in self._entries.values())
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry.figures)
+
+    def put(self, key, figures):
+        # Кэш держит графики после записи отчета, поэтому его размер ограничен бюджетом памяти,
+        # а не только числом записей: иначе большие точечные и 3D графики копились бы всю сессию
+        entry = CachedFigures(figures)
+        with self._lock:
+            self._drop_stale(key[0])
+            if not self.memory_budget or entry.nbytes > self.memory_budget:
+                return
+            self._entries[key] = entry
+            self._evict()
+
+    def set_memory_budget(self, memory_budget):
+        with self._lock:
+            self.memory_budget = memory_budget
+            self._evict()
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self.total_bytes > self.memory_budget):
+            self._entries.popitem(last=False)
+
+    def invalidate(self, file_path=None):
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+                return
+            path = str(Path(file_path).resolve())
+            for key in [key for key in self._entries if key[0][0][0] == path]:
+                del self._entries[key]
+
+    def _drop_stale(self, scope):
+        # Графики держатся только для текущего файла: при переходе к другому файлу или после
+        # изменения этого на диске прежние больше не понадобятся
+        fingerprint = scope[0]
+        for key in [key for key in self._entries if not same_file_version(key[0][0], fingerprint)]:
+            del self._entries[key]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+_figure_cache = FigureCache()
+
+
+def get_figure_cache():
+    return _figure_cache
@@ -0,0 +1,43 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Общий предел потоков для построения графиков и блочной корреляции
+DEFAULT_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+
+class FigureExecutor:
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or DEFAULT_MAX_WORKERS
+
+    def _run_task(self, visualizer, task):
+        method_name, args = task
+        visualizer.progress.check()
+        # Построители add_* пишут в собственный список потока, а не в общий visualizer.figures
+        visualizer._figure_sink.figures = []
+        try:
+            getattr(visualizer, method_name)(*args)
+        except Exception as e:
+            print(f"Ошибка построения {method_name}: {str(e)}")
+        finally:
+            figures = visualizer._figure_sink.figures
+            visualizer._figure_sink.figures = None
+        visualizer._figure_task_done()
+        return figures
+
+    def run(self, visualizer, tasks):
+        return [fig for figures in self.run_tasks(visualizer, tasks) for fig in figures]
+
+    def run_tasks(self, visualizer, tasks):
+        if not tasks:
+            return []
+        if self.max_workers == 1 or len(tasks) == 1:
+            results = [self._run_task(visualizer, task) for task in tasks]
+        else:
+            pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks)))
+            try:
+                # map сохраняет порядок задач, поэтому порядок графиков в отчете детерминирован
+                results = list(pool.map(lambda task: self._run_task(visualizer, task), tasks))
+            finally:
+                # При отмене еще не начатые построители не запускаются
+                pool.shutdown(wait=True, cancel_futures=True)
+        return results
@@ -0,0 +1,165 @@
+import operator
+import threading
+import numpy as np
+import pandas as pd
+
+OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '<=': operator.le,
+}
+CONTAINS = 'contains'
+
+
+class FilterClause:
+    def __init__(self, column, op, value):
+        if op not in OPERATORS and op != CONTAINS:
+            raise ValueError(f"Неизвестный оператор фильтра: {op}")
+        self.column = column
+        self.op = op
+        self.value = value
+
+    @property
+    def key(self):
+        return (self.column, self.op, self.value)
+
+    def __eq__(self, other):
+        return isinstance(other, FilterClause) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"FilterClause({self.column!r}, {self.op!r}, {self.value!r})"
+
+
+class FilterSpec:
+    def __init__(self, clauses, how='and'):
+        if how not in ('and', 'or'):
+            raise ValueError(f"Условия объединяются только через 'and' или 'or', получено: {how}")
+        self.clauses = tuple(clause if isinstance(clause, FilterClause) else FilterClause(*clause)
+                             for clause in clauses)
+        self.how = how
+
+    @property
+    def key(self):
+        return (self.how, tuple(clause.key for clause in self.clauses))
+
+    def __bool__(self):
+        return bool(self.clauses)
+
+    def __eq__(self, other):
+        return isinstance(other, FilterSpec) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"FilterSpec({list(self.clauses)!r}, how={self.how!r})"
+
+
+def coerce_value(value, dtype):
+    # Значение из интерфейса приходит строкой: приводим его к типу столбца, а не сравниваем как текст
+    if not isinstance(value, str):
+        return value
+    if pd.api.types.is_bool_dtype(dtype):
+        return value.strip().lower() in ('1', 'true', 'да', 'истина')
+    if pd.api.types.is_numeric_dtype(dtype):
+        try:
+            return float(value.replace(',', '.'))
+        except ValueError:
+            raise ValueError(f"Значение '{value}' не является числом")
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return pd.Timestamp(value)
+    return value
+
+
+def _compare(values, op, value):
+    if op == CONTAINS:
+        return pd.Series(values, dtype=object).astype(str).str.contains(
+            str(value), case=False, regex=False, na=False).to_numpy()
+    with np.errstate(invalid='ignore'):
+        return np.asarray(OPERATORS[op](values, value), dtype=bool)
+
+
+def _lookup(codes, per_value, op):
+    # Условие посчитано один раз на уникальное значение и раскладывается по кодам строк;
+    # код -1 (пропуск) попадает на последний элемент, как у сравнения с NaN
+    per_value = np.append(per_value, op == '!=')
+    return per_value[codes]
+
+
+class FilterEngine:
+    def __init__(self):
+        self._owner = None
+        self._masks = {}
+        self._factorized = {}
+        self._lock = threading.Lock()
+
+    def _reset_if_changed(self, data):
+        if self._owner is not data:
+            self._owner = data
+            self._masks = {}
+            self._factorized = {}
+
+    def clause_mask(self, data, clause):
+        with self._lock:
+            self._reset_if_changed(data)
+            mask = self._masks.get(clause.key)
+        if mask is None:
+            mask = self._compute(data, clause)
+            with self._lock:
+                if self._owner is data:
+                    self._masks[clause.key] = mask
+        return mask
+
+    def _compute(self, data, clause):
+        if clause.column not in data.columns:
+            raise KeyError(f"Столбец '{clause.column}' не найден")
+        series = data[clause.column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            value = clause.value if clause.op == CONTAINS else coerce_value(clause.value, categories.dtype)
+            return _lookup(series.cat.codes.to_numpy(), _compare(categories.to_numpy(), clause.op, value), clause.op)
+        if clause.op == CONTAINS or pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            codes, uniques = self._factorize(clause.column, series)
+            value = clause.value if clause.op == CONTAINS else coerce_value(clause.value, uniques.dtype)
+            return _lookup(codes, _compare(np.asarray(uniques), clause.op, value), clause.op)
+        value = coerce_value(clause.value, series.dtype)
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'iufb':
+            return _compare(series.to_numpy(), clause.op, value)
+        if pd.api.types.is_numeric_dtype(series):
+            # Nullable-типы: пропуски становятся NaN и сравниваются как в pandas
+            return _compare(series.to_numpy(dtype=np.float64, na_value=np.nan), clause.op, value)
+        return OPERATORS[clause.op](series, value).to_numpy(dtype=bool)
+
+    def _factorize(self, column, series):
+        with self._lock:
+            cached = self._factorized.get(column)
+        if cached is None:
+            cached = pd.factorize(series, use_na_sentinel=True)
+            with self._lock:
+                self._factorized[column] = cached
+        return cached
+
+    def mask(self, data, spec):
+        masks = [self.clause_mask(data, clause) for clause in spec.clauses]
+        if not masks:
+            return np.ones(len(data), dtype=bool)
+        combine = np.logical_and if spec.how == 'and' else np.logical_or
+        return combine.reduce(masks)
+
+    def apply(self, data, spec):
+        return data[self.mask(data, spec)]
+
+
+def filter_frame(data, condition, engine=None):
+    # Условие может быть строкой для DataFrame.query или типизированным FilterSpec
+    if not condition:
+        return data
+    if isinstance(condition, FilterSpec):
+        return (engine or FilterEngine()).apply(data, condition)
+    return data.query(condition)
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+KDE_GRID_POINTS = 200
+KDE_HIST_BINS = 1024
+
+
+class GroupedColumn:
+    def __init__(self, labels, codes, values):
+        self.labels = labels
+        self.codes = codes
+        self.values = values
+        self.counts = np.bincount(codes, minlength=len(labels))
+
+    def means(self):
+        sums = np.bincount(self.codes, weights=self.values, minlength=len(self.labels))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / self.counts
+        present = self.counts > 0
+        return self.labels[present], means[present]
+
+    def split(self, limit=None):
+        codes, values = self.codes, self.values
+        n_groups = len(self.labels) if limit is None else min(limit, len(self.labels))
+        if n_groups < len(self.labels):
+            mask = codes < n_groups
+            codes, values = codes[mask], values[mask]
+        # Одна устойчивая сортировка по кодам вместо булевой маски на каждую категорию
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes, minlength=n_groups)
+        return self.labels[:n_groups], np.split(values[order], np.cumsum(counts)[:-1])
+
+
+def group_column(categories, values, sort=False):
+    codes, labels = pd.factorize(categories, sort=sort)
+    values = np.asarray(values, dtype=np.float64)
+    valid = (codes >= 0) & np.isfinite(values)
+    return GroupedColumn(np.asarray(labels), codes[valid], values[valid])
+
+
+def subsample(values, n, seed=0):
+    if len(values) <= n:
+        return values
+    return np.random.default_rng(seed).choice(values, n, replace=False)
+
+
+def kde_curve(values, grid_points=KDE_GRID_POINTS):
+    # Бинированная гауссова KDE: гистограмма + свертка, стоимость O(n + bins)
+    if len(values) < 2 or values.min() == values.max():
+        return np.array([values.min()] if len(values) else []), np.array([1.0] if len(values) else [])
+    bandwidth = 1.06 * values.std() * len(values) ** -0.2
+    lo, hi = values.min() - 3 * bandwidth, values.max() + 3 * bandwidth
+    counts, edges = np.histogram(values, bins=KDE_HIST_BINS, range=(lo, hi))
+    step = edges[1] - edges[0]
+    half = int(np.ceil(3 * bandwidth / step))
+    offsets = np.arange(-half, half + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    density = np.convolve(counts, kernel, mode='same')
+    density /= density.sum() * step
+    centers = (edges[:-1] + edges[1:]) / 2
+    grid = np.linspace(lo, hi, grid_points)
+    return grid, np.interp(grid, centers, density)
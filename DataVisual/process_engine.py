@@ -0,0 +1,211 @@
+import logging
+import multiprocessing
+import queue
+import threading
+from pathlib import Path
+from PySide6.QtCore import QObject, Signal
+from analysis_worker import AnalysisWorker
+from dataset_cache import get_dataset_cache, file_fingerprint
+from shared_frame import SharedFrame
+
+logger = logging.getLogger(__name__)
+
+
+def engine_main(conn):
+    # Точка входа процесса-движка: тот же AnalysisWorker, но сигналы уходят в канал
+    worker = AnalysisWorker()
+    send_lock = threading.Lock()
+
+    def send(*message):
+        # Прогресс шлют и потоки построения графиков, а Connection не потокобезопасен
+        with send_lock:
+            conn.send(message)
+
+    worker.update_progress.connect(lambda value: send('progress', value))
+    worker.update_status.connect(lambda text: send('status', text))
+    worker.analysis_complete.connect(lambda path: send('complete', path))
+    worker.analysis_cancelled.connect(lambda: send('cancelled'))
+    worker.error_occurred.connect(lambda text: send('error', text))
+    worker.job_finished.connect(lambda kind: send('job_finished', kind))
+
+    def listen():
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                message = ('stop',)
+            kind, args = message[0], message[1:]
+            if kind == 'cancel':
+                worker.cancel()
+            elif kind == 'stop':
+                worker.cancel_event.set()
+                worker.jobs.put(None)
+                return
+            elif kind == 'run':
+                worker.submit_run(*args)
+            else:
+                worker.submit(kind, *args)
+
+    threading.Thread(target=listen, daemon=True).start()
+    worker.run()
+    # Процесс завершается: данные из разделяемой памяти отпускаются до выхода, иначе блоки не закрыть
+    worker.release_data()
+
+
+class ProcessEngine(QObject):
+    update_progress = Signal(int)
+    update_status = Signal(str)
+    analysis_complete = Signal(object)
+    analysis_cancelled = Signal()
+    error_occurred = Signal(str)
+    job_finished = Signal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.process = None
+        self.conn = None
+        self.busy = False
+        self._listener = None
+        self._shared = []
+        self._sent_source = None
+        self._outbox = None
+        self._sender = None
+        self._send_lock = threading.Lock()
+        self._cancel_pending = threading.Event()
+
+    def start(self):
+        if self.process is not None and self.process.is_alive():
+            return
+        # spawn: дочерний процесс не наследует состояние Qt из GUI-процесса
+        context = multiprocessing.get_context('spawn')
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=engine_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self._sent_source = None
+        self._listener = threading.Thread(target=self._listen, args=(self.conn,), daemon=True)
+        self._listener.start()
+        self._outbox = queue.Queue()
+        self._sender = threading.Thread(target=self._send_jobs, args=(self.conn, self._outbox), daemon=True)
+        self._sender.start()
+
+    def _listen(self, conn):
+        signals = {
+            'progress': self.update_progress,
+            'status': self.update_status,
+            'complete': self.analysis_complete,
+            'cancelled': self.analysis_cancelled,
+            'error': self.error_occurred,
+            'job_finished': self.job_finished,
+        }
+        while True:
+            try:
+                kind, *args = conn.recv()
+            except (EOFError, OSError):
+                if self.busy:
+                    self.busy = False
+                    self.error_occurred.emit("Процесс анализа неожиданно завершился")
+                return
+            if kind in ('complete', 'cancelled', 'error'):
+                self.busy = False
+                self._release_shared()
+            signals[kind].emit(*args)
+
+    def _handoff(self, file_path):
+        # Если набор уже загружен в этом процессе, передаем его через разделяемую память вместо повторного чтения
+        if not SharedFrame.available():
+            return None
+        path = Path(file_path)
+        entry = self._handoff_entry(get_dataset_cache().versions_of(file_fingerprint(path)))
+        if entry is None or self._sent_source == entry.fingerprint:
+            return None
+        if not all(isinstance(col, str) for col in entry.data.columns):
+            return None
+        try:
+            shared = SharedFrame.publish(entry.data)
+        except Exception as e:
+            logger.warning("Не удалось передать данные через разделяемую память: %s", e)
+            return None
+        self._shared.append(shared)
+        columns = list(entry.data.columns) if len(entry.fingerprint) > 4 else None
+        return ('attach', (str(file_path), shared.name, shared.size, entry.fingerprint, columns))
+
+    @staticmethod
+    def _handoff_entry(entries):
+        # Передается полный набор, а если его нет — самая широкая проекция без фильтра с первого листа:
+        # движок дочитает недостающие столбцы сам. Наборы с фильтром при чтении или с другого листа
+        # не передаются, движок читает их из файла
+        projections = []
+        for entry in entries:
+            if len(entry.fingerprint) == 4:
+                return entry
+            columns, condition, sheet_name = entry.fingerprint[4]
+            if columns is not None and condition is None and sheet_name == 0:
+                projections.append(entry)
+        return max(projections, key=lambda entry: len(entry.data.columns), default=None)
+
+    def _send_jobs(self, conn, outbox):
+        # Публикация набора в разделяемую память сериализует его целиком, поэтому она выполняется
+        # в этом потоке, а не в GUI-потоке, вызвавшем submit_analysis
+        while True:
+            job = outbox.get()
+            if job is None:
+                return
+            file_path, options, filter_condition, streaming, sheet_name = job
+            try:
+                jobs = AnalysisWorker.analysis_jobs(file_path, options, filter_condition, streaming, sheet_name)
+                # Передаются только наборы с первого листа, другие листы движок читает сам
+                attach = None if streaming or sheet_name != 0 else self._handoff(file_path)
+                if attach is not None:
+                    jobs.insert(0, attach)
+                with self._send_lock:
+                    if self._cancel_pending.is_set():
+                        # Отмена пришла во время передачи данных: процесс-движок еще не получил задание
+                        self.busy = False
+                        self._release_shared()
+                        self.analysis_cancelled.emit()
+                        continue
+                    # Весь запуск уходит одним сообщением и встает в очередь движка одним заданием
+                    conn.send(('run', jobs))
+                    if attach is not None:
+                        self._sent_source = attach[1][3]
+            except (OSError, ValueError):
+                # Канал закрыт в stop(), пока шла передача данных
+                self._release_shared()
+                return
+
+    def submit_analysis(self, file_path, options, filter_condition=None, streaming=False, sheet_name=0):
+        self.start()
+        self.busy = True
+        self._cancel_pending.clear()
+        self._outbox.put((file_path, options, filter_condition, streaming, sheet_name))
+
+    def cancel(self):
+        if self.busy and self.conn is not None:
+            with self._send_lock:
+                self._cancel_pending.set()
+                self.conn.send(('cancel',))
+
+    def _release_shared(self):
+        shared_frames, self._shared = self._shared, []
+        for shared in shared_frames:
+            shared.unlink()
+
+    def stop(self, timeout=5):
+        if self.process is None:
+            return
+        self._outbox.put(None)
+        self._sender.join(timeout)
+        try:
+            with self._send_lock:
+                self.conn.send(('stop',))
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+        self._release_shared()
+        self.process = None
+        self.busy = False
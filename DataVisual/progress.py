@@ -0,0 +1,58 @@
+import io
+import os
+import threading
+
+
+class AnalysisCancelled(Exception):
+    pass
+
+
+class Progress:
+    def __init__(self, callback=None, cancel_event=None):
+        self.callback = callback
+        self.cancel_event = cancel_event or threading.Event()
+
+    def check(self):
+        # Отмена кооперативная: проверяется между блоками чтения и между построителями графиков
+        if self.cancel_event.is_set():
+            raise AnalysisCancelled("Анализ отменен пользователем")
+
+    def report(self, stage, done, total):
+        if self.callback is not None:
+            self.callback(stage, done, total)
+
+    def open_counting(self, path, check=False):
+        size = os.path.getsize(path)
+
+        def on_read(done):
+            if check:
+                # Парсер может прочитать весь файл одним вызовом, поэтому отмену проверяем прямо при чтении
+                self.check()
+            self.report('load', done, size)
+
+        return io.BufferedReader(CountingFileIO(path, on_read))
+
+
+class CountingFileIO(io.FileIO):
+    def __init__(self, path, on_read):
+        super().__init__(path, 'rb')
+        self.on_read = on_read
+        self.bytes_read = 0
+
+    def _count(self, n):
+        self.bytes_read += n or 0
+        self.on_read(self.bytes_read)
+        return n
+
+    def readinto(self, buffer):
+        return self._count(super().readinto(buffer))
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self._count(len(data) if data else 0)
+        return data
+
+    def readall(self):
+        data = super().readall()
+        self._count(len(data))
+        return data
@@ -0,0 +1,180 @@
+import logging
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from dtype_plan import plan_dtypes, smallest_int_dtype
+from progress import AnalysisCancelled
+from schema import read_csv_sample, sniff_csv
+from time_detection import detect_time_formats, to_datetime_column
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+READ_CHUNKSIZE = 250_000
+
+logger = logging.getLogger(__name__)
+
+
+def infer_read_dtypes(sample):
+    time_formats = {col: fmt for col, fmt in detect_time_formats(sample).items() if fmt is not None}
+    dtype_map = {}
+    for col, dtype in plan_dtypes(sample).items():
+        if col in time_formats:
+            continue
+        # Целые C-парсер pandas не проверяет на переполнение (значение молча
+        # заворачивается), поэтому они сужаются по фактическому диапазону каждого блока
+        if dtype == 'category' or dtype == np.dtype(np.float32):
+            dtype_map[col] = dtype
+    return dtype_map, time_formats
+
+
+def _narrow_int_columns(chunk):
+    for col in chunk.select_dtypes(include=['integer']).columns:
+        if len(chunk) and chunk[col].dtype.kind in 'iu':
+            target = smallest_int_dtype(chunk[col].min(), chunk[col].max())
+            if target is not None:
+                chunk[col] = chunk[col].astype(target)
+    return chunk
+
+
+def _concat_column(parts):
+    if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+        return pd.Series(union_categoricals(parts), name=parts[0].name)
+    return pd.concat(parts, ignore_index=True)
+
+
+def read_csv_chunked(path, dtype_map, time_formats, chunksize=READ_CHUNKSIZE, progress=None, **read_kwargs):
+    read_kwargs.pop('low_memory', None)
+    columns = None
+    source = progress.open_counting(path) if progress is not None else path
+    try:
+        # Формат дат уже известен по выборке, поэтому парсер не угадывает его заново
+        with pd.read_csv(source, dtype=dtype_map or None, parse_dates=list(time_formats) or None,
+                         date_format=time_formats or None, chunksize=chunksize, **read_kwargs) as reader:
+            for chunk in reader:
+                if progress is not None:
+                    progress.check()
+                chunk = _narrow_int_columns(chunk)
+                if columns is None:
+                    columns = {col: [] for col in chunk.columns}
+                for col in chunk.columns:
+                    columns[col].append(chunk[col])
+                del chunk
+    finally:
+        if source is not path:
+            source.close()
+    if columns is None:
+        return pd.read_csv(path, dtype=dtype_map or None, **read_kwargs)
+    # Склеиваем по столбцу и сразу освобождаем блоки, чтобы пик был близок к итоговому размеру
+    result = {}
+    for col in list(columns):
+        result[col] = _concat_column(columns.pop(col))
+    return pd.DataFrame(result)
+
+
+def _column_parses(path, column, dtype, **read_kwargs):
+    read_kwargs.pop('chunksize', None)
+    read_kwargs.pop('usecols', None)
+    try:
+        pd.read_csv(path, usecols=[column], dtype={column: dtype}, **read_kwargs)
+        return True
+    except (ValueError, TypeError, OverflowError):
+        return False
+
+
+def read_csv_typed(path, dtype_map, time_formats, progress=None, **read_kwargs):
+    try:
+        return read_csv_chunked(path, dtype_map, time_formats, progress=progress, **read_kwargs)
+    except (ValueError, TypeError, OverflowError):
+        if not dtype_map:
+            raise
+    # Догадка по выборке не подошла для всего файла: проверяем столбцы по одному
+    dtype_map = dict(dtype_map)
+    for col, dtype in list(dtype_map.items()):
+        if dtype != 'category' and not _column_parses(path, col, dtype, **read_kwargs):
+            logger.warning("Столбец %s: тип %s не подошел для всего файла, используется тип по умолчанию", col, dtype)
+            del dtype_map[col]
+    return read_csv_chunked(path, dtype_map, time_formats, progress=progress, **read_kwargs)
+
+
+def _sample_read_plan(path, dialect, usecols):
+    sample = read_csv_sample(path, dialect=dialect)
+    dtype_map, time_formats = infer_read_dtypes(sample)
+    if usecols is not None:
+        # Парсер не принимает типы и даты для столбцов, которые не читаются
+        dtype_map = {col: dtype for col, dtype in dtype_map.items() if col in usecols}
+        time_formats = {col: fmt for col, fmt in time_formats.items() if col in usecols}
+    return dtype_map, time_formats
+
+
+def read_csv_with_inferred_dtypes(path, progress=None, dialect=None, plan=None, **read_kwargs):
+    dialect = dialect or sniff_csv(path)
+    dtype_map, time_formats = plan or _sample_read_plan(path, dialect, read_kwargs.get('usecols'))
+    return read_csv_typed(path, dtype_map, time_formats, progress=progress, sep=dialect.delimiter,
+                          header=dialect.header, **read_kwargs)
+
+
+def read_csv_arrow(path, dialect, dtype_map, time_formats, usecols=None, progress=None):
+    # Многопоточный парсер Arrow; типы из выборки передаются ему так же, как C-парсеру pandas
+    # Без заголовка выборка нумерует столбцы с нуля, а Arrow называет их f0, f1, ...
+    arrow_name = str if dialect.has_header else (lambda col: f"f{col}")
+    column_types = {}
+    for col, dtype in dtype_map.items():
+        column_types[arrow_name(col)] = pa.dictionary(pa.int32(), pa.string()) if dtype == 'category' \
+            else pa.float32()
+    for col in time_formats:
+        # Формат дат угадан по выборке и может не подойти отдельным значениям; тип timestamp в Arrow
+        # сорвал бы чтение всего файла, поэтому даты читаются строками и разбираются после с NaT для ошибок
+        column_types[arrow_name(col)] = pa.string()
+    read_options = pa_csv.ReadOptions(use_threads=True, autogenerate_column_names=not dialect.has_header)
+    parse_options = pa_csv.ParseOptions(delimiter=dialect.delimiter)
+    convert_options = pa_csv.ConvertOptions(column_types=column_types, include_columns=usecols,
+                                            strings_can_be_null=True)
+    source = progress.open_counting(path, check=True) if progress is not None else str(path)
+    try:
+        table = pa_csv.read_csv(source, read_options=read_options, parse_options=parse_options,
+                                convert_options=convert_options)
+    finally:
+        if progress is not None:
+            source.close()
+    data = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    if not dialect.has_header:
+        data.columns = pd.RangeIndex(len(data.columns))
+    for col, fmt in time_formats.items():
+        data[col] = to_datetime_column(data[col], fmt)
+    return _narrow_int_columns(data)
+
+
+def read_csv_fast(path, progress=None, usecols=None):
+    # Заголовок и разделитель известны заранее, поэтому файл не разбирается повторно с другими параметрами;
+    # C-парсер pandas нужен, только если pyarrow не установлен или не смог разобрать файл
+    path = Path(path)
+    started = time.perf_counter()
+    dialect = sniff_csv(path)
+    if not dialect.has_header:
+        usecols = None
+    dtype_map, time_formats = _sample_read_plan(path, dialect, usecols)
+    data = None
+    engine = 'pyarrow'
+    if pa is not None:
+        try:
+            data = read_csv_arrow(path, dialect, dtype_map, time_formats, usecols=usecols, progress=progress)
+        except AnalysisCancelled:
+            raise
+        except (pa.ArrowException, ValueError, TypeError) as e:
+            logger.warning("pyarrow не смог разобрать %s, используется парсер pandas: %s", path.name, e)
+    if data is None:
+        engine = 'pandas'
+        data = read_csv_with_inferred_dtypes(path, progress, dialect, plan=(dtype_map, time_formats),
+                                             usecols=usecols, low_memory=False)
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    size_mb = path.stat().st_size / 1024 / 1024
+    logger.info("Чтение CSV %s: движок %s, %.1f MB за %.2f с (%.1f MB/s)",
+                path.name, engine, size_mb, elapsed, size_mb / elapsed)
+    return data
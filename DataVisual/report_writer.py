@@ -0,0 +1,239 @@
+import base64
+import gzip
+import html
+import json
+import uuid
+import numpy as np
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+from plotly.utils import PlotlyJSONEncoder
+
+# Короткие массивы выгоднее оставить обычным JSON
+TYPED_ARRAY_MIN_LENGTH = 16
+# Массивы вида {dtype, bdata} plotly.js раскодирует начиная с этой версии
+TYPED_ARRAY_MIN_PLOTLYJS = (2, 28)
+_TYPED_DTYPES = {
+    'int8': 'i1', 'uint8': 'u1', 'int16': 'i2', 'uint16': 'u2',
+    'int32': 'i4', 'uint32': 'u4', 'float32': 'f4', 'float64': 'f8',
+}
+
+# Раскодирует спецификацию графика (при необходимости распаковывает gzip средствами браузера) и рисует его.
+# В ленивом режиме график строится, только когда его контейнер приближается к области просмотра
+LOADER_JS = """
+async function dvLoadFigure(el) {
+    if (el.dataset.loaded) {
+        return;
+    }
+    el.dataset.loaded = '1';
+    var node = document.getElementById(el.dataset.spec);
+    var text = node.textContent;
+    try {
+        if (node.dataset.encoding === 'gzip') {
+            if (!('DecompressionStream' in window)) {
+                throw new Error('браузер не поддерживает распаковку gzip (DecompressionStream)');
+            }
+            var bytes = Uint8Array.from(atob(text), function (c) { return c.charCodeAt(0); });
+            var stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            text = await new Response(stream).text();
+        }
+        var spec = JSON.parse(text);
+        await Plotly.newPlot(el, spec.data, spec.layout, {responsive: true});
+    } catch (e) {
+        // Без сообщения график остался бы пустым, а ошибка — только в консоли браузера
+        el.style.height = 'auto';
+        el.textContent = 'Не удалось построить график: ' + e.message +
+            '. Сохраните отчет без сжатия или откройте его в более новом браузере.';
+    }
+}
+(function () {
+    var figures = document.querySelectorAll('.dv-figure');
+    if (!DV_LAZY || !('IntersectionObserver' in window)) {
+        figures.forEach(dvLoadFigure);
+        return;
+    }
+    var observer = new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (entry.isIntersecting) {
+                observer.unobserve(entry.target);
+                dvLoadFigure(entry.target);
+            }
+        });
+    }, {rootMargin: '300px 0px'});
+    figures.forEach(function (el) { observer.observe(el); });
+})();
+"""
+
+REPORT_STYLE = """
+            <style>
+                body {
+                    font-family: Arial, sans-serif;
+                    margin: 20px;
+                    line-height: 1.6;
+                }
+                h1, h2 {
+                    color: #2b5278;
+                    margin-bottom: 15px;
+                }
+                .report-header {
+                    background-color: #f5f5f5;
+                    padding: 20px;
+                    border-radius: 5px;
+                    margin-bottom: 20px;
+                }
+                .plot-container {
+                    margin: 30px 0;
+                    border: 1px solid #e0e0e0;
+                    border-radius: 5px;
+                    padding: 15px;
+                    background-color: #f9f9f9;
+                }
+                .plot-title {
+                    font-size: 18px;
+                    font-weight: bold;
+                    margin-bottom: 15px;
+                    color: #2b5278;
+                }
+                .plotly-graph-div {
+                    width: 100%;
+                    height: 600px;
+                }
+                table {
+                    width: 100%;
+                    border-collapse: collapse;
+                    margin: 15px 0;
+                }
+                th, td {
+                    border: 1px solid #ddd;
+                    padding: 8px;
+                    text-align: left;
+                }
+                th {
+                    background-color: #f2f2f2;
+                }
+                .report-toc ol {
+                    columns: 2;
+                }
+            </style>
+"""
+
+
+def encode_typed_array(values):
+    arr = np.asarray(values)
+    if arr.ndim not in (1, 2) or arr.size < TYPED_ARRAY_MIN_LENGTH:
+        return None
+    if arr.dtype.kind in 'iu' and arr.dtype.itemsize == 8:
+        # В plotly.js нет 64-битных целых массивов
+        fits = arr.size and np.iinfo(np.int32).min <= arr.min() and arr.max() <= np.iinfo(np.int32).max
+        arr = arr.astype(np.int32 if fits else np.float64)
+    elif arr.dtype.kind == 'f' and arr.dtype.itemsize == 2:
+        arr = arr.astype(np.float32)
+    code = _TYPED_DTYPES.get(arr.dtype.name)
+    if code is None:
+        return None
+    arr = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder('<'))
+    spec = {'dtype': code, 'bdata': base64.b64encode(arr.tobytes()).decode('ascii')}
+    if arr.ndim == 2:
+        spec['shape'] = f"{arr.shape[0]},{arr.shape[1]}"
+    return spec
+
+
+def _encode_arrays(value):
+    if isinstance(value, dict):
+        return {key: _encode_arrays(item) for key, item in value.items()}
+    if isinstance(value, np.ndarray) or (isinstance(value, (list, tuple)) and len(value) >= TYPED_ARRAY_MIN_LENGTH
+                                         and all(isinstance(item, (int, float)) and not isinstance(item, bool)
+                                                 for item in value)):
+        encoded = encode_typed_array(value)
+        if encoded is not None:
+            return encoded
+    if isinstance(value, (list, tuple)):
+        return [_encode_arrays(item) for item in value]
+    return value
+
+
+def plotlyjs_supports_typed_arrays(version=None):
+    version = version or get_plotlyjs_version()
+    try:
+        return tuple(int(part) for part in version.split('.')[:2]) >= TYPED_ARRAY_MIN_PLOTLYJS
+    except ValueError:
+        return False
+
+
+def figure_spec_json(fig, typed_arrays=True):
+    spec = fig.to_plotly_json()
+    data = spec.get('data', [])
+    if typed_arrays:
+        data = [_encode_arrays(trace) for trace in data]
+    spec = {'data': data, 'layout': spec.get('layout', {})}
+    # '</' внутри <script> закрыл бы тег раньше времени
+    return json.dumps(spec, cls=PlotlyJSONEncoder, separators=(',', ':')).replace('</', '<\\/')
+
+
+class ReportWriter:
+    def __init__(self, compress=False, plotlyjs='inline', lazy=False):
+        if plotlyjs not in ('inline', 'cdn'):
+            raise ValueError(f"Неизвестный способ подключения plotly.js: {plotlyjs}")
+        # Сжатие gzip уменьшает отчет, но требует DecompressionStream в браузере, поэтому включается явно
+        self.compress = compress
+        self.plotlyjs = plotlyjs
+        self.lazy = lazy
+        # Старый plotly.js молча нарисовал бы пустые графики, поэтому для него массивы пишутся обычным JSON
+        self.typed_arrays = plotlyjs_supports_typed_arrays()
+
+    def head_html(self):
+        # plotly.js подключается один раз на весь отчет; inline работает без доступа к сети
+        if self.plotlyjs == 'cdn':
+            return f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>'
+        return f'<script type="text/javascript">{get_plotlyjs()}</script>'
+
+    def loader_html(self):
+        return f'<script type="text/javascript">var DV_LAZY = {"true" if self.lazy else "false"};{LOADER_JS}</script>'
+
+    def toc_html(self, titles):
+        items = "".join(f'<li><a href="#dv-fig-{i}-box">{html.escape(str(title))}</a></li>'
+                        for i, title in enumerate(titles, 1))
+        return f'<div class="report-toc"><h2>Содержание</h2><ol>{items}</ol></div>'
+
+    def write(self, f, title, header_html, figures, toc_titles=None):
+        f.write(f"""
+        <!DOCTYPE html>
+        <html lang="ru">
+        <head>
+            <meta charset="UTF-8">
+            <title>{html.escape(title)}</title>
+            {self.head_html()}
+            {REPORT_STYLE}
+        </head>
+        <body>
+            {header_html}
+""")
+        if toc_titles:
+            f.write(self.toc_html(toc_titles))
+        for i, (fig_title, fig) in enumerate(figures, 1):
+            if i > 1:
+                f.write("<hr>")
+            try:
+                f.write(self.figure_html(fig, fig_title, f"dv-fig-{i}"))
+            except Exception as e:
+                print(f"Ошибка конвертации графика: {str(e)}")
+            del fig
+        f.write(f"""
+            {self.loader_html()}
+        </body>
+        </html>
+""")
+
+    def figure_html(self, fig, title, fig_id=None):
+        fig_id = fig_id or f"dv-fig-{uuid.uuid4().hex[:12]}"
+        payload = figure_spec_json(fig, self.typed_arrays)
+        if self.compress:
+            payload = base64.b64encode(gzip.compress(payload.encode('utf-8'), mtime=0)).decode('ascii')
+            spec_tag = f'<script type="text/plain" id="{fig_id}-spec" data-encoding="gzip">{payload}</script>'
+        else:
+            spec_tag = f'<script type="application/json" id="{fig_id}-spec">{payload}</script>'
+        return f"""
+                <div class="plot-container" id="{fig_id}-box">
+                    <div class="plot-title">{html.escape(str(title))}</div>
+                    <div class="dv-figure plotly-graph-div" id="{fig_id}" data-spec="{fig_id}-spec"></div>
+                    {spec_tag}
+                </div>
+            """
@@ -0,0 +1,125 @@
+import csv
+import io
+from pathlib import Path
+import pandas as pd
+from time_detection import detect_time_formats
+from excel_readers import read_excel
+
+SAMPLE_HEAD_ROWS = 1000
+SAMPLE_CHUNKS = 8
+SAMPLE_CHUNK_ROWS = 100
+# Заголовок и разделитель определяются по началу файла до разбора
+SNIFF_BYTES = 16 * 1024
+CSV_DELIMITERS = ',;\t|'
+
+
+class DataSchema:
+    def __init__(self, columns, dtypes, numeric_cols, category_cols, time_formats, sample_rows, sampled=True):
+        self.columns = columns
+        self.dtypes = dtypes
+        self.numeric_cols = numeric_cols
+        self.category_cols = category_cols
+        self.time_formats = time_formats
+        self.time_cols = list(time_formats)
+        self.sample_rows = sample_rows
+        self.sampled = sampled
+
+    @classmethod
+    def from_frame(cls, frame, sampled=True):
+        return cls(
+            columns=frame.columns.tolist(),
+            dtypes={col: str(dtype) for col, dtype in frame.dtypes.items()},
+            numeric_cols=frame.select_dtypes(include=['number']).columns.tolist(),
+            category_cols=frame.select_dtypes(include=['category', 'object']).columns.tolist(),
+            time_formats=detect_time_formats(frame),
+            sample_rows=len(frame),
+            sampled=sampled
+        )
+
+    def __repr__(self):
+        return (f"DataSchema(columns={len(self.columns)}, numeric={len(self.numeric_cols)}, "
+                f"category={len(self.category_cols)}, time={len(self.time_cols)}, sample_rows={self.sample_rows})")
+
+
+class CsvDialect:
+    def __init__(self, delimiter=',', has_header=True):
+        self.delimiter = delimiter
+        self.has_header = has_header
+
+    @property
+    def header(self):
+        return 0 if self.has_header else None
+
+    def __repr__(self):
+        return f"CsvDialect(delimiter={self.delimiter!r}, has_header={self.has_header})"
+
+
+def _is_number(value):
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _first_row_is_data(rows):
+    # csv.Sniffer.has_header ошибается на чисто текстовых файлах, поэтому заголовок предполагается всегда;
+    # файл считается безымянным, только если первая строка числовая там же, где числовые строки под ней
+    first, body = rows[0], rows[1:]
+    numeric = [i for i in range(len(first))
+               if any(i < len(row) and row[i] for row in body)
+               and all(_is_number(row[i]) for row in body if i < len(row) and row[i])]
+    return bool(numeric) and all(first[i] and _is_number(first[i]) for i in numeric)
+
+
+def sniff_csv(path, nbytes=SNIFF_BYTES):
+    with open(path, 'rb') as f:
+        prefix = f.read(nbytes)
+    # Последняя строка может быть обрезана — отбрасываем ее
+    if len(prefix) == nbytes and b'\n' in prefix:
+        prefix = prefix[:prefix.rindex(b'\n') + 1]
+    text = prefix.decode('utf-8', errors='replace')
+    try:
+        delimiter = csv.Sniffer().sniff(text, delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        delimiter = ','
+    rows = [row for row in csv.reader(io.StringIO(text), delimiter=delimiter) if row]
+    has_header = len(rows) < 2 or not _first_row_is_data(rows)
+    return CsvDialect(delimiter, has_header)
+
+
+def read_csv_sample(path, head_rows=SAMPLE_HEAD_ROWS, chunks=SAMPLE_CHUNKS, chunk_rows=SAMPLE_CHUNK_ROWS,
+                    dialect=None):
+    path = Path(path)
+    dialect = dialect or sniff_csv(path)
+    size = path.stat().st_size
+    lines = []
+    with open(path, 'rb') as f:
+        for _ in range(head_rows + 1):
+            line = f.readline()
+            if not line:
+                break
+            lines.append(line)
+        head_end = f.tell()
+        # Строки из середины файла: переходим на смещение, отбрасываем неполную строку
+        if head_end < size:
+            step = (size - head_end) / (chunks + 1)
+            for i in range(1, chunks + 1):
+                offset = int(head_end + step * i)
+                if offset <= f.tell():
+                    continue
+                f.seek(offset)
+                f.readline()
+                for _ in range(chunk_rows):
+                    line = f.readline()
+                    if not line:
+                        break
+                    lines.append(line)
+    if lines and not lines[-1].endswith(b'\n'):
+        lines[-1] += b'\n'
+    text = b''.join(lines).decode('utf-8', errors='replace')
+    return pd.read_csv(io.StringIO(text), sep=dialect.delimiter, header=dialect.header, on_bad_lines='skip')
+
+
+def read_excel_sample(path, head_rows=SAMPLE_HEAD_ROWS, sheet_name=0):
+    return read_excel(path, sheet_name=sheet_name, nrows=head_rows)
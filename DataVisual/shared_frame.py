@@ -0,0 +1,84 @@
+import logging
+from multiprocessing import shared_memory
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+
+def _write_table(table, view):
+    # Ссылки на буфер блока живут только внутри функции, иначе владелец не смог бы закрыть блок
+    with pa.FixedSizeBufferWriter(pa.py_buffer(view)) as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+class SharedFrame:
+    # Передача DataFrame в другой процесс без копирования: Arrow IPC в именованной разделяемой памяти
+    # (POSIX shm или Windows named shared memory, а не файл на диске); числовые столбцы получатель
+    # читает прямо из отображенных страниц.
+    # Блоком владеет опубликовавший процесс: он удаляет его, когда получатель закончил работу.
+    # Получатель держит свое отображение, пока жив набор данных, и закрывает его через release()
+    def __init__(self, name, size, shm=None):
+        self.name = name
+        # Windows и macOS округляют блок до страницы, а футер Arrow IPC ищется от конца данных
+        self.size = size
+        self._shm = shm
+
+    @staticmethod
+    def available():
+        return pa is not None
+
+    @classmethod
+    def publish(cls, frame):
+        if pa is None:
+            raise RuntimeError("Для передачи данных между процессами нужен pyarrow")
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        # Размер блока нужен заранее: сначала считаем его без записи данных
+        mock = pa.MockOutputStream()
+        with pa.ipc.new_file(mock, table.schema) as writer:
+            writer.write_table(table)
+        size = mock.size()
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shared = cls(shm.name, size, shm)
+        try:
+            _write_table(table, shm.buf)
+        except Exception:
+            shared.unlink()
+            raise
+        return shared
+
+    def attach(self):
+        self._shm = shared_memory.SharedMemory(name=self.name)
+        buffer = pa.py_buffer(self._shm.buf)[:self.size]
+        table = pa.ipc.open_file(pa.BufferReader(buffer)).read_all()
+        return table.to_pandas(split_blocks=True)
+
+    def release(self):
+        # Отображение можно закрыть, только когда на него не ссылается ни один столбец
+        if self._shm is None:
+            return True
+        try:
+            self._shm.close()
+        except BufferError:
+            return False
+        self._shm = None
+        return True
+
+    def unlink(self):
+        # Вызывает только владелец блока; ошибка не глотается молча, иначе память утекла бы незаметно
+        if self._shm is None:
+            return
+        try:
+            self._shm.close()
+        except BufferError:
+            logger.warning("Блок разделяемой памяти %s еще используется в этом процессе", self.name)
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Не удалось удалить блок разделяемой памяти %s: %s", self.name, e)
+        self._shm = None
@@ -0,0 +1,274 @@
+import numpy as np
+import pandas as pd
+from filters import filter_frame
+
+STREAM_CHUNKSIZE = 200_000
+HIST_BINS = 4096
+DISTINCT_SKETCH_SIZE = 1024
+MAX_TRACKED_CATEGORIES = 10_000
+
+
+class DistinctSketch:
+    # KMV-оценка числа уникальных значений: храним k наименьших хэшей
+    def __init__(self, k=DISTINCT_SKETCH_SIZE):
+        self.k = k
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def update(self, values):
+        if len(values) == 0:
+            return
+        hashes = pd.util.hash_array(np.asarray(values))
+        self.hashes = np.unique(np.concatenate([self.hashes, hashes]))[:self.k]
+
+    def merge(self, other):
+        self.hashes = np.unique(np.concatenate([self.hashes, other.hashes]))[:self.k]
+
+    @property
+    def estimate(self):
+        if len(self.hashes) < self.k:
+            return len(self.hashes)
+        return int((self.k - 1) / (float(self.hashes[-1]) / 2.0 ** 64))
+
+
+class NumericAccumulator:
+    def __init__(self, bins=HIST_BINS):
+        self.count = 0
+        self.missing = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.bins = bins
+        self.lo = None
+        self.width = None
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.distinct = DistinctSketch()
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        valid = values[np.isfinite(values)]
+        self.missing += len(values) - len(valid)
+        if len(valid) == 0:
+            return
+        batch_mean = valid.mean()
+        batch_m2 = ((valid - batch_mean) ** 2).sum()
+        self._merge_moments(len(valid), batch_mean, batch_m2)
+        self.min = min(self.min, valid.min())
+        self.max = max(self.max, valid.max())
+        self._add_to_histogram(valid, np.ones(len(valid), dtype=np.int64))
+        self.distinct.update(valid)
+
+    def merge(self, other):
+        self.missing += other.missing
+        if other.count == 0:
+            return
+        self._merge_moments(other.count, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        nonzero = other.counts > 0
+        centers = other.lo + other.width * (np.arange(other.bins) + 0.5)
+        self._add_to_histogram(np.clip(centers[nonzero], other.min, other.max), other.counts[nonzero])
+        self.distinct.merge(other.distinct)
+
+    def _merge_moments(self, n_b, mean_b, m2_b):
+        # Объединение моментов по Чану (параллельный вариант Уэлфорда)
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * n_a * n_b / n
+        self.count = n
+
+    def _add_to_histogram(self, values, weights):
+        v_min, v_max = values.min(), values.max()
+        if self.lo is None:
+            self.lo = v_min
+            self.width = (v_max - v_min) / self.bins if v_max > v_min else 1.0
+        while v_min < self.lo:
+            self._grow(left=True)
+        while v_max > self.lo + self.width * self.bins:
+            self._grow(left=False)
+        idx = np.clip(((values - self.lo) / self.width).astype(np.int64), 0, self.bins - 1)
+        self.counts += np.bincount(idx, weights=weights, minlength=self.bins).astype(np.int64)
+
+    def _grow(self, left):
+        # Удваиваем ширину корзин, попарно сливая соседние
+        merged = self.counts.reshape(-1, 2).sum(axis=1)
+        counts = np.zeros(self.bins, dtype=np.int64)
+        half = self.bins // 2
+        if left:
+            counts[half:] = merged
+            self.lo -= self.width * self.bins
+        else:
+            counts[:half] = merged
+        self.counts = counts
+        self.width *= 2
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.variance))
+
+    def _cumulative(self):
+        edges = self.lo + self.width * np.arange(self.bins + 1)
+        return edges, np.concatenate([[0], np.cumsum(self.counts)])
+
+    def quantile(self, q):
+        if self.count == 0:
+            return np.nan
+        if q <= 0:
+            return float(self.min)
+        if q >= 1:
+            return float(self.max)
+        edges, cumulative = self._cumulative()
+        value = np.interp(q * self.count, cumulative, edges)
+        return float(np.clip(value, self.min, self.max))
+
+    def histogram(self, bins=10):
+        if self.count == 0:
+            return np.array([]), np.array([])
+        if self.max == self.min:
+            return np.array([self.min - 0.5, self.max + 0.5]), np.array([self.count])
+        edges = np.linspace(self.min, self.max, bins + 1)
+        # Мелкие корзины делятся между крупными пропорционально перекрытию
+        fine_edges, cumulative = self._cumulative()
+        at_edges = np.rint(np.interp(edges, fine_edges, cumulative)).astype(np.int64)
+        at_edges[0], at_edges[-1] = 0, self.count
+        return edges, np.diff(at_edges)
+
+
+class CategoryAccumulator:
+    def __init__(self, max_categories=MAX_TRACKED_CATEGORIES):
+        self.count = 0
+        self.missing = 0
+        self.max_categories = max_categories
+        self.counts = pd.Series(dtype=np.int64)
+        self.overflow = 0
+
+    def update(self, values):
+        values = pd.Series(values)
+        counts = values.value_counts(dropna=True)
+        self.missing += len(values) - int(counts.sum())
+        self._add_counts(counts)
+
+    def merge(self, other):
+        self.missing += other.missing
+        self.overflow += other.overflow
+        self.count += other.overflow
+        self._add_counts(other.counts)
+
+    def _add_counts(self, counts):
+        counts = counts.astype(np.int64)
+        counts.index = counts.index.astype(str)
+        self.count += int(counts.sum())
+        self.counts = self.counts.add(counts, fill_value=0).astype(np.int64)
+        if len(self.counts) > self.max_categories:
+            self.counts = self.counts.sort_values(ascending=False)
+            self.overflow += int(self.counts.iloc[self.max_categories:].sum())
+            self.counts = self.counts.iloc[:self.max_categories]
+
+    @property
+    def unique(self):
+        return len(self.counts)
+
+    def top(self, n=10):
+        return self.counts.sort_values(ascending=False).head(n)
+
+
+class GroupMeanAccumulator:
+    def __init__(self, category_column, numeric_column):
+        self.category_column = category_column
+        self.numeric_column = numeric_column
+        self.sums = pd.Series(dtype=np.float64)
+        self.counts = pd.Series(dtype=np.int64)
+
+    def update(self, chunk):
+        values = pd.to_numeric(chunk[self.numeric_column], errors='coerce')
+        keys = chunk[self.category_column].astype(str).where(chunk[self.category_column].notna())
+        grouped = values.groupby(keys, observed=True).agg(['sum', 'count'])
+        self._add(grouped['sum'], grouped['count'])
+
+    def merge(self, other):
+        self._add(other.sums, other.counts)
+
+    def _add(self, sums, counts):
+        self.sums = self.sums.add(sums, fill_value=0)
+        self.counts = self.counts.add(counts, fill_value=0).astype(np.int64)
+
+    @property
+    def means(self):
+        return (self.sums / self.counts.where(self.counts > 0)).dropna()
+
+
+class StreamingStats:
+    def __init__(self):
+        self.rows = 0
+        self.columns = []
+        self.dtypes = {}
+        self.numeric = {}
+        self.categorical = {}
+        self.group = None
+
+    @property
+    def numeric_cols(self):
+        return list(self.numeric)
+
+    @property
+    def category_cols(self):
+        return list(self.categorical)
+
+    def update(self, chunk):
+        if not self.columns:
+            self._init_columns(chunk)
+        self.rows += len(chunk)
+        for col, acc in self.numeric.items():
+            acc.update(pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan))
+        for col, acc in self.categorical.items():
+            acc.update(chunk[col])
+        if self.group is not None:
+            self.group.update(chunk)
+
+    def merge(self, other):
+        if not self.columns:
+            self.columns = list(other.columns)
+            self.dtypes = dict(other.dtypes)
+            self.numeric = {col: NumericAccumulator() for col in other.numeric}
+            self.categorical = {col: CategoryAccumulator() for col in other.categorical}
+            if other.group is not None:
+                self.group = GroupMeanAccumulator(other.group.category_column, other.group.numeric_column)
+        self.rows += other.rows
+        for col, acc in other.numeric.items():
+            self.numeric[col].merge(acc)
+        for col, acc in other.categorical.items():
+            self.categorical[col].merge(acc)
+        if self.group is not None and other.group is not None:
+            self.group.merge(other.group)
+
+    def _init_columns(self, chunk):
+        self.columns = chunk.columns.tolist()
+        self.dtypes = {col: str(dtype) for col, dtype in chunk.dtypes.items()}
+        for col in chunk.select_dtypes(include=['number']).columns:
+            self.numeric[col] = NumericAccumulator()
+        for col in chunk.select_dtypes(include=['category', 'object']).columns:
+            self.categorical[col] = CategoryAccumulator()
+        if self.numeric and self.categorical:
+            self.group = GroupMeanAccumulator(self.category_cols[0], self.numeric_cols[0])
+
+    @classmethod
+    def from_csv(cls, path, chunksize=STREAM_CHUNKSIZE, query=None, progress=None, **read_kwargs):
+        stats = cls()
+        source = progress.open_counting(path) if progress is not None else path
+        try:
+            with pd.read_csv(source, chunksize=chunksize, **read_kwargs) as reader:
+                for chunk in reader:
+                    if progress is not None:
+                        progress.check()
+                    chunk = filter_frame(chunk, query)
+                    stats.update(chunk)
+        finally:
+            if source is not path:
+                source.close()
+        return stats
@@ -0,0 +1,70 @@
+import re
+import warnings
+import numpy as np
+import pandas as pd
+
+PROBE_ROWS = 200
+TIME_MATCH_RATIO = 0.9
+TIME_FORMATS = [
+    'ISO8601',
+    '%d.%m.%Y %H:%M:%S',
+    '%d.%m.%Y %H:%M',
+    '%d.%m.%Y',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y/%m/%d',
+    '%d-%m-%Y',
+    '%H:%M:%S',
+]
+# Дешевая проверка до вызова to_datetime: цифры, разделенные - / . : или пробелом
+_TIME_LIKE = re.compile(r'^\s*\d{1,4}[-/.:]\d{1,2}([-/.:T ]\S*)*\s*$')
+
+
+def _probe_values(series, rows=PROBE_ROWS):
+    # Берем равномерную позиционную выборку, чтобы не проходить по всему столбцу
+    if len(series) > rows * 5:
+        series = series.iloc[np.linspace(0, len(series) - 1, rows * 5).astype(int)]
+    values = series.dropna()
+    return values.iloc[::max(1, len(values) // rows)].astype(str)
+
+
+def probe_time_format(series, rows=PROBE_ROWS):
+    values = _probe_values(series, rows)
+    if values.empty or values.str.match(_TIME_LIKE).mean() < TIME_MATCH_RATIO:
+        return None
+    for fmt in TIME_FORMATS:
+        parsed = pd.to_datetime(values, format=fmt, errors='coerce')
+        if parsed.notna().mean() >= TIME_MATCH_RATIO:
+            return fmt
+    return None
+
+
+def detect_time_formats(frame, rows=PROBE_ROWS):
+    formats = {}
+    for col in frame.columns:
+        series = frame[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            formats[col] = None
+        elif pd.api.types.is_object_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+            fmt = probe_time_format(series, rows)
+            if fmt is not None:
+                formats[col] = fmt
+    return formats
+
+
+def to_datetime_column(series, fmt):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Преобразуем только уникальные значения и раскладываем по кодам
+        categories = pd.to_datetime(series.cat.categories.astype(str), format=fmt, errors='coerce')
+        values = categories.take(series.cat.codes.to_numpy(), allow_fill=True, fill_value=pd.NaT)
+        return pd.Series(values, index=series.index, name=series.name)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return pd.to_datetime(series, format=fmt, errors='coerce')
@@ -4,122 +4,456 @@ import plotly.express as px
 from datetime import datetime
 import numpy as np
 import tempfile
+import threading
 import webbrowser
 from pathlib import Path
+from dataset_cache import get_dataset_cache, file_fingerprint, read_fingerprint, file_version
+from columnar_cache import get_columnar_cache
+from dtype_plan import plan_dtypes, apply_dtype_plan, PeakRSSMonitor
+from readers import read_csv_fast
+from columnar_readers import columnar_format, supports_pushdown, read_columnar, read_columnar_sample
+from column_plan import plan_columns
+from time_detection import detect_time_formats, to_datetime_column
+from figure_executor import FigureExecutor
+from figure_cache import get_figure_cache
+from progress import Progress, AnalysisCancelled
+from filters import FilterEngine, filter_frame
+from grouping import group_column, subsample, kde_curve
+from correlation import correlation_matrix
+from report_writer import ReportWriter
+from decimation import DEFAULT_POINT_BUDGETS, DENSITY_FACTOR, lttb, stratified_sample, density_grid, points_note
+from schema import DataSchema, read_csv_sample, read_excel_sample, sniff_csv, SAMPLE_HEAD_ROWS
+from excel_readers import read_excel
+from streaming_stats import StreamingStats, STREAM_CHUNKSIZE
+
+MAX_BOX_OUTLIERS = 1000
+# С этого числа графиков отчет по умолчанию строит графики при прокрутке и получает оглавление
+LAZY_REPORT_MIN_FIGURES = 6
+VIOLIN_MAX_POINTS = 5000
 
 class UnifiedBrowserVisualizer:
-    def __init__(self, file_path):
+    STREAMING_OPTIONS = ("data_info", "histograms", "boxplot", "bar_chart", "pie_chart")
+    STREAMING_BUILDERS = ("add_data_info", "add_histogram", "add_boxplot", "add_bar_chart", "add_pie_chart")
+    def __init__(self, file_path, use_cache=True, load=True, streaming=False, chunksize=STREAM_CHUNKSIZE,
+                 stream_query=None, max_workers=None, point_budgets=None, progress_callback=None, cancel_event=None,
+                 columns=None, sheet_name=0):
         self.file_path = file_path
+        self.sheet_name = sheet_name
+        self.columns = list(columns) if columns is not None else None
+        self.use_cache = use_cache
+        self.streaming = streaming
+        self.chunksize = chunksize
+        self.stream_query = stream_query
         self.data = None
+        self.stats = None
+        self.dataset = None
+        self.fingerprint = None
+        self.filter_condition = None
+        self.loaded_data = None
+        self._filter_engine = FilterEngine()
+        self._scope_owner = None
+        self._meta = {}
+        self._memo_owner = None
+        self._memo_store = {}
+        self._memo_lock = threading.Lock()
+        self._memo_key_locks = {}
+        self.violin_mode = 'sample'
+        self.correlation_method = 'pearson'
+        self.correlation_sample_rows = None
+        self.memory_report = None
+        self.peak_rss = None
+        self.max_workers = max_workers
+        self.point_budgets = dict(DEFAULT_POINT_BUDGETS, **(point_budgets or {}))
         self.figures = []
-        self.load_data()
-    def load_data(self):
+        self._figure_sink = threading.local()
+        self.progress = Progress(progress_callback, cancel_event)
+        self._progress_lock = threading.Lock()
+        self._figures_done = 0
+        self._figures_total = 0
+        if load:
+            self.load_data()
+    def sniff_schema(self, head_rows=SAMPLE_HEAD_ROWS):
         path = Path(self.file_path)
         if not path.exists():
             raise FileNotFoundError(f"Файл '{self.file_path}' не найден")
+        if self.data is not None:
+            return DataSchema.from_frame(self.data, sampled=False)
+        if self.use_cache:
+            fingerprint = read_fingerprint(file_fingerprint(path), sheet_name=self.sheet_name)
+            entry = get_dataset_cache().get(path, fingerprint)
+            if entry is not None:
+                return DataSchema.from_frame(entry.data, sampled=False)
         if path.suffix == '.csv':
-            with open(path, 'r', encoding='utf-8') as f:
-                first_lines = [next(f) for _ in range(100)]
-            try:
-                self.data = pd.read_csv(path, low_memory=False)
-            except:
-                self.data = pd.read_csv(path, header=None, low_memory=False)
+            sample = read_csv_sample(path, head_rows=head_rows)
         elif path.suffix in ['.xlsx', '.xls']:
-            self.data = pd.read_excel(path)
+            sample = read_excel_sample(path, head_rows=head_rows, sheet_name=self.sheet_name)
+        elif columnar_format(path):
+            sample = read_columnar_sample(path, head_rows)
         else:
-            raise ValueError("Неподдерживаемый формат файла. Используйте CSV или Excel.")
+            raise ValueError("Неподдерживаемый формат файла. Используйте CSV, Excel, Parquet, Feather или JSONL.")
+        return DataSchema.from_frame(sample)
+    def load_data(self):
+        path = Path(self.file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Файл '{self.file_path}' не найден")
+        if self.use_cache:
+            self.fingerprint = file_fingerprint(path)
+        if self.streaming and path.suffix == '.csv':
+            self._load_streaming(path)
+            self.filter_condition = self.stream_query
+            self._scope_owner = self.stats
+            return
+        # Parquet, Feather и JSONL читаются сразу с фильтром: в памяти оказываются только нужные строки
+        pushdown = supports_pushdown(path) and self.stream_query or None
+        if self.use_cache:
+            self.fingerprint = read_fingerprint(self.fingerprint, self.columns, pushdown, self.sheet_name)
+        # Parquet и Feather сами столбцовые, в кэш на диске сохраняются только CSV, Excel и JSONL
+        self._load_frame(path, persist=columnar_format(path) in (None, 'json'),
+                         projectable=self.columns is not None)
+        self.loaded_data = self.data
+        self.filter_condition = pushdown
+        self._scope_owner = self.data
+    def adopt_data(self, data, fingerprint=None, columns=None):
+        # Данные уже загружены в другом месте (например, переданы из другого процесса);
+        # columns — если это проекция, а не полный набор
+        self.columns = list(columns) if columns is not None else None
+        self.data = data
+        self.loaded_data = data
+        self.fingerprint = fingerprint
+        self.filter_condition = None
+        self._scope_owner = data
+        if self.use_cache and fingerprint is not None:
+            self.dataset = get_dataset_cache().put(self.file_path, data, fingerprint)
+    def _load_frame(self, path, persist=True, projectable=False):
+        fingerprint = self.fingerprint
+        if self.use_cache:
+            cache = get_dataset_cache()
+            self.dataset = cache.get(path, fingerprint)
+            if self.dataset is not None:
+                self.data = self.dataset.data
+                return
+            # Столбцовый кэш на диске уже хранит типы, подобранные optimize_memory
+            data = get_columnar_cache().load(fingerprint) if persist else None
+            if data is None and projectable:
+                data = self._project_cached_dataset(path, persist)
+            if data is not None:
+                self.data = data
+                self.dataset = cache.put(path, self.data, fingerprint)
+                return
+        self._read_file(path)
         self.optimize_memory()
+        if self.use_cache:
+            if persist:
+                get_columnar_cache().save(fingerprint, self.data)
+            self.dataset = cache.put(path, self.data, fingerprint)
+    def _project_cached_dataset(self, path, persist):
+        # Нужные столбцы уже есть в более широком чтении тех же строк этой версии файла (в памяти или на диске):
+        # берем их оттуда, а не разбираем файл заново, и еще одну копию на диск не сохраняем
+        columns, condition, sheet_name = self.fingerprint[4]
+        wanted = set(columns)
+        for entry in get_dataset_cache().versions_of(self.fingerprint):
+            variant = entry.fingerprint[4] if len(entry.fingerprint) > 4 else (None, None, 0)
+            if variant[1:] == (condition, sheet_name) and wanted <= set(entry.data.columns):
+                return entry.data[[col for col in entry.data.columns if col in wanted]]
+        if persist:
+            return get_columnar_cache().load_subset(self.fingerprint)
+        return None
+    def extend_columns(self, columns, complete=False):
+        # Дочитывает к частично загруженному набору недостающие столбцы, не разбирая заново уже загруженные.
+        # columns — итоговый список в порядке файла, включая загруженные; complete — это все столбцы файла
+        if self.columns is None or self.loaded_data is None:
+            return
+        loaded = self.loaded_data
+        missing = [col for col in columns if col not in loaded.columns]
+        if not missing:
+            return
+        self.columns = missing
+        self.load_data()
+        added = self.loaded_data
+        # Столбцы склеиваются без копирования: блоки обоих наборов переходят в новый как есть
+        data = pd.concat([loaded[col] if col in loaded.columns else added[col] for col in columns],
+                         axis=1, copy=False)
+        self.columns = None if complete else list(columns)
+        if self.use_cache:
+            self.fingerprint = read_fingerprint(file_version(self.fingerprint), self.columns,
+                                                self.filter_condition, self.sheet_name)
+            self.dataset = get_dataset_cache().put(self.file_path, data, self.fingerprint)
+        self.data = data
+        self.loaded_data = data
+        self._scope_owner = data
+    def plan_columns(self, options, filter_condition=None):
+        # Какие столбцы понадобятся выбранным графикам и фильтру; определяется по выборке до загрузки
+        return plan_columns(self.sniff_schema(), options, filter_condition)
+    def apply_filter(self, condition):
+        # Фильтр применяется к загруженным данным, а не поверх предыдущего фильтра; маски
+        # типизированного FilterSpec кэшируются по условиям, поэтому смена одного условия пересчитывает только его
+        if (condition or None) == self.filter_condition and self.data is not None and self._scope_owner is self.data:
+            # Это условие уже применено (в том числе при чтении Parquet/Feather/JSONL)
+            return
+        source = self.loaded_data if self.loaded_data is not None else self.data
+        self.data = filter_frame(source, condition, self._filter_engine)
+        self.filter_condition = condition or None
+        self._scope_owner = self.data
+    def _load_streaming(self, path):
+        # Полный DataFrame не строится: за один проход копятся только статистики по столбцам
+        dialect = sniff_csv(path)
+        self.stats = StreamingStats.from_csv(path, chunksize=self.chunksize, query=self.stream_query,
+                                             progress=self.progress, sep=dialect.delimiter, header=dialect.header)
+    def _read_file(self, path):
+        if path.suffix == '.csv':
+            # Типы, заголовок и разделитель определяются по выборке заранее, файл разбирается один раз
+            self.data = read_csv_fast(path, progress=self.progress, usecols=self.columns)
+        elif path.suffix in ['.xlsx', '.xls']:
+            # calamine, если установлен, иначе потоковое чтение openpyxl с прогрессом и отменой
+            self.data = read_excel(path, sheet_name=self.sheet_name, usecols=self.columns, progress=self.progress)
+        elif columnar_format(path):
+            # Читаются только нужные столбцы, а группы строк Parquet отбрасываются по статистике фильтра
+            self.data = read_columnar(path, self.columns, self.stream_query, progress=self.progress)
+        else:
+            raise ValueError("Неподдерживаемый формат файла. Используйте CSV, Excel, Parquet, Feather или JSONL.")
     def optimize_memory(self):
         if self.data is not None:
-            for col in self.data.select_dtypes(include=['object']):
-                if self.data[col].nunique() / len(self.data) < 0.5:
-                    self.data[col] = self.data[col].astype('category')
-            for col in self.data.select_dtypes(include=['int']):
-                c_min = self.data[col].min()
-                c_max = self.data[col].max()
-                if c_min > np.iinfo(np.int8).min and c_max < np.iinfo(np.int8).max:
-                    self.data[col] = self.data[col].astype(np.int8)
-                elif c_min > np.iinfo(np.int16).min and c_max < np.iinfo(np.int16).max:
-                    self.data[col] = self.data[col].astype(np.int16)
-                elif c_min > np.iinfo(np.int32).min and c_max < np.iinfo(np.int32).max:
-                    self.data[col] = self.data[col].astype(np.int32)
-                elif c_min > np.iinfo(np.int64).min and c_max < np.iinfo(np.int64).max:
-                    self.data[col] = self.data[col].astype(np.int64)
-            for col in self.data.select_dtypes(include=['float']):
-                self.data[col] = pd.to_numeric(self.data[col], downcast='float')
-    def process_data(self, options):
+            with PeakRSSMonitor() as monitor:
+                plan = plan_dtypes(self.data)
+                self.data, self.memory_report = apply_dtype_plan(self.data, plan)
+            self.peak_rss = monitor.peak_rss
+            saved = self.memory_report['BytesSaved'].sum()
+            print(f"Оптимизация памяти: сэкономлено {saved / 1024 / 1024:.2f} MB, "
+                  f"пик RSS {monitor.peak_rss / 1024 / 1024:.1f} MB")
+    def _plan_figures(self, options):
+        if self.stats is not None:
+            numeric_cols = self.stats.numeric_cols
+            category_cols = self.stats.category_cols
+            time_cols = []
+        else:
+            numeric_cols = self.data.select_dtypes(include=['number']).columns.tolist()
+            category_cols = self.data.select_dtypes(include=['category', 'object']).columns.tolist()
+            time_cols = self._detect_time_columns()
+        tasks = []
         if options.get("data_info", False):
-            self.add_data_info()
-        numeric_cols = self.data.select_dtypes(include=['number']).columns.tolist()
-        category_cols = self.data.select_dtypes(include=['category', 'object']).columns.tolist()
-        time_cols = self._detect_time_columns()
-
+            tasks.append(("add_data_info", ()))
         if options.get("histograms", False) and numeric_cols:
             for col in numeric_cols[:3]:
-                self.add_histogram(col)
+                tasks.append(("add_histogram", (col,)))
         if options.get("boxplot", False) and numeric_cols:
             for col in numeric_cols[:3]:
-                self.add_boxplot(col)
+                tasks.append(("add_boxplot", (col,)))
         if options.get("scatter", False) and len(numeric_cols) >= 2:
-            self.add_scatter(numeric_cols[0], numeric_cols[1])
+            tasks.append(("add_scatter", (numeric_cols[0], numeric_cols[1])))
         if options.get("correlation", False) and len(numeric_cols) >= 2:
-            self.add_correlation_matrix()
+            tasks.append(("add_correlation_matrix", ()))
         if options.get("line_chart", False) and numeric_cols:
-            self.add_line_chart()
+            tasks.append(("add_line_chart", ()))
         if options.get("bar_chart", False) and numeric_cols and category_cols:
-            self.add_bar_chart()
+            tasks.append(("add_bar_chart", ()))
         if options.get("pie_chart", False) and category_cols:
-            self.add_pie_chart()
+            tasks.append(("add_pie_chart", ()))
         if options.get("violin_plot", False) and numeric_cols and category_cols:
-            self.add_violin_plot()
+            tasks.append(("add_violin_plot", ()))
         if options.get("scatter_matrix", False) and len(numeric_cols) >= 2:
-            self.add_scatter_matrix()
+            tasks.append(("add_scatter_matrix", ()))
         if options.get("3d_plot", False) and len(numeric_cols) >= 3:
-            self.add_3d_plot()
+            tasks.append(("add_3d_plot", ()))
         if options.get("heatmap", False) and len(numeric_cols) >= 2:
-            self.add_heatmap()
+            tasks.append(("add_heatmap", ()))
         if options.get("radar_chart", False) and numeric_cols and category_cols:
-            self.add_radar_chart()
+            tasks.append(("add_radar_chart", ()))
         if options.get("time_series", False) and time_cols and numeric_cols:
-            self.add_time_series(time_cols[0], numeric_cols[0])
+            tasks.append(("add_time_series", (time_cols[0], numeric_cols[0])))
+        if self.stats is not None:
+            skipped = [key for key, enabled in options.items()
+                       if enabled and key not in self.STREAMING_OPTIONS and key != "all_plots"]
+            if skipped:
+                print(f"В потоковом режиме недоступны: {', '.join(skipped)}")
+            tasks = [task for task in tasks if task[0] in self.STREAMING_BUILDERS]
+        return tasks
+    def _figure_scope(self):
+        # Графики можно переиспользовать, только если данные получены из файла этим объектом.
+        # Загруженные столбцы добавляет _task_scope, и только для графиков, которым они важны
+        if self.fingerprint is None or self._scope_owner is None:
+            return None
+        if self._scope_owner is not (self.stats if self.stats is not None else self.data):
+            return None
+        return (file_version(self.fingerprint), self.sheet_name, self.filter_condition, self.stats is not None)
+    def _task_scope(self, scope, args):
+        # Построители без аргументов (сводка, корреляция, матрицы, графики по категориям) берут все
+        # загруженные столбцы, поэтому проекция входит в их область; графики по конкретным столбцам
+        # от нее не зависят и переиспользуются после дочитывания новых столбцов
+        if scope is None or args or self.stats is not None:
+            return scope
+        return scope + (tuple(self.data.columns),)
+    def _figure_params(self):
+        return (tuple(sorted(self.point_budgets.items())), self.violin_mode,
+                self.correlation_method, self.correlation_sample_rows)
+    def process_data(self, options):
+        tasks = self._plan_figures(options)
+        scope = self._figure_scope()
+        cache = get_figure_cache()
+        params = self._figure_params()
+        results = [None] * len(tasks)
+        if scope is not None:
+            results = [cache.get(cache.make_key(self._task_scope(scope, args), name, args, params))
+                       for name, args in tasks]
+        missing = [i for i, figures in enumerate(results) if figures is None]
+        self._figures_total = len(tasks)
+        self._figures_done = len(tasks) - len(missing)
+        self.progress.report('figures', self._figures_done, self._figures_total)
+        # Построители только читают self.data, поэтому их можно запускать параллельно
+        built = FigureExecutor(self.max_workers).run_tasks(self, [tasks[i] for i in missing])
+        for i, figures in zip(missing, built):
+            results[i] = figures
+            if scope is not None:
+                name, args = tasks[i]
+                cache.put(cache.make_key(self._task_scope(scope, args), name, args, params), figures)
+        if scope is not None and len(missing) < len(tasks):
+            print(f"Графиков из кэша: {len(tasks) - len(missing)}, построено заново: {len(missing)}")
+        for figures in results:
+            self.figures.extend(figures)
+    def _figure_task_done(self):
+        with self._progress_lock:
+            self._figures_done += 1
+            done = self._figures_done
+        self.progress.report('figures', done, self._figures_total)
+    def _add_figure(self, fig):
+        sink = getattr(self._figure_sink, 'figures', None)
+        (sink if sink is not None else self.figures).append(fig)
+    def _memo(self):
+        # Промежуточные результаты действительны, пока не заменен self.data (например, фильтром)
+        if self._memo_owner is not self.data:
+            self._memo_owner = self.data
+            self._memo_store = {}
+            self._memo_key_locks = {}
+        return self._memo_store
+    def _memoized(self, key, compute):
+        # Графики строятся параллельно: блокировка на ключ не дает посчитать одно и то же дважды
+        memo = self._memo()
+        with self._memo_lock:
+            lock = self._memo_key_locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in memo:
+                memo[key] = compute()
+            return memo[key]
+    def _grouped(self, cat_col, num_col, sort=False):
+        return self._memoized(('grouped', cat_col, num_col, sort), lambda: group_column(
+            self.data[cat_col], self.data[num_col].to_numpy(dtype=np.float64, na_value=np.nan), sort=sort))
+    def correlation(self, method=None, sample_rows=None):
+        method = method or self.correlation_method
+        sample_rows = sample_rows or self.correlation_sample_rows
+        numeric_cols = self.data.select_dtypes(include=['number']).columns.tolist()
+        return self._memoized(('correlation', method, tuple(numeric_cols), sample_rows), lambda: correlation_matrix(
+            self.data[numeric_cols], method=method, sample_rows=sample_rows, max_workers=self.max_workers))
+    def _time_formats(self):
+        # Результат хранится вместе с набором данных в кэше, повторные вызовы бесплатны
+        meta = self.dataset.meta if self.dataset is not None else self._meta
+        if 'time_formats' not in meta:
+            meta['time_formats'] = detect_time_formats(self.data)
+        return meta['time_formats']
     def _detect_time_columns(self):
-        time_cols = []
-        for col in self.data.columns:
-            try:
-                pd.to_datetime(self.data[col], errors='coerce')
-                time_cols.append(col)
-            except:
-                pass
-        return time_cols
+        return [col for col in self._time_formats() if col in self.data.columns]
+    def _stats_info_frame(self):
+        rows = []
+        for col in self.stats.columns:
+            row = {'Column': col, 'Type': self.stats.dtypes[col]}
+            if col in self.stats.numeric:
+                acc = self.stats.numeric[col]
+                row.update({
+                    'Missing': acc.missing,
+                    'Unique': acc.distinct.estimate,
+                    'count': acc.count,
+                    'mean': acc.mean if acc.count else np.nan,
+                    'std': acc.std,
+                    'min': acc.min if acc.count else np.nan,
+                    '25%': acc.quantile(0.25),
+                    '50%': acc.quantile(0.5),
+                    '75%': acc.quantile(0.75),
+                    'max': acc.max if acc.count else np.nan
+                })
+            elif col in self.stats.categorical:
+                acc = self.stats.categorical[col]
+                row.update({'Missing': acc.missing, 'Unique': acc.unique})
+            rows.append(row)
+        return pd.DataFrame(rows)
     def add_data_info(self):
         try:
-            info_df = pd.DataFrame({
-                'Column': self.data.columns,
-                'Type': self.data.dtypes.astype(str),
-                'Missing': self.data.isna().sum(),
-                'Unique': self.data.nunique()
-            })
-            numeric_stats = self.data.describe().transpose()
-            info_df = info_df.join(numeric_stats, on='Column', how='left')
+            if self.stats is not None:
+                info_df = self._stats_info_frame()
+            else:
+                info_df = pd.DataFrame({
+                    'Column': self.data.columns,
+                    'Type': self.data.dtypes.astype(str),
+                    'Missing': self.data.isna().sum(),
+                    'Unique': self.data.nunique()
+                })
+                numeric_stats = self.data.describe().transpose()
+                info_df = info_df.join(numeric_stats, on='Column', how='left')
             info_df = info_df.sort_values(by=['Missing', 'Unique'], ascending=[False, True])
             fig = go.Figure(data=[go.Table(
                 header=dict(values=list(info_df.columns), fill_color='paleturquoise', align='left'),
                 cells=dict(values=[info_df[col] for col in info_df.columns], fill_color='lavender', align='left')
             )])
             fig.update_layout(title='Информация о данных', margin=dict(l=10, r=10, b=10, t=50))
-            self.figures.append(fig)
+            self._add_figure(fig)
         except Exception as e:
             print(f"Ошибка при создании информации о данных: {str(e)}")
+    def _numeric_values(self, column):
+        values = self.data[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        return values[np.isfinite(values)]
+    def _box_stats(self, column):
+        if self.stats is not None:
+            acc = self.stats.numeric[column]
+            if not acc.count:
+                return None
+            q1, median, q3 = acc.quantile(0.25), acc.quantile(0.5), acc.quantile(0.75)
+            iqr = q3 - q1
+            return dict(q1=q1, median=median, q3=q3, mean=acc.mean,
+                        lowerfence=max(acc.min, q1 - 1.5 * iqr),
+                        upperfence=min(acc.max, q3 + 1.5 * iqr),
+                        outliers=np.array([]))
+        values = self._numeric_values(column)
+        if not len(values):
+            # Все значения пропущены (например, после фильтра): квартили не определены
+            return None
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        outliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+        if len(outliers) > MAX_BOX_OUTLIERS:
+            # Оставляем самые удаленные от медианы выбросы
+            outliers = outliers[np.argsort(np.abs(outliers - median))[-MAX_BOX_OUTLIERS:]]
+        return dict(q1=q1, median=median, q3=q3, mean=values.mean(),
+                    lowerfence=inside.min(), upperfence=inside.max(),
+                    outliers=outliers)
     def add_boxplot(self, column):
         try:
+            box = self._box_stats(column)
             fig = go.Figure()
+            if box is None:
+                fig.add_annotation(text=f"В столбце {column} нет числовых значений", showarrow=False,
+                                   xref='paper', yref='paper', x=0.5, y=0.5)
+                fig.update_layout(title=f'Диаграмма размаха: {column}', xaxis_visible=False, yaxis_visible=False)
+                self._add_figure(fig)
+                return
+            # Квартили и усы посчитаны здесь, в отчет попадают только они и ограниченный набор выбросов
             fig.add_trace(go.Box(
-                y=self.data[column].dropna(),
+                x=[column],
+                q1=[box['q1']],
+                median=[box['median']],
+                q3=[box['q3']],
+                lowerfence=[box['lowerfence']],
+                upperfence=[box['upperfence']],
+                mean=[box['mean']],
                 name=column,
-                boxpoints='outliers',
                 marker_color='lightblue',
                 line_color='blue'
             ))
+            if len(box['outliers']):
+                fig.add_trace(go.Scatter(
+                    x=[column] * len(box['outliers']),
+                    y=box['outliers'],
+                    mode='markers',
+                    name='Выбросы',
+                    marker=dict(color='lightblue', line=dict(color='blue', width=1))
+                ))
             fig.update_layout(
                 title=f'Диаграмма размаха: {column}',
                 yaxis_title=column,
@@ -127,30 +461,61 @@ class UnifiedBrowserVisualizer:
                 margin=dict(l=40, r=30, b=80, t=100),
                 plot_bgcolor='rgba(240,240,240,0.95)'
             )
-            self.figures.append(fig)
+            self._add_figure(fig)
         except Exception as e:
             print(f"Ошибка при создании диаграммы размаха: {str(e)}")
+    def _histogram_counts(self, column, bins):
+        if self.stats is not None:
+            return self.stats.numeric[column].histogram(bins)
+        counts, edges = np.histogram(self._numeric_values(column), bins=bins)
+        return edges, counts
     def add_histogram(self, column, bins=10):
         try:
-            fig = px.histogram(self.data, x=column, nbins=bins, title=f'Гистограмма: {column}')
+            # Корзины считаются на сервере, в отчет уходят только границы и частоты
+            edges, counts = self._histogram_counts(column, bins)
+            fig = go.Figure(go.Bar(
+                x=(edges[:-1] + edges[1:]) / 2,
+                y=counts,
+                customdata=np.column_stack([edges[:-1], edges[1:]]),
+                hovertemplate='%{customdata[0]:.4g} – %{customdata[1]:.4g}<br>Частота: %{y}<extra></extra>',
+                name=column
+            ))
             fig.update_layout(
+                title=f'Гистограмма: {column}',
                 xaxis_title=column,
                 yaxis_title='Частота',
                 bargap=0.1,
                 margin=dict(l=60, r=30, b=60, t=80)
             )
-            self.figures.append(fig)
+            self._add_figure(fig)
         except Exception as e:
             print(f"Ошибка при создании гистограммы: {str(e)}")
     def add_bar_chart(self):
         try:
+            if self.stats is not None:
+                group = self.stats.group
+                means = group.means.rename_axis(group.category_column).rename(group.numeric_column).reset_index()
+                fig = px.bar(
+                    means,
+                    x=group.category_column,
+                    y=group.numeric_column,
+                    title=f'Столбчатая диаграмма: {group.numeric_column} по {group.category_column}'
+                )
+                fig.update_layout(
+                    xaxis_title=group.category_column,
+                    yaxis_title=f'Среднее {group.numeric_column}',
+                    margin=dict(l=60, r=30, b=100, t=80)
+                )
+                self._add_figure(fig)
+                return
             numeric_cols = self.data.select_dtypes(include=['number']).columns
             category_cols = self.data.select_dtypes(include=['category', 'object']).columns
             if len(numeric_cols) >= 1 and len(category_cols) >= 1:
                 col_num = numeric_cols[0]
                 col_cat = category_cols[0]
+                labels, means = self._grouped(col_cat, col_num, sort=True).means()
                 fig = px.bar(
-                    self.data.groupby(col_cat, observed=True)[col_num].mean().reset_index(),
+                    pd.DataFrame({col_cat: labels, col_num: means}),
                     x=col_cat,
                     y=col_num,
                     title=f'Столбчатая диаграмма: {col_num} по {col_cat}'
@@ -160,18 +525,27 @@ class UnifiedBrowserVisualizer:
                     yaxis_title=f'Среднее {col_num}',
                     margin=dict(l=60, r=30, b=100, t=80)
                 )
-                self.figures.append(fig)
+                self._add_figure(fig)
         except Exception as e:
             print(f"Ошибка столбчатой диаграммы: {str(e)}")
     def add_pie_chart(self):
         try:
-            category_cols = self.data.select_dtypes(include=['category', 'object']).columns
+            if self.stats is not None:
+                category_cols = self.stats.category_cols
+            else:
+                category_cols = self.data.select_dtypes(include=['category', 'object']).columns
             if len(category_cols) >= 1:
                 col = category_cols[0]
-                counts = self.data[col].value_counts().reset_index()
+                overflow = 0
+                if self.stats is not None:
+                    acc = self.stats.categorical[col]
+                    counts = acc.counts.sort_values(ascending=False).reset_index()
+                    overflow = acc.overflow
+                else:
+                    counts = self.data[col].value_counts().reset_index()
                 counts.columns = ['category', 'count']
-                if len(counts) > 10:
-                    others = counts[10:]['count'].sum()
+                if len(counts) > 10 or overflow:
+                    others = counts[10:]['count'].sum() + overflow
                     counts = counts[:10]
                     counts.loc[len(counts)] = ['Другие', others]
                 fig = px.pie(
@@ -189,40 +563,75 @@ class UnifiedBrowserVisualizer:
                     margin=dict(l=30, r=30, b=30, t=80),
                     showlegend=False
                 )
-                self.figures.append(fig)
+                self._add_figure(fig)
         except Exception as e:
             print(f"Ошибка круговой диаграммы: {str(e)}")
+    def _annotate_points(self, fig, shown, total):
+        fig.add_annotation(
+            text=points_note(shown, total),
+            xref='paper', yref='paper', x=1, y=1.02,
+            xanchor='right', yanchor='bottom',
+            showarrow=False,
+            font=dict(size=11, color='gray')
+        )
     def add_scatter(self, x_col, y_col):
         try:
-            fig = px.scatter(
-                self.data,
-                x=x_col,
-                y=y_col,
-                title=f'Диаграмма рассеивания: {x_col} vs {y_col}'
-            )
+            total = len(self.data)
+            budget = self.point_budgets['scatter']
+            if total > budget * DENSITY_FACTOR:
+                # Слишком много точек даже для выборки: рисуем плотность по всем строкам
+                counts, x_centers, y_centers = density_grid(self.data[x_col], self.data[y_col])
+                fig = go.Figure(go.Heatmap(
+                    z=np.where(counts > 0, counts, np.nan),
+                    x=x_centers,
+                    y=y_centers,
+                    colorscale='Viridis',
+                    colorbar=dict(title='Строк')
+                ))
+                fig.update_layout(title=f'Диаграмма рассеивания (плотность): {x_col} vs {y_col}')
+                fig.add_annotation(
+                    text=f"Плотность по {total} строкам",
+                    xref='paper', yref='paper', x=1, y=1.02,
+                    xanchor='right', yanchor='bottom',
+                    showarrow=False,
+                    font=dict(size=11, color='gray')
+                )
+            else:
+                sample = stratified_sample(self.data[[x_col, y_col]], [x_col, y_col], budget)
+                fig = px.scatter(
+                    sample,
+                    x=x_col,
+                    y=y_col,
+                    title=f'Диаграмма рассеивания: {x_col} vs {y_col}'
+                )
+                self._annotate_points(fig, len(sample), total)
             fig.update_layout(
                 xaxis_title=x_col,
                 yaxis_title=y_col,
                 margin=dict(l=60, r=30, b=60, t=80)
             )
-            self.figures.append(fig)
+            self._add_figure(fig)
         except Exception as e:
             print(f"Ошибка при создании диаграммы рассеивания: {str(e)}")
     def add_line_chart(self):
         try:
             numeric_cols = self.data.select_dtypes(include=['number']).columns
             if len(numeric_cols) >= 1:
+                values = self.data[numeric_cols[0]].dropna()
+                keep = lttb(np.arange(len(values)), values.to_numpy(dtype=np.float64), self.point_budgets['line'])
+                values = values.iloc[keep]
                 fig = px.line(
-                    self.data,
-                    y=numeric_cols[0],
+                    x=values.index,
+                    y=values.to_numpy(),
                     title=f'Линейный график: {numeric_cols[0]}'
                 )
+                self._annotate_points(fig, len(values), len(self.data))
                 fig.update_layout(
                     xaxis_title='Индекс',
                     yaxis_title=numeric_cols[0],
                     margin=dict(l=60, r=30, b=60, t=80)
                 )
-                self.figures.append(fig)
+                self._add_figure(fig)
         except Exception as e:
             print(f"Ошибка при создании линейного графика: {str(e)}")
     def add_violin_plot(self):
@@ -232,46 +641,76 @@ class UnifiedBrowserVisualizer:
             if len(numeric_cols) >= 1 and len(category_cols) >= 1:
                 num_col = numeric_cols[0]
                 cat_col = category_cols[0]
-                unique_cats = self.data[cat_col].unique()[:10]  # Ограничиваем количество категорий
+                # Ограничиваем количество категорий; все группы получаем за один проход
+                labels, groups = self._grouped(cat_col, num_col).split(limit=10)
                 fig = go.Figure()
-                for cat in unique_cats:
-                    fig.add_trace(go.Violin(
-                        y=self.data[self.data[cat_col] == cat][num_col].dropna(),
-                        name=str(cat),
-                        box_visible=True,
-                        meanline_visible=True
-                    ))
+                if self.violin_mode == 'kde':
+                    self._add_kde_violins(fig, labels, groups)
+                else:
+                    for cat, values in zip(labels, groups):
+                        fig.add_trace(go.Violin(
+                            y=subsample(values, VIOLIN_MAX_POINTS),
+                            name=str(cat),
+                            box_visible=True,
+                            meanline_visible=True
+                        ))
                 fig.update_layout(
                     title=f'Диаграмма скрипки: {num_col}',
                     yaxis_title=num_col,
                     margin=dict(l=60, r=30, b=80, t=80),
                     violinmode='group'
                 )
-                self.figures.append(fig)
+                self._add_figure(fig)
         except Exception as e:
             print(f"Ошибка диаграммы скрипки: {str(e)}")
+    def _add_kde_violins(self, fig, labels, groups):
+        for i, (cat, values) in enumerate(zip(labels, groups)):
+            if len(values) == 0:
+                continue
+            grid, density = kde_curve(values)
+            half_width = 0.4 * density / density.max()
+            fig.add_trace(go.Scatter(
+                x=np.concatenate([i + half_width, (i - half_width)[::-1]]),
+                y=np.concatenate([grid, grid[::-1]]),
+                fill='toself',
+                mode='lines',
+                name=str(cat)
+            ))
+            q1, median, q3 = np.percentile(values, [25, 50, 75])
+            fig.add_trace(go.Scatter(
+                x=[i, i, i], y=[q1, median, q3],
+                mode='lines+markers',
+                line=dict(color='black', width=4),
+                marker=dict(color=['black', 'white', 'black']),
+                showlegend=False,
+                hoverinfo='y'
+            ))
+        fig.update_layout(xaxis=dict(tickmode='array', tickvals=list(range(len(labels))),
+                                     ticktext=[str(cat) for cat in labels]))
     def add_scatter_matrix(self):
         try:
             numeric_cols = self.data.select_dtypes(include=['number']).columns
             if len(numeric_cols) >= 2:
                 cols = numeric_cols[:4]  # Ограничиваем количество столбцов
+                sample = stratified_sample(self.data[cols], cols[:2], self.point_budgets['scatter_matrix'])
                 fig = px.scatter_matrix(
-                    self.data,
+                    sample,
                     dimensions=cols,
                     title="Матрица диаграмм рассеивания"
                 )
+                self._annotate_points(fig, len(sample), len(self.data))
                 fig.update_layout(
                     margin=dict(l=20, r=20, b=80, t=100),
                     height=800
                 )
-                self.figures.append(fig)
+                self._add_figure(fig)
         except Exception as e:
             print(f"Ошибка при создании матрицы диаграмм рассеивания: {str(e)}")
     def add_correlation_matrix(self):
         try:
             numeric_cols = self.data.select_dtypes(include=['number']).columns
             if len(numeric_cols) >= 2:
-                corr = self.data[numeric_cols].corr(numeric_only=True)
+                corr = self.correlation()
                 fig = go.Figure(data=go.Heatmap(
                     z=corr.values,
                     x=corr.columns,
@@ -288,21 +727,24 @@ class UnifiedBrowserVisualizer:
                     margin=dict(l=100, r=30, b=100, t=80),
                     height=600
                 )
-                self.figures.append(fig)
+                self._add_figure(fig)
         except Exception as e:
             print(f"Ошибка матрицы корреляций: {str(e)}")
     def add_3d_plot(self):
         try:
             numeric_cols = self.data.select_dtypes(include=['number']).columns
             if len(numeric_cols) >= 3:
+                cols = list(numeric_cols[:3])
+                sample = stratified_sample(self.data[cols], cols, self.point_budgets['3d'], bins=10)
                 fig = px.scatter_3d(
-                    self.data,
+                    sample,
                     x=numeric_cols[0],
                     y=numeric_cols[1],
                     z=numeric_cols[2],
                     color=numeric_cols[2],
                     title=f'3D график: {numeric_cols[0]} vs {numeric_cols[1]} vs {numeric_cols[2]}'
                 )
+                self._annotate_points(fig, len(sample), len(self.data))
                 fig.update_layout(
                     margin=dict(l=0, r=0, b=0, t=30),
                     scene=dict(
@@ -311,14 +753,14 @@ class UnifiedBrowserVisualizer:
                         zaxis_title=numeric_cols[2]
                     )
                 )
-                self.figures.append(fig)
+                self._add_figure(fig)
         except Exception as e:
             print(f"Ошибка при создании 3D графика: {str(e)}")
     def add_heatmap(self):
         try:
             numeric_cols = self.data.select_dtypes(include=['number']).columns.tolist()
             if len(numeric_cols) >= 2:
-                df = self.data[numeric_cols].corr()
+                df = self.correlation()
                 fig = go.Figure(data=go.Heatmap(
                     z=df.values,
                     x=df.columns,
@@ -327,7 +769,7 @@ class UnifiedBrowserVisualizer:
                     showscale=True
                 ))
                 fig.update_layout(title='Тепловая карта корреляций')
-                self.figures.append(fig)
+                self._add_figure(fig)
         except Exception as e:
             print(f"Ошибка создания тепловой карты: {str(e)}")
     def add_radar_chart(self):
@@ -337,9 +779,7 @@ class UnifiedBrowserVisualizer:
             if len(numeric_cols) >= 1 and len(category_cols) >= 1:
                 col_num = numeric_cols[0]
                 col_cat = category_cols[0]
-                grouped = self.data.groupby(col_cat, observed=True)[col_num].mean().reset_index()
-                categories = grouped[col_cat].unique()
-                values = grouped[col_num].values
+                categories, values = self._grouped(col_cat, col_num, sort=True).means()
                 fig = go.Figure()
                 fig.add_trace(go.Scatterpolar(
                     r=np.concatenate((values, [values[0]])),
@@ -349,114 +789,88 @@ class UnifiedBrowserVisualizer:
                 ))
                 fig.update_layout(polar=dict(radialaxis=dict(visible=True)), showlegend=False)
                 fig.update_layout(title=f'Радарная диаграмма: {col_num} по {col_cat}')
-                self.figures.append(fig)
+                self._add_figure(fig)
         except Exception as e:
             print(f"Ошибка создания радарной диаграммы: {str(e)}")
     def add_time_series(self, time_col, value_col):
         try:
-            df = self.data[[time_col, value_col]]
-            df[time_col] = pd.to_datetime(df[time_col], errors='coerce')
+            df = pd.DataFrame({
+                time_col: to_datetime_column(self.data[time_col], self._time_formats().get(time_col)),
+                value_col: self.data[value_col]
+            })
             df = df.dropna().sort_values(time_col)
+            total = len(df)
+            df = df.iloc[lttb(df[time_col].to_numpy(), df[value_col].to_numpy(dtype=np.float64),
+                              self.point_budgets['time_series'])]
             fig = px.line(df, x=time_col, y=value_col, title=f'График временного ряда: {value_col} по {time_col}')
-            self.figures.append(fig)
+            self._annotate_points(fig, len(df), total)
+            self._add_figure(fig)
         except Exception as e:
             print(f"Ошибка создания временного ряда: {str(e)}")
-    def figure_to_html_img(self, fig):
+    def figure_to_html_img(self, fig, title=None, writer=None):
         try:
-            if isinstance(fig, plt.Figure):
-                buf = io.BytesIO()
-                fig.savefig(buf, format='png', bbox_inches='tight', dpi=150, pad_inches=0.5)
-                plt.close(fig)
-                buf.seek(0)
-                img_str = base64.b64encode(buf.read()).decode('utf-8')
-                return f'<img src="data:image/png;base64,{img_str}" style="max-width:100%; height:auto;">'
-            else:
-                return fig.to_html(full_html=False, include_plotlyjs='cdn')
+            writer = writer or ReportWriter()
+            return writer.figure_html(fig, title if title is not None else fig.layout.title.text or "")
         except Exception as e:
             print(f"Ошибка конвертации графика: {str(e)}")
             return ""
-    def generate_report(self):
+    def _report_summary_html(self):
+        if self.stats is not None:
+            return (f"<p><strong>Размер данных:</strong> {self.stats.rows} строк, {len(self.stats.columns)} столбцов</p>\n"
+                    f"                <p><strong>Режим:</strong> потоковый, по {self.chunksize} строк</p>")
+        return (f"<p><strong>Размер данных:</strong> {len(self.data)} строк, {len(self.data.columns)} столбцов</p>\n"
+                f"                <p><strong>Использовано памяти:</strong> "
+                f"{self.data.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB</p>")
+    def _report_figures(self, keep_figures):
+        total = len(self.figures)
+        if keep_figures:
+            for i, fig in enumerate(list(self.figures), 1):
+                self.progress.check()
+                yield self._figure_title(fig, i), fig
+                self.progress.report('report', i, total)
+            return
+        index = 0
+        while self.figures:
+            self.progress.check()
+            # Забираем график из списка, чтобы после записи на него не осталось ссылок
+            fig = self.figures.pop(0)
+            index += 1
+            yield self._figure_title(fig, index), fig
+            del fig
+            self.progress.report('report', index, total)
+    def _figure_title(self, fig, index):
+        return fig.layout.title.text if hasattr(fig, 'layout') and fig.layout.title.text else f"График {index}"
+    def generate_report(self, compress=False, plotlyjs='inline', keep_figures=False, lazy=None, toc=None,
+                        output_path=None, open_browser=True):
         if not self.figures:
             raise ValueError("Невозможно сгенерировать отчет: не создано ни одной визуализации.")
-        plot_htmls = []
-        for i, fig in enumerate(self.figures, 1):
-            plot_html = self.figure_to_html_img(fig)
-            title = fig.layout.title.text if hasattr(fig, 'layout') and fig.layout.title.text else f"График {i}"
-            plot_htmls.append(f"""
-                <div class="plot-container">
-                    <div class="plot-title">{title}</div>
-                    {plot_html}
-                </div>
-            """)
-        html_content = f"""
-        <!DOCTYPE html>
-        <html lang="ru">
-        <head>
-            <meta charset="UTF-8">
-            <title>Отчет анализа данных</title>
-            <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>  
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    margin: 20px;
-                    line-height: 1.6;
-                }}
-                h1, h2 {{
-                    color: #2b5278;
-                    margin-bottom: 15px;
-                }}
-                .report-header {{
-                    background-color: #f5f5f5;
-                    padding: 20px;
-                    border-radius: 5px;
-                    margin-bottom: 20px;
-                }}
-                .plot-container {{
-                    margin: 30px 0;
-                    border: 1px solid #e0e0e0;
-                    border-radius: 5px;
-                    padding: 15px;
-                    background-color: #f9f9f9;
-                }}
-                .plot-title {{
-                    font-size: 18px;
-                    font-weight: bold;
-                    margin-bottom: 15px;
-                    color: #2b5278;
-                }}
-                .plotly-graph-div {{
-                    width: 100%;
-                    height: 600px;
-                }}
-                table {{
-                    width: 100%;
-                    border-collapse: collapse;
-                    margin: 15px 0;
-                }}
-                th, td {{
-                    border: 1px solid #ddd;
-                    padding: 8px;
-                    text-align: left;
-                }}
-                th {{
-                    background-color: #f2f2f2;
-                }}
-            </style>
-        </head>
-        <body>
+        many = len(self.figures) >= LAZY_REPORT_MIN_FIGURES
+        writer = ReportWriter(compress=compress, plotlyjs=plotlyjs, lazy=many if lazy is None else lazy)
+        titles = None
+        if many if toc is None else toc:
+            titles = [self._figure_title(fig, i) for i, fig in enumerate(self.figures, 1)]
+        header = f"""
             <div class="report-header">
                 <h1>Отчет анализа данных</h1>
                 <p><strong>Сгенерировано:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
                 <p><strong>Источник данных:</strong> {self.file_path}</p>
-                <p><strong>Размер данных:</strong> {len(self.data)} строк, {len(self.data.columns)} столбцов</p>
-                <p><strong>Использовано памяти:</strong> {self.data.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB</p>
+                {self._report_summary_html()}
             </div>
-            {"<hr>".join(plot_htmls)}
-        </body>
-        </html>
         """
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
-            f.write(html_content)
-            temp_path = f.name
-        webbrowser.open(f"file://{temp_path}")
-        return temp_path
\ No newline at end of file
+        # Отчет пишется в файл по одному графику, целиком в памяти он не собирается
+        if output_path is None:
+            f = tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8')
+        else:
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            f = open(output_path, 'w', encoding='utf-8')
+        report_path = f.name
+        with f:
+            try:
+                writer.write(f, "Отчет анализа данных", header, self._report_figures(keep_figures), titles)
+            except AnalysisCancelled:
+                f.close()
+                Path(report_path).unlink()
+                raise
+        if open_browser:
+            webbrowser.open(f"file://{report_path}")
+        return report_path
@@ -1,3 +1,7 @@
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QComboBox, QLineEdit, QCheckBox, QLabel
+from PySide6.QtCore import Qt
+from filters import FilterSpec, CONTAINS
+
 class EnhancedFilterWidget(QWidget):
     OPERATORS = [
         ("Равно", "=="),
@@ -8,6 +12,7 @@ class EnhancedFilterWidget(QWidget):
         ("Меньше или равно", "<="),
         ("Содержит", "str.contains"),
     ]
+    SPEC_OPERATORS = {"str.contains": CONTAINS}
 
     def __init__(self, columns):
         super().__init__()
@@ -28,6 +33,20 @@ class EnhancedFilterWidget(QWidget):
         layout.addWidget(self.value_edit)
         self.setLayout(layout)
 
+    def get_filter_spec(self):
+        column = self.column_combo.currentText()
+        op_label = self.operator_combo.currentText()
+        value = self.value_edit.text().strip()
+
+        if not column or not value:
+            return None
+
+        op = next((v for l, v in self.OPERATORS if l == op_label), None)
+        if not op:
+            return None
+        # Значение остается строкой: движок фильтра сам приводит его к типу столбца
+        return FilterSpec([(column, self.SPEC_OPERATORS.get(op, op), value)])
+
     def get_filter_condition(self):
         column = self.column_combo.currentText()
         op_label = self.operator_combo.currentText()
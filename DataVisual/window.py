@@ -1,9 +1,13 @@
-from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTextEdit, QScrollArea, QGridLayout, QGroupBox, QStatusBar, QProgressBar, QFileDialog
+from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTextEdit, QScrollArea, QGridLayout, QGroupBox, QStatusBar, QProgressBar, QFileDialog, QFrame, QComboBox
 from PySide6.QtGui import QFont, QTextCursor, QColor, QTextCharFormat, QPixmap
 from PySide6.QtCore import Qt, Signal
 from widgets import EnhancedFilterWidget, CheckBoxWithStatus
-from analysis_thread import AnalysisThread
+from analysis_worker import AnalysisWorker
+from process_engine import ProcessEngine
+from visualizer import UnifiedBrowserVisualizer
+from excel_readers import sheet_names
 from styles import TelegramStyle
+from datetime import datetime
 import os
 
 class VisualizerWindow(QMainWindow):
@@ -12,10 +16,9 @@ class VisualizerWindow(QMainWindow):
         self.setWindowTitle("DataVisual")
         self.resize(1000, 800)
         self.current_file = None
-        self.analysis_thread = None
+        self.analysis_worker = AnalysisWorker()
+        self.process_engine = ProcessEngine()
         self.last_report_path = None
-        self.filter_widget = FilterWidget([])
-        self.filter_widget.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
         TelegramStyle.apply(self)
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
@@ -43,8 +46,14 @@ class VisualizerWindow(QMainWindow):
         self.file_label = QLabel("Файл не выбран")
         self.file_label.setStyleSheet("color: #8f98a0; font-size: 14px;")
         self.file_label.setWordWrap(True)
+        # Выбор листа книги Excel; для остальных форматов скрыт
+        self.sheet_combo = QComboBox()
+        self.sheet_combo.setFixedHeight(40)
+        self.sheet_combo.setToolTip("Лист книги Excel")
+        self.sheet_combo.setVisible(False)
         file_panel_layout.addWidget(self.select_btn)
         file_panel_layout.addWidget(self.file_label, stretch=1)
+        file_panel_layout.addWidget(self.sheet_combo)
         file_panel_layout.addWidget(self.clear_btn)
         self.layout.addWidget(self.file_panel)
         scroll = QScrollArea()
@@ -76,6 +85,11 @@ class VisualizerWindow(QMainWindow):
         }
         for cb in self.checkboxes2.values():
             g2_layout.addWidget(cb)
+        self.streaming_checkbox = CheckBoxWithStatus("Потоковый режим (большие CSV)")
+        g2_layout.addWidget(self.streaming_checkbox)
+        self.process_checkbox = CheckBoxWithStatus("Анализ в отдельном процессе")
+        self.process_checkbox.set_status("Интерфейс не подтормаживает на больших файлах", "blue")
+        g2_layout.addWidget(self.process_checkbox)
         group2.setLayout(g2_layout)
         group3 = QGroupBox("Дополнительные визуализации")
         group3.setFont(QFont("Segoe UI", 12, QFont.Bold))
@@ -109,6 +123,11 @@ class VisualizerWindow(QMainWindow):
         self.run_btn.setFixedHeight(40)
         self.run_btn.setCursor(Qt.PointingHandCursor)
         bottom_layout.addWidget(self.run_btn)
+        self.cancel_btn = QPushButton("Отмена")
+        self.cancel_btn.setFixedHeight(40)
+        self.cancel_btn.setCursor(Qt.PointingHandCursor)
+        self.cancel_btn.setEnabled(False)
+        bottom_layout.addWidget(self.cancel_btn)
         self.save_btn = QPushButton("Сохранить отчет")
         self.save_btn.setFixedHeight(40)
         self.save_btn.setCursor(Qt.PointingHandCursor)
@@ -133,8 +152,17 @@ class VisualizerWindow(QMainWindow):
         self.status_bar.addPermanentWidget(self.progress_bar)
         self.select_btn.clicked.connect(self.select_file)
         self.clear_btn.clicked.connect(self.clear_file)
+        self.sheet_combo.currentIndexChanged.connect(self.on_sheet_changed)
         self.run_btn.clicked.connect(self.run_analysis)
+        self.cancel_btn.clicked.connect(self.cancel_analysis)
         self.save_btn.clicked.connect(self.save_report)
+        for engine in (self.analysis_worker, self.process_engine):
+            engine.update_progress.connect(self.progress_bar.setValue)
+            engine.update_status.connect(lambda msg: self.status_bar.showMessage(msg))
+            engine.analysis_complete.connect(self.on_analysis_complete)
+            engine.analysis_cancelled.connect(self.on_analysis_cancelled)
+            engine.error_occurred.connect(self.on_analysis_error)
+        self.analysis_worker.start()
         self.update_checkbox_statuses()
         self.set_background("C:\\Users\\Денис\\Documents\\Настраиваемые шаблоны Office\\Foto.png")
         # В конструкторе VisualizerWindow
@@ -157,6 +185,10 @@ class VisualizerWindow(QMainWindow):
             self.background.lower()
         else:
             print(f"Не удалось загрузить фоновое изображение: {image_path}")
+    def closeEvent(self, event):
+        self.analysis_worker.stop()
+        self.process_engine.stop()
+        super().closeEvent(event)
     def resizeEvent(self, event):
         super().resizeEvent(event)
         if hasattr(self, 'background'):
@@ -167,14 +199,17 @@ class VisualizerWindow(QMainWindow):
                 for cb in group.values():
                     cb.set_status("Требуется файл данных", "gray")
                     cb.checkbox.setEnabled(False)
+            self.streaming_checkbox.set_status("Требуется файл данных", "gray")
+            self.streaming_checkbox.checkbox.setEnabled(False)
             return
         try:
-            visualizer = UnifiedBrowserVisualizer(self.current_file)
-            numeric_cols = visualizer.data.select_dtypes(include=['number']).columns.tolist()
-            category_cols = visualizer.data.select_dtypes(include=['category', 'object']).columns.tolist()
-            time_cols = visualizer._detect_time_columns()
+            schema = UnifiedBrowserVisualizer(self.current_file, load=False,
+                                              sheet_name=self.current_sheet()).sniff_schema()
+            numeric_cols = schema.numeric_cols
+            category_cols = schema.category_cols
+            time_cols = schema.time_cols
             self.filter_widget.column_combo.clear()
-            self.filter_widget.column_combo.addItems(visualizer.data.columns.tolist())
+            self.filter_widget.column_combo.addItems([str(col) for col in schema.columns])
             self.checkboxes1["Информация о данных"].set_status("Доступно", "green")
             self.checkboxes1["Информация о данных"].checkbox.setEnabled(True)
             self.checkboxes1["Гистограммы"].set_status(
@@ -233,25 +268,54 @@ class VisualizerWindow(QMainWindow):
                 "Доступно" if time_cols and numeric_cols else "Нужны время и числовые данные",
                 "green" if time_cols and numeric_cols else "red")
             self.checkboxes3["Временные ряды"].checkbox.setEnabled(bool(time_cols and numeric_cols))
+            is_csv = self.current_file.lower().endswith('.csv')
+            self.streaming_checkbox.set_status(
+                "Только информация, гистограммы, размах, столбчатые и круговые" if is_csv else "Только для CSV",
+                "blue" if is_csv else "gray")
+            self.streaming_checkbox.checkbox.setEnabled(is_csv)
         except Exception as e:
             self.log_message(f"Ошибка при проверке данных: {str(e)}", "error")
             for group in [self.checkboxes1, self.checkboxes2, self.checkboxes3]:
                 for cb in group.values():
                     cb.set_status("Ошибка данных", "red")
                     cb.checkbox.setEnabled(False)
+            self.streaming_checkbox.checkbox.setEnabled(False)
     def select_file(self):
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Выберите файл данных", "", "CSV файлы (*.csv);;Excel файлы (*.xlsx *.xls);;Все файлы (*)"
+            self, "Выберите файл данных", "", "CSV файлы (*.csv);;Excel файлы (*.xlsx *.xls);;"
+            "Parquet, Feather и JSONL (*.parquet *.pq *.feather *.arrow *.ipc *.jsonl *.ndjson);;Все файлы (*)"
         )
         if file_path:
             self.current_file = file_path
             self.file_label.setText(os.path.basename(file_path))
             self.file_label.setToolTip(file_path)
             self.log_message(f"Выбран файл: {file_path}")
+            self.update_sheets()
             self.update_checkbox_statuses()
             self.run_btn.setEnabled(True)
+    def update_sheets(self):
+        # Список листов заполняется до загрузки данных; сигнал смены листа на это время отключен
+        self.sheet_combo.blockSignals(True)
+        self.sheet_combo.clear()
+        names = []
+        if self.current_file and self.current_file.lower().endswith(('.xlsx', '.xls')):
+            try:
+                names = sheet_names(self.current_file)
+            except Exception as e:
+                self.log_message(f"Не удалось прочитать список листов: {str(e)}", "error")
+        self.sheet_combo.addItems([str(name) for name in names])
+        self.sheet_combo.setVisible(len(names) > 1)
+        self.sheet_combo.blockSignals(False)
+    def current_sheet(self):
+        # Лист передается номером: первый лист совпадает с чтением по умолчанию и его кэшем
+        return max(self.sheet_combo.currentIndex(), 0)
+    def on_sheet_changed(self, index):
+        if index >= 0:
+            self.log_message(f"Выбран лист: {self.sheet_combo.currentText()}")
+            self.update_checkbox_statuses()
     def clear_file(self):
         self.current_file = None
+        self.update_sheets()
         self.file_label.setText("Файл не выбран")
         self.file_label.setToolTip("")
         self.log_message("Файл сброшен")
@@ -311,26 +375,46 @@ class VisualizerWindow(QMainWindow):
                 if key != "all_plots":
                     options[key] = True
 
-        filter_condition = self.filter_widget.get_filter_condition()
+        filter_condition = self.filter_widget.get_filter_spec()
 
         self.run_btn.setEnabled(False)
         self.select_btn.setEnabled(False)
+        self.sheet_combo.setEnabled(False)
         self.clear_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
         self.progress_bar.setValue(0)
         self.log_message("Начало анализа данных...", "info")
 
-        self.analysis_thread = AnalysisThread(self.current_file, options, filter_condition)
-        self.analysis_thread.update_progress.connect(self.progress_bar.setValue)
-        self.analysis_thread.update_status.connect(lambda msg: self.status_bar.showMessage(msg))
-        self.analysis_thread.analysis_complete.connect(self.on_analysis_complete)
-        self.analysis_thread.error_occurred.connect(self.on_analysis_error)
-        self.analysis_thread.start()
+        streaming = self.streaming_checkbox.checkbox.isEnabled() and self.streaming_checkbox.checkbox.isChecked()
+        # Рабочий поток (или процесс) держит загруженные данные между запусками, повторно файл не читается
+        engine = self.process_engine if self.process_checkbox.checkbox.isChecked() else self.analysis_worker
+        engine.submit_analysis(self.current_file, options, filter_condition, streaming, self.current_sheet())
+
+    def cancel_analysis(self):
+        if self.analysis_worker.busy or self.process_engine.busy:
+            self.analysis_worker.cancel()
+            self.process_engine.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.log_message("Отмена анализа...", "warning")
+            self.status_bar.showMessage("Отмена анализа...")
+
+    def on_analysis_cancelled(self):
+        self.run_btn.setEnabled(True)
+        self.select_btn.setEnabled(True)
+        self.sheet_combo.setEnabled(True)
+        self.clear_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self.progress_bar.setValue(0)
+        self.log_message("Анализ отменен, память освобождена", "warning")
+        self.status_bar.showMessage("Анализ отменен", 5000)
 
     def on_analysis_complete(self, report_path):
         self.last_report_path = report_path
         self.run_btn.setEnabled(True)
         self.select_btn.setEnabled(True)
+        self.sheet_combo.setEnabled(True)
         self.clear_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
         self.save_btn.setEnabled(True)
         self.log_message(f"Анализ завершен. Отчет сохранен во временный файл: {report_path}", "success")
         self.status_bar.showMessage("Анализ завершен", 5000)
@@ -338,7 +422,9 @@ class VisualizerWindow(QMainWindow):
     def on_analysis_error(self, error_msg):
         self.run_btn.setEnabled(True)
         self.select_btn.setEnabled(True)
+        self.sheet_combo.setEnabled(True)
         self.clear_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
         if "Нет данных для отчета" in error_msg:
             error_msg = ("Не удалось создать визуализации. Возможные причины:\n"
                          "1. Выбранные типы графиков не поддерживаются для ваших данных\n"
@@ -0,0 +1,156 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+import pandas as pd
+from analysis_worker import AnalysisWorker
+from columnar_cache import get_columnar_cache
+from figure_cache import get_figure_cache
+from visualizer import UnifiedBrowserVisualizer
+
+class TestAnalysisWorker(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'test.csv')
+        n = 1000
+        pd.DataFrame({
+            'age': np.arange(n) % 90,
+            'salary': np.linspace(1000, 9000, n),
+            'department': np.where(np.arange(n) % 2, 'IT', 'HR')
+        }).to_csv(self.file_path, index=False)
+        self.worker = AnalysisWorker()
+        self.reports = []
+        self.finished = []
+        self.worker.analysis_complete.connect(self.reports.append)
+        self.worker.job_finished.connect(self.finished.append)
+        get_figure_cache().invalidate()
+        self.cache_dir = get_columnar_cache().cache_dir
+        get_columnar_cache().cache_dir = Path(self.temp_dir.name) / 'cache'
+
+    def tearDown(self):
+        for path in self.reports:
+            os.remove(path)
+        get_columnar_cache().cache_dir = self.cache_dir
+        self.temp_dir.cleanup()
+
+    def process(self):
+        # Выполняем накопленные задания синхронно в текущем потоке
+        self.worker.jobs.put(None)
+        with mock.patch('visualizer.webbrowser.open'):
+            self.worker.run()
+
+    def test_dataset_is_loaded_once_per_session(self):
+        self.worker.submit_analysis(self.file_path, {"histograms": True})
+        self.process()
+        visualizer = self.worker.visualizer
+        self.worker.submit_analysis(self.file_path, {"boxplot": True}, "age > 50")
+        self.process()
+        self.assertIs(self.worker.visualizer, visualizer)
+        self.assertEqual(len(self.reports), 2)
+        self.assertFalse(self.worker.busy)
+
+    def test_only_planned_columns_are_loaded(self):
+        self.worker.submit_analysis(self.file_path, {"line_chart": True})
+        self.process()
+        visualizer = self.worker.visualizer
+        self.assertEqual(list(visualizer.data.columns), ['age'])
+        # Новым графикам нужны столбцы, которых нет в памяти: дочитываются только они
+        self.worker.submit_analysis(self.file_path, {"pie_chart": True}, "salary > 5000")
+        self.process()
+        self.assertIs(self.worker.visualizer, visualizer)
+        self.assertEqual(list(visualizer.loaded_data.columns), ['age', 'salary', 'department'])
+        self.assertTrue((visualizer.data['salary'] > 5000).all())
+        self.assertEqual(len(self.reports), 2)
+
+    def test_new_chart_keeps_loaded_columns_and_figures(self):
+        self.worker.submit_analysis(self.file_path, {"histograms": True})
+        self.process()
+        cache = get_figure_cache()
+        misses = cache.misses
+        read_columns = []
+        read_file = UnifiedBrowserVisualizer._read_file
+
+        def tracked_read(visualizer, path):
+            read_columns.append(visualizer.columns)
+            read_file(visualizer, path)
+
+        with mock.patch.object(UnifiedBrowserVisualizer, '_read_file', autospec=True, side_effect=tracked_read):
+            self.worker.submit_analysis(self.file_path, {"histograms": True, "bar_chart": True})
+            self.process()
+        self.assertEqual(read_columns, [['department']])
+        self.assertEqual(cache.misses - misses, 1)
+        self.assertEqual(list(self.worker.visualizer.data.columns), ['age', 'salary', 'department'])
+
+    def test_run_is_queued_as_one_job(self):
+        self.worker.submit_analysis(self.file_path, {"histograms": True})
+        self.assertEqual(self.worker.jobs.qsize(), 1)
+        self.assertTrue(self.worker.busy)
+        states = []
+        job_filter = AnalysisWorker._job_filter
+        with mock.patch.object(AnalysisWorker, '_job_filter', autospec=True,
+                               side_effect=lambda worker, condition: (states.append(worker.busy),
+                                                                      job_filter(worker, condition))):
+            self.process()
+        self.assertEqual(states, [True])
+        self.assertFalse(self.worker.busy)
+        self.assertEqual(len(self.reports), 1)
+
+    def test_cancel_drops_queued_runs(self):
+        cancelled = []
+        self.worker.analysis_cancelled.connect(lambda: cancelled.append(True))
+        self.worker.submit_analysis(self.file_path, {"histograms": True})
+        self.worker.submit_analysis(self.file_path, {"boxplot": True})
+        self.worker.cancel()
+        self.process()
+        self.assertEqual(cancelled, [True])
+        self.assertEqual(self.reports, [])
+        self.assertFalse(self.worker.busy)
+        self.assertFalse(self.worker.cancel_event.is_set())
+
+    def test_filter_replaces_previous_filter(self):
+        self.worker.submit('load', self.file_path)
+        self.worker.submit('filter', "age > 50")
+        self.worker.submit('filter', "age < 10")
+        self.process()
+        data = self.worker.visualizer.data
+        self.assertTrue((data['age'] < 10).all())
+        self.assertGreater(len(data), 0)
+        self.worker.submit('filter', None)
+        self.process()
+        self.assertEqual(len(self.worker.visualizer.data), 1000)
+
+    def test_changed_file_is_reloaded(self):
+        self.worker.submit('load', self.file_path)
+        self.process()
+        visualizer = self.worker.visualizer
+        pd.DataFrame({'age': np.arange(200)}).to_csv(self.file_path, index=False)
+        self.worker.submit('load', self.file_path)
+        self.process()
+        self.assertIsNot(self.worker.visualizer, visualizer)
+        self.assertEqual(list(self.worker.visualizer.data.columns), ['age'])
+
+    def test_error_drops_rest_of_run(self):
+        errors = []
+        self.worker.error_occurred.connect(errors.append)
+        self.worker.submit_analysis(os.path.join(self.temp_dir.name, 'missing.csv'), {"histograms": True})
+        self.process()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(self.reports, [])
+        self.assertTrue(self.worker.jobs.empty())
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют долгоживущий рабочий поток анализа.
+
+Что тестируется:
+Повторный запуск на том же файле не перечитывает данные, а только строит графики и пишет отчет.
+Загружаются только столбцы, нужные графикам и фильтру; если новым графикам нужен другой столбец, дочитывается только он, а графики по уже загруженным столбцам берутся из кэша.
+Новый фильтр применяется к загруженным данным, а не поверх предыдущего.
+Измененный на диске файл загружается заново.
+Ошибка задания отменяет оставшиеся задания этого запуска.
+Задания запуска стоят в очереди одним элементом, поэтому поток не освобождается посреди запуска; отмена снимает и следующие запуски.
+Зачем это нужно:
+Убедиться, что каждое действие пользователя оплачивает только вычисления, а не повторную загрузку файла.'''
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from columnar_cache import ColumnarCache
+
+class TestColumnarCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ColumnarCache(self.temp_dir.name)
+        self.fingerprint = ('/data/test.csv', 100, 1, 'abc')
+        self.df = pd.DataFrame({
+            'age': np.array([25, 35, 45], dtype=np.int8),
+            'salary': np.array([50000, 70000, 90000], dtype=np.float32),
+            'department': pd.Categorical(['IT', 'HR', 'IT'])
+        })
+
+    @unittest.skipUnless(ColumnarCache().available, "pyarrow не установлен")
+    def test_roundtrip_preserves_dtypes(self):
+        self.assertIsNone(self.cache.load(self.fingerprint))
+        self.cache.save(self.fingerprint, self.df)
+        loaded = self.cache.load(self.fingerprint)
+        self.assertTrue(loaded.equals(self.df))
+        self.assertTrue(loaded.dtypes.equals(self.df.dtypes))
+
+    @unittest.skipUnless(ColumnarCache().available, "pyarrow не установлен")
+    def test_new_fingerprint_replaces_stale_entry(self):
+        self.cache.save(self.fingerprint, self.df)
+        changed = ('/data/test.csv', 120, 2, 'def')
+        self.assertIsNone(self.cache.load(changed))
+        self.cache.save(changed, self.df)
+        self.assertEqual(len(os.listdir(self.temp_dir.name)), 1)
+        self.assertIsNone(self.cache.load(self.fingerprint))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют столбцовый кэш на диске (Feather) .
+
+Что тестируется:
+Сохранение и чтение набора данных с сохранением типов (int8, float32, category).
+Замена устаревшей копии после изменения исходного файла.
+Зачем это нужно:
+Убедиться, что повторное открытие файла берет данные из кэша, а не разбирает CSV/Excel заново.'''
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from dataset_cache import DatasetCache, file_fingerprint
+
+class TestDatasetCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'test.csv')
+        self.df = pd.DataFrame({'age': [25, 35, 45], 'salary': [50000, 70000, 90000]})
+        self.df.to_csv(self.file_path, index=False)
+
+    def test_put_and_get(self):
+        cache = DatasetCache()
+        self.assertIsNone(cache.get(self.file_path))
+        cache.put(self.file_path, self.df)
+        entry = cache.get(self.file_path)
+        self.assertIs(entry.data, self.df)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_changed_file_is_miss(self):
+        cache = DatasetCache()
+        cache.put(self.file_path, self.df)
+        old_fingerprint = file_fingerprint(self.file_path)
+        self.df.assign(age=[1, 2, 3]).to_csv(self.file_path, index=False)
+        os.utime(self.file_path, ns=(old_fingerprint[2] + 10**9, old_fingerprint[2] + 10**9))
+        self.assertIsNone(cache.get(self.file_path))
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        other_path = os.path.join(self.temp_dir.name, 'other.csv')
+        self.df.to_csv(other_path, index=False)
+        cache = DatasetCache()
+        cache.put(self.file_path, self.df)
+        cache.put(other_path, self.df.copy())
+        cache.get(self.file_path)
+        cache.set_memory_budget(cache.total_bytes - 1)
+        self.assertIn(self.file_path, cache)
+        self.assertNotIn(other_path, cache)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют общий кэш загруженных наборов данных .
+
+Что тестируется:
+Повторное получение набора данных из кэша без повторного чтения файла.
+Промах кэша после изменения файла на диске (размер/время/хэш).
+Вытеснение давно не использованных наборов при превышении бюджета памяти.
+Зачем это нужно:
+Убедиться, что окно и поток анализа разбирают файл один раз за сессию и кэш не растет бесконечно.'''
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from columnar_cache import get_columnar_cache
+from figure_cache import FigureCache, MEMORY_BUDGET_ENV, get_figure_cache
+from visualizer import UnifiedBrowserVisualizer
+
+class TestFigureCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'test.csv')
+        n = 500
+        pd.DataFrame({
+            'age': np.arange(n) % 90,
+            'salary': np.linspace(1000, 9000, n),
+            'department': np.where(np.arange(n) % 2, 'IT', 'HR')
+        }).to_csv(self.file_path, index=False)
+        get_figure_cache().invalidate()
+        self.cache_dir = get_columnar_cache().cache_dir
+        get_columnar_cache().cache_dir = Path(self.temp_dir.name) / 'cache'
+
+    def tearDown(self):
+        get_figure_cache().invalidate()
+        get_columnar_cache().cache_dir = self.cache_dir
+        self.temp_dir.cleanup()
+
+    def run_analysis(self, options, filter_condition=None):
+        visualizer = UnifiedBrowserVisualizer(self.file_path)
+        if filter_condition:
+            visualizer.apply_filter(filter_condition)
+        visualizer.process_data(options)
+        return visualizer.figures
+
+    def test_second_run_builds_only_new_figures(self):
+        first = self.run_analysis({"histograms": True})
+        cache = get_figure_cache()
+        misses = cache.misses
+        second = self.run_analysis({"histograms": True, "pie_chart": True})
+        self.assertEqual(cache.misses - misses, 1)
+        self.assertIs(second[0], first[0])
+        self.assertEqual(len(second), len(first) + 1)
+
+    def test_column_charts_survive_wider_projection(self):
+        visualizer = UnifiedBrowserVisualizer(self.file_path, load=False, columns=['age', 'salary'])
+        visualizer.load_data()
+        visualizer.process_data({"histograms": True})
+        cache = get_figure_cache()
+        misses = cache.misses
+        wider = UnifiedBrowserVisualizer(self.file_path, load=False, columns=['age', 'salary', 'department'])
+        wider.load_data()
+        wider.process_data({"histograms": True, "bar_chart": True})
+        self.assertEqual(cache.misses - misses, 1)
+        self.assertIs(wider.figures[0], visualizer.figures[0])
+
+    def test_projection_is_part_of_key_for_all_column_charts(self):
+        # Матрица рассеяния строится по всем загруженным столбцам, поэтому по более широкой загрузке строится заново
+        visualizer = UnifiedBrowserVisualizer(self.file_path, load=False, columns=['age', 'salary'])
+        visualizer.load_data()
+        visualizer.process_data({"scatter_matrix": True})
+        full = UnifiedBrowserVisualizer(self.file_path)
+        full.process_data({"scatter_matrix": True})
+        self.assertIsNot(full.figures[0], visualizer.figures[0])
+        again = UnifiedBrowserVisualizer(self.file_path, load=False, columns=['age', 'salary'])
+        again.load_data()
+        again.process_data({"scatter_matrix": True})
+        self.assertIs(again.figures[0], visualizer.figures[0])
+
+    def test_filter_and_parameters_are_part_of_key(self):
+        first = self.run_analysis({"scatter": True})
+        filtered = self.run_analysis({"scatter": True}, "age > 10")
+        self.assertIsNot(filtered[0], first[0])
+        visualizer = UnifiedBrowserVisualizer(self.file_path, point_budgets={'scatter': 100})
+        visualizer.process_data({"scatter": True})
+        self.assertIsNot(visualizer.figures[0], first[0])
+
+    def test_changed_file_is_not_reused(self):
+        first = self.run_analysis({"histograms": True})
+        pd.DataFrame({'age': np.arange(200), 'salary': np.linspace(0, 1, 200)}).to_csv(self.file_path, index=False)
+        second = self.run_analysis({"histograms": True})
+        self.assertIsNot(second[0], first[0])
+
+    def test_memory_budget_evicts_oldest_figures(self):
+        cache = get_figure_cache()
+        budget = cache.memory_budget
+        try:
+            self.run_analysis({"scatter": True})
+            scatter_bytes = cache.total_bytes
+            self.assertGreater(scatter_bytes, 500)
+            cache.set_memory_budget(scatter_bytes)
+            self.run_analysis({"histograms": True})
+            self.assertLessEqual(cache.total_bytes, scatter_bytes)
+            misses = cache.misses
+            self.run_analysis({"scatter": True})
+            self.assertEqual(cache.misses - misses, 1)
+            cache.set_memory_budget(100)
+            self.assertEqual(len(cache), 0)
+        finally:
+            cache.set_memory_budget(budget)
+
+    def test_other_file_clears_cache(self):
+        self.run_analysis({"histograms": True})
+        other_path = os.path.join(self.temp_dir.name, 'other.csv')
+        pd.DataFrame({'x': np.arange(100)}).to_csv(other_path, index=False)
+        visualizer = UnifiedBrowserVisualizer(other_path)
+        visualizer.process_data({"histograms": True})
+        self.assertEqual(len(get_figure_cache()), 1)
+
+    def test_budget_from_environment(self):
+        with mock.patch.dict(os.environ, {MEMORY_BUDGET_ENV: '0'}):
+            cache = FigureCache()
+        cache.put(((('a', 1, 2, 'h'),), 'add_histogram', (), ()), [go.Figure()])
+        self.assertEqual(len(cache), 0)
+        with mock.patch.dict(os.environ, {MEMORY_BUDGET_ENV: '1.5'}):
+            self.assertEqual(FigureCache().memory_budget, 1.5 * 1024 * 1024)
+
+    def test_replaced_data_is_not_cached(self):
+        visualizer = UnifiedBrowserVisualizer(self.file_path)
+        visualizer.data = visualizer.data.head(10)
+        visualizer.process_data({"histograms": True})
+        self.assertEqual(len(get_figure_cache()), 0)
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют сессионный кэш графиков.
+
+Что тестируется:
+Повторный запуск с дополнительным графиком берет прежние графики из кэша и строит только новый.
+Условие фильтра и параметры построения входят в ключ кэша; загруженные столбцы — только для графиков по всем столбцам,
+а графики по конкретным столбцам переиспользуются после более широкой загрузки.
+Загрузка другого файла очищает кэш, а бюджет памяти задается через окружение (0 отключает кэш).
+Кэш не выходит за бюджет памяти: старые графики вытесняются, а слишком большие не сохраняются.
+После изменения файла старые графики не используются.
+Данные, замененные в обход загрузки и фильтра, не кэшируются.
+Зачем это нужно:
+Убедиться, что повторный анализ пересчитывает только изменившиеся графики и не показывает устаревшие.'''
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from visualizer import UnifiedBrowserVisualizer
+
+class TestFigureExecutor(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'test.csv')
+        n = 500
+        pd.DataFrame({
+            'age': np.arange(n) % 90,
+            'salary': np.linspace(1000, 9000, n),
+            'bonus': np.linspace(0, 1, n) ** 2,
+            'department': np.where(np.arange(n) % 2, 'IT', 'HR')
+        }).to_csv(self.file_path, index=False)
+        self.options = {key: True for key in [
+            "data_info", "histograms", "boxplot", "scatter", "correlation", "line_chart", "bar_chart",
+            "pie_chart", "violin_plot", "scatter_matrix", "3d_plot", "heatmap", "radar_chart"]}
+
+    def titles(self, max_workers):
+        visualizer = UnifiedBrowserVisualizer(self.file_path, use_cache=False, max_workers=max_workers)
+        visualizer.process_data(self.options)
+        return [fig.layout.title.text for fig in visualizer.figures]
+
+    def test_parallel_order_matches_sequential(self):
+        sequential = self.titles(1)
+        self.assertEqual(len(sequential), 17)
+        for _ in range(3):
+            self.assertEqual(self.titles(8), sequential)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют параллельное построение графиков .
+
+Что тестируется:
+Построение всех выбранных графиков в пуле потоков.
+Совпадение порядка графиков с последовательным запуском.
+Зачем это нужно:
+Убедиться, что ускорение построения не меняет содержимое и порядок отчета.'''
@@ -0,0 +1,152 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+import pandas as pd
+from PySide6.QtCore import QCoreApplication
+from columnar_cache import get_columnar_cache
+from process_engine import ProcessEngine
+from shared_frame import SharedFrame
+from visualizer import UnifiedBrowserVisualizer
+
+class TestProcessEngine(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'test.csv')
+        n = 1000
+        pd.DataFrame({
+            'age': np.arange(n) % 90,
+            'salary': np.linspace(1000, 9000, n),
+            'department': np.where(np.arange(n) % 2, 'IT', 'HR')
+        }).to_csv(self.file_path, index=False)
+        # Процесс-движок запускается через spawn и берет каталог кэша из переменной окружения
+        cache_dir = os.path.join(self.temp_dir.name, 'cache')
+        self.environ = mock.patch.dict(os.environ, {'DATAVISUAL_CACHE_DIR': cache_dir})
+        self.environ.start()
+        self.cache_dir = get_columnar_cache().cache_dir
+        get_columnar_cache().cache_dir = Path(cache_dir)
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        self.engine = ProcessEngine()
+        self.result = None
+        self.events = []
+        self.engine.job_finished.connect(self.events.append)
+        self.engine.update_progress.connect(lambda value: self.events.append(value))
+        for signal, name in ((self.engine.analysis_complete, 'complete'), (self.engine.error_occurred, 'error'),
+                             (self.engine.analysis_cancelled, 'cancelled')):
+            signal.connect(lambda *args, name=name: self.finish(name, *args))
+
+    def finish(self, name, *args):
+        self.result = (name, *args)
+
+    def wait_result(self, timeout=120):
+        # Сигналы из потока-слушателя доставляются через цикл событий Qt
+        deadline = time.monotonic() + timeout
+        while self.result is None and time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.01)
+        return self.result is not None
+
+    def tearDown(self):
+        self.engine.stop()
+        if self.result is not None and self.result[0] == 'complete':
+            os.remove(self.result[1])
+        get_columnar_cache().cache_dir = self.cache_dir
+        self.environ.stop()
+        self.temp_dir.cleanup()
+
+    def test_report_is_built_in_child_process(self):
+        self.engine.submit_analysis(self.file_path, {"histograms": True})
+        self.assertTrue(self.wait_result())
+        self.assertEqual(self.result[0], 'complete')
+        self.assertTrue(os.path.exists(self.result[1]))
+        self.assertIn(100, self.events)
+        self.assertNotIn('attach', self.events)
+        self.assertFalse(self.engine.busy)
+
+    def test_loaded_dataset_is_handed_over_through_shared_memory(self):
+        UnifiedBrowserVisualizer(self.file_path)
+        self.engine.submit_analysis(self.file_path, {"histograms": True}, "age > 10")
+        self.assertTrue(self.wait_result())
+        self.assertEqual(self.result[0], 'complete')
+        self.assertIn('attach', self.events)
+        self.assertEqual(self.engine._shared, [])
+
+    def test_handoff_does_not_block_submit(self):
+        UnifiedBrowserVisualizer(self.file_path)
+        release = threading.Event()
+        publish = SharedFrame.publish
+
+        def slow_publish(frame):
+            release.wait(30)
+            return publish(frame)
+
+        with mock.patch('process_engine.SharedFrame.publish', side_effect=slow_publish):
+            started = time.monotonic()
+            self.engine.submit_analysis(self.file_path, {"histograms": True})
+            self.assertLess(time.monotonic() - started, 5)
+            self.assertTrue(self.engine.busy)
+            self.engine.cancel()
+            release.set()
+            self.assertTrue(self.wait_result())
+        self.assertEqual(self.result[0], 'cancelled')
+        self.assertNotIn('report', self.events)
+        self.assertFalse(self.engine.busy)
+
+    def test_projected_dataset_is_handed_over(self):
+        # В основном процессе загружена только часть столбцов: движок получает ее и дочитывает остальные сам
+        UnifiedBrowserVisualizer(self.file_path, columns=['age'])
+        attach = self.engine._handoff(self.file_path)
+        self.assertEqual(attach[1][4], ['age'])
+        self.engine._release_shared()
+        self.engine.submit_analysis(self.file_path, {"histograms": True})
+        self.assertTrue(self.wait_result())
+        self.assertEqual(self.result[0], 'complete')
+        self.assertIn('attach', self.events)
+        with open(self.result[1], encoding='utf-8') as f:
+            self.assertIn('salary', f.read())
+
+    def test_handoff_prefers_full_then_widest_projection(self):
+        version = ('test.csv', 1, 2, 3)
+        entry = lambda fingerprint, columns: mock.Mock(fingerprint=fingerprint, data=pd.DataFrame(columns=columns))
+        narrow = entry(version + ((('a',), None, 0),), ['a'])
+        wide = entry(version + ((('a', 'b'), None, 0),), ['a', 'b'])
+        filtered = entry(version + ((('a', 'b', 'c'), 'a > 1', 0),), ['a', 'b', 'c'])
+        other_sheet = entry(version + ((None, None, 'Лист2'),), ['a', 'b', 'c'])
+        full = entry(version, ['a', 'b', 'c'])
+        self.assertIs(ProcessEngine._handoff_entry([narrow, wide, filtered, other_sheet]), wide)
+        self.assertIs(ProcessEngine._handoff_entry([narrow, full, wide]), full)
+        self.assertIsNone(ProcessEngine._handoff_entry([filtered, other_sheet]))
+
+    def test_shared_frame_round_trip(self):
+        frame = pd.DataFrame({'x': np.arange(100, dtype=np.int32), 'y': np.linspace(0, 1, 100),
+                              'c': pd.Categorical(['a', 'b'] * 50)})
+        shared = SharedFrame.publish(frame)
+        receiver = SharedFrame(shared.name, shared.size)
+        attached = receiver.attach()
+        pd.testing.assert_frame_equal(attached, frame)
+        self.assertFalse(attached['y'].to_numpy().flags.writeable)
+        # Пока столбцы ссылаются на блок, отображение не закрывается
+        self.assertFalse(receiver.release())
+        del attached
+        self.assertTrue(receiver.release())
+        shared.unlink()
+        with self.assertRaises(FileNotFoundError):
+            SharedFrame(shared.name, shared.size).attach()
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют движок анализа в отдельном процессе.
+
+Что тестируется:
+Отчет строится в дочернем процессе, а прогресс и результат приходят по каналу.
+Набор данных, уже загруженный в основном процессе, передается через разделяемую память без повторного чтения файла.
+Передается и проекция без фильтра: недостающие столбцы движок дочитывает сам.
+Передача данных идет в фоновом потоке: submit_analysis не ждет сериализации, а отмена во время передачи снимает задание.
+DataFrame передается через Arrow в именованной разделяемой памяти без копирования числовых столбцов, а блок удаляет владелец.
+Зачем это нужно:
+Убедиться, что тяжелые вычисления не блокируют интерфейс и не требуют повторной загрузки данных.'''
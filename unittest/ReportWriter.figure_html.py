@@ -0,0 +1,112 @@
+import base64
+import gzip
+import io
+import json
+import os
+import re
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from report_writer import ReportWriter, encode_typed_array, plotlyjs_supports_typed_arrays
+from visualizer import UnifiedBrowserVisualizer
+
+def decode_typed_array(spec):
+    values = np.frombuffer(base64.b64decode(spec['bdata']), dtype='<' + spec['dtype'])
+    if 'shape' in spec:
+        values = values.reshape([int(size) for size in spec['shape'].split(',')])
+    return values
+
+class TestReportWriter(unittest.TestCase):
+    def setUp(self):
+        self.x = np.arange(1000, dtype=np.int64)
+        self.y = np.linspace(0, 1, 1000)
+        self.fig = go.Figure(go.Scatter(x=self.x, y=self.y, mode='markers'))
+
+    def _payload(self, fragment):
+        match = re.search(r'<script type="[^"]+" id="[^"]+"( data-encoding="gzip")?>(.*?)</script>', fragment, re.S)
+        text = match.group(2)
+        if match.group(1):
+            text = gzip.decompress(base64.b64decode(text)).decode('utf-8')
+        return json.loads(text)
+
+    def test_arrays_round_trip_as_typed_arrays(self):
+        for compress in (True, False):
+            spec = self._payload(ReportWriter(compress=compress).figure_html(self.fig, 'Точки'))
+            trace = spec['data'][0]
+            self.assertEqual(trace['x']['dtype'], 'i4')
+            np.testing.assert_array_equal(decode_typed_array(trace['x']), self.x)
+            np.testing.assert_array_equal(decode_typed_array(trace['y']), self.y)
+
+    def test_compression_is_opt_in_and_checked_in_browser(self):
+        self.assertNotIn('data-encoding="gzip"', ReportWriter().figure_html(self.fig, 'Точки'))
+        self.assertIn('data-encoding="gzip"', ReportWriter(compress=True).figure_html(self.fig, 'Точки'))
+        loader = ReportWriter().loader_html()
+        self.assertIn("'DecompressionStream' in window", loader)
+        self.assertIn('Не удалось построить график', loader)
+
+    def test_old_plotlyjs_gets_plain_arrays(self):
+        self.assertTrue(plotlyjs_supports_typed_arrays('2.28.0'))
+        self.assertFalse(plotlyjs_supports_typed_arrays('2.27.1'))
+        self.assertFalse(plotlyjs_supports_typed_arrays('1.58.5'))
+        with mock.patch('report_writer.get_plotlyjs_version', return_value='2.18.2'):
+            writer = ReportWriter()
+        trace = self._payload(writer.figure_html(self.fig, 'Точки'))['data'][0]
+        self.assertEqual(trace['x'], self.x.tolist())
+        self.assertEqual(trace['y'], self.y.tolist())
+
+    def test_matrix_keeps_shape(self):
+        z = np.arange(40, dtype=np.float32).reshape(5, 8)
+        np.testing.assert_array_equal(decode_typed_array(encode_typed_array(z)), z)
+
+    def test_text_arrays_stay_json(self):
+        self.assertIsNone(encode_typed_array(np.array(['a'] * 100, dtype=object)))
+
+    def test_report_inlines_plotlyjs_once(self):
+        visualizer = UnifiedBrowserVisualizer('dummy_path', load=False)
+        visualizer.data = pd.DataFrame({'age': np.arange(100), 'salary': np.linspace(1, 2, 100)})
+        visualizer.add_histogram('age')
+        visualizer.add_scatter('age', 'salary')
+        with mock.patch('visualizer.webbrowser.open'):
+            path = visualizer.generate_report()
+        try:
+            with open(path, encoding='utf-8') as f:
+                content = f.read()
+        finally:
+            os.remove(path)
+        self.assertNotIn('<script src=', content)
+        self.assertEqual(content.count('plotly.js v'), 1)
+        self.assertEqual(content.count('dv-figure plotly-graph-div'), 2)
+        self.assertEqual(content.count('function dvLoadFigure'), 1)
+
+    def test_lazy_report_with_toc(self):
+        f = io.StringIO()
+        figures = [('Первый', self.fig), ('Второй', go.Figure(go.Bar(x=['a', 'b'], y=[1, 2])))]
+        ReportWriter(plotlyjs='cdn', lazy=True).write(f, "Отчет", "", figures, toc_titles=[t for t, _ in figures])
+        content = f.getvalue()
+        self.assertIn('var DV_LAZY = true;', content)
+        self.assertIn('IntersectionObserver', content)
+        self.assertIn('<a href="#dv-fig-2-box">Второй</a>', content)
+        self.assertIn('id="dv-fig-2-box"', content)
+
+    def test_eager_report_without_toc(self):
+        f = io.StringIO()
+        ReportWriter(plotlyjs='cdn').write(f, "Отчет", "", [('Первый', self.fig)])
+        self.assertIn('var DV_LAZY = false;', f.getvalue())
+        self.assertNotIn('report-toc"', f.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют компактную запись графиков в HTML-отчет.
+
+Что тестируется:
+Числовые массивы трасс записываются как base64-типизированные массивы и восстанавливаются без потерь, со сжатием gzip и без него.
+Для plotly.js старше 2.28, который не умеет типизированные массивы, массивы пишутся обычным JSON.
+Сжатие gzip включается явно; загрузчик проверяет поддержку DecompressionStream и показывает ошибку вместо пустого графика.
+Матрицы сохраняют форму, а текстовые массивы остаются обычным JSON.
+Отчет содержит plotly.js один раз и не ссылается на CDN.
+В ленивом режиме графики строятся при прокрутке, а оглавление ссылается на контейнеры графиков.
+Зачем это нужно:
+Убедиться, что отчет открывается без сети и не раздувается от текстового JSON.'''
@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+import pandas as pd
+from streaming_stats import StreamingStats, NumericAccumulator
+
+class TestStreamingStats(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 20000
+        self.df = pd.DataFrame({
+            'salary': rng.normal(50000, 10000, n),
+            'department': rng.choice(['IT', 'HR', 'Sales'], n)
+        })
+
+    def test_chunked_moments(self):
+        stats = StreamingStats()
+        for start in range(0, len(self.df), 3000):
+            stats.update(self.df.iloc[start:start + 3000])
+        acc = stats.numeric['salary']
+        self.assertEqual(stats.rows, len(self.df))
+        self.assertAlmostEqual(acc.mean, self.df['salary'].mean(), places=6)
+        self.assertAlmostEqual(acc.std, self.df['salary'].std(), places=4)
+        self.assertEqual(acc.min, self.df['salary'].min())
+        self.assertAlmostEqual(acc.quantile(0.5), self.df['salary'].median(), delta=100)
+        _, counts = acc.histogram(10)
+        self.assertEqual(counts.sum(), len(self.df))
+
+    def test_merge_matches_single_pass(self):
+        left = NumericAccumulator()
+        right = NumericAccumulator()
+        left.update(self.df['salary'].to_numpy()[:5000])
+        right.update(self.df['salary'].to_numpy()[5000:])
+        left.merge(right)
+        self.assertEqual(left.count, len(self.df))
+        self.assertAlmostEqual(left.variance, self.df['salary'].var(), delta=1e-3)
+
+    def test_category_counts_and_group_means(self):
+        stats = StreamingStats()
+        stats.update(self.df.iloc[:7000])
+        stats.update(self.df.iloc[7000:])
+        expected = self.df['department'].value_counts()
+        self.assertEqual(stats.categorical['department'].counts['IT'], expected['IT'])
+        means = stats.group.means
+        self.assertAlmostEqual(means['HR'], self.df[self.df['department'] == 'HR']['salary'].mean(), places=4)
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют потоковый движок статистики .
+
+Что тестируется:
+Расчет количества, среднего, дисперсии, минимума и квантилей по блокам данных.
+Объединение накопителей, посчитанных по разным частям файла.
+Подсчет категорий и средних по группам без полного DataFrame.
+Зачем это нужно:
+Убедиться, что графики в потоковом режиме совпадают с графиками по полностью загруженным данным.'''
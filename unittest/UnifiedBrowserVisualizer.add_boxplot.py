@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+import pandas as pd
+from visualizer import UnifiedBrowserVisualizer, MAX_BOX_OUTLIERS
+
+class TestPrecomputedCharts(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({'salary': rng.normal(50000, 10000, 200000)})
+        self.visualizer = UnifiedBrowserVisualizer('dummy_path', load=False)
+        self.visualizer.data = self.df
+
+    def test_boxplot_quartiles(self):
+        self.visualizer.add_boxplot('salary')
+        box, outliers = self.visualizer.figures[0].data
+        q1, median, q3 = np.percentile(self.df['salary'], [25, 50, 75])
+        self.assertAlmostEqual(box.q1[0], q1)
+        self.assertAlmostEqual(box.median[0], median)
+        self.assertAlmostEqual(box.q3[0], q3)
+        self.assertIsNone(box.y)
+        self.assertLessEqual(len(outliers.y), MAX_BOX_OUTLIERS)
+
+    def test_boxplot_of_empty_column_is_reported(self):
+        self.visualizer.data = pd.DataFrame({'salary': [np.nan] * 10})
+        self.visualizer.add_boxplot('salary')
+        fig = self.visualizer.figures[0]
+        self.assertEqual(len(fig.data), 0)
+        self.assertIn('нет числовых значений', fig.layout.annotations[0].text)
+
+    def test_histogram_counts(self):
+        self.visualizer.add_histogram('salary', bins=20)
+        bar = self.visualizer.figures[0].data[0]
+        self.assertEqual(bar.type, 'bar')
+        self.assertEqual(len(bar.y), 20)
+        self.assertEqual(sum(bar.y), len(self.df))
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют гистограммы и диаграммы размаха, посчитанные заранее .
+
+Что тестируется:
+Квартили диаграммы размаха совпадают с numpy, а исходные значения в график не попадают.
+Число выбросов ограничено.
+Для столбца без значений в отчет попадает пометка, а не пропуск графика.
+Гистограмма содержит только частоты по корзинам, сумма частот равна числу строк.
+Зачем это нужно:
+Убедиться, что размер отчета не растет вместе с числом строк.'''
@@ -0,0 +1,59 @@
+import gc
+import io
+import unittest
+import weakref
+import numpy as np
+import pandas as pd
+from report_writer import ReportWriter
+from visualizer import UnifiedBrowserVisualizer
+
+class TrackingFile(io.StringIO):
+    def __init__(self, refs):
+        super().__init__()
+        self.refs = refs
+        self.leaked = 0
+
+    def write(self, text):
+        # К моменту записи очередного графика все уже записанные должны быть освобождены
+        gc.collect()
+        written = self.getvalue().count('dv-figure plotly-graph-div')
+        self.leaked = max(self.leaked, sum(ref() is not None for ref in self.refs[:written]))
+        return super().write(text)
+
+class TestStreamingReport(unittest.TestCase):
+    def setUp(self):
+        self.visualizer = UnifiedBrowserVisualizer('dummy_path', load=False)
+        self.visualizer.data = pd.DataFrame({'a': np.arange(500), 'b': np.linspace(0, 1, 500), 'c': np.arange(500) % 7})
+        for col in ('a', 'b', 'c'):
+            self.visualizer.add_histogram(col)
+            self.visualizer.add_boxplot(col)
+
+    def test_figures_are_released_while_writing(self):
+        refs = [weakref.ref(fig) for fig in self.visualizer.figures]
+        f = TrackingFile(refs)
+        ReportWriter(plotlyjs='cdn').write(f, "Отчет", "<h1>Отчет</h1>", self.visualizer._report_figures(keep_figures=False))
+        self.assertEqual(self.visualizer.figures, [])
+        self.assertEqual(f.leaked, 0)
+        gc.collect()
+        self.assertEqual(sum(ref() is not None for ref in refs), 0)
+        content = f.getvalue()
+        self.assertEqual(content.count('dv-figure plotly-graph-div'), len(refs))
+        self.assertTrue(content.rstrip().endswith('</html>'))
+
+    def test_keep_figures(self):
+        count = len(self.visualizer.figures)
+        f = io.StringIO()
+        ReportWriter(plotlyjs='cdn').write(f, "Отчет", "", self.visualizer._report_figures(keep_figures=True))
+        self.assertEqual(len(self.visualizer.figures), count)
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют потоковую запись HTML-отчета.
+
+Что тестируется:
+Графики пишутся в файл по одному и освобождаются сразу после записи.
+Документ получается полным, со всеми графиками и закрывающими тегами.
+При keep_figures=True список графиков сохраняется.
+Зачем это нужно:
+Убедиться, что пик памяти при создании отчета ограничен размером одного графика, а не всего отчета.'''
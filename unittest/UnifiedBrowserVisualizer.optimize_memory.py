@@ -0,0 +1,41 @@
+import unittest
+import numpy as np
+import pandas as pd
+from dtype_plan import plan_dtypes, apply_dtype_plan
+
+class TestOptimizeMemory(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'age': [25, 35, 45, 55, 65, 20],
+            'delta': [-300, 200, 100, 0, 5, 7],
+            'bonus': [1.0, np.nan, 3.0, 4.0, 5.0, 6.0],
+            'salary': [50000.5, 70000.25, 90000.75, 10000.0, 2000.5, 3000.5],
+            'department': ['IT', 'HR', 'IT', 'IT', 'HR', 'IT']
+        })
+
+    def test_plan(self):
+        plan = plan_dtypes(self.df)
+        self.assertEqual(plan['age'], np.dtype(np.uint8))
+        self.assertEqual(plan['delta'], np.dtype(np.int16))
+        self.assertEqual(plan['bonus'], 'UInt8')
+        self.assertEqual(plan['salary'], np.dtype(np.float32))
+        self.assertEqual(plan['department'], 'category')
+
+    def test_apply_reports_saved_bytes(self):
+        optimized, report = apply_dtype_plan(self.df, plan_dtypes(self.df))
+        self.assertEqual(str(optimized['department'].dtype), 'category')
+        self.assertEqual(optimized['age'].tolist(), self.df['age'].tolist())
+        self.assertTrue(optimized['bonus'].isna().iloc[1])
+        self.assertEqual(set(report['Column']), {'age', 'delta', 'bonus', 'salary', 'department'})
+        self.assertTrue((report['BytesSaved'] > 0).all())
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют планирование типов при оптимизации памяти .
+
+Что тестируется:
+Выбор беззнаковых, знаковых и nullable целых типов, float32 и category за один проход статистики.
+Применение плана одним пересбором фрейма и отчет о сэкономленных байтах по столбцам.
+Зачем это нужно:
+Убедиться, что уменьшение типов не искажает данные и действительно экономит память.'''
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+import readers
+from analysis_thread import AnalysisThread
+from progress import AnalysisCancelled
+from visualizer import UnifiedBrowserVisualizer
+
+class TestProgressAndCancel(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'test.csv')
+        # Больше одного блока чтения, чтобы отмена успела сработать между блоками
+        n = readers.READ_CHUNKSIZE * 3
+        pd.DataFrame({
+            'age': np.arange(n) % 90,
+            'salary': np.linspace(1000, 9000, n),
+            'department': np.where(np.arange(n) % 2, 'IT', 'HR')
+        }).to_csv(self.file_path, index=False)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_progress_counts_bytes_and_figures(self):
+        events = []
+        visualizer = UnifiedBrowserVisualizer(self.file_path, use_cache=False,
+                                              progress_callback=lambda *event: events.append(event))
+        load = [event for event in events if event[0] == 'load']
+        self.assertGreater(len(load), 1)
+        self.assertEqual(load[-1][1], os.path.getsize(self.file_path))
+        visualizer.process_data({"histograms": True, "pie_chart": True})
+        figures = [event for event in events if event[0] == 'figures']
+        self.assertEqual(figures[-1][1:], (3, 3))
+
+    def test_cancel_between_load_chunks(self):
+        cancel_event = threading.Event()
+        chunks = []
+        def on_progress(stage, done, total):
+            chunks.append(done)
+            if len(chunks) == 3:
+                cancel_event.set()
+        with self.assertRaises(AnalysisCancelled):
+            UnifiedBrowserVisualizer(self.file_path, use_cache=False, progress_callback=on_progress,
+                                     cancel_event=cancel_event)
+        self.assertLess(chunks[-1], os.path.getsize(self.file_path))
+
+    def test_cancel_between_figure_builders(self):
+        visualizer = UnifiedBrowserVisualizer(self.file_path, use_cache=False, max_workers=1)
+        def on_progress(stage, done, total):
+            if stage == 'figures' and done == 1:
+                visualizer.progress.cancel_event.set()
+        visualizer.progress.callback = on_progress
+        with self.assertRaises(AnalysisCancelled):
+            visualizer.process_data({"histograms": True, "boxplot": True})
+        self.assertEqual(visualizer.figures, [])
+
+    def test_thread_reports_cancellation(self):
+        thread = AnalysisThread(self.file_path, {"histograms": True})
+        results = []
+        thread.analysis_cancelled.connect(lambda: results.append('cancelled'))
+        thread.analysis_complete.connect(lambda path: results.append(path))
+        thread.cancel()
+        with mock.patch('visualizer.webbrowser.open'):
+            thread.run()
+        self.assertEqual(results, ['cancelled'])
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют прогресс и кооперативную отмену анализа.
+
+Что тестируется:
+Прогресс загрузки считается по прочитанным байтам, прогресс построения — по числу готовых графиков из запланированных.
+Отмена срабатывает между блоками чтения файла и между построителями графиков.
+Поток анализа сообщает об отмене отдельным сигналом, а не ошибкой.
+Зачем это нужно:
+Убедиться, что долгий анализ больших файлов можно остановить без закрытия приложения и что индикатор отражает реальный ход работы.'''
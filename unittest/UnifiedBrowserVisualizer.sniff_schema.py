@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from visualizer import UnifiedBrowserVisualizer
+
+class TestSchemaSniffing(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'test.csv')
+        n = 5000
+        self.df = pd.DataFrame({
+            'age': np.arange(n) % 90,
+            'salary': np.linspace(1000, 9000, n),
+            'department': np.where(np.arange(n) % 2, 'IT', 'HR'),
+            'hired': pd.date_range('2020-01-01', periods=n, freq='h').astype(str)
+        })
+        self.df.to_csv(self.file_path, index=False)
+
+    def test_sniff_schema_without_full_load(self):
+        visualizer = UnifiedBrowserVisualizer(self.file_path, use_cache=False, load=False)
+        schema = visualizer.sniff_schema(head_rows=100)
+        self.assertIsNone(visualizer.data)
+        self.assertTrue(schema.sampled)
+        self.assertLess(schema.sample_rows, len(self.df))
+        self.assertEqual(schema.columns, ['age', 'salary', 'department', 'hired'])
+        self.assertEqual(schema.numeric_cols, ['age', 'salary'])
+        self.assertIn('department', schema.category_cols)
+        self.assertEqual(schema.time_cols, ['hired'])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют быстрое определение схемы файла по выборке .
+
+Что тестируется:
+Чтение только ограниченной выборки строк (начало файла и строки из середины).
+Определение числовых, категориальных и временных столбцов по выборке.
+Зачем это нужно:
+Убедиться, что выбор файла в окне заполняет флажки и список столбцов фильтра без полного разбора файла.'''
@@ -0,0 +1,90 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import cli
+
+class TestCliMain(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dir = self.temp_dir.name
+        n = 200
+        self.frame = pd.DataFrame({
+            'age': np.arange(n) % 90,
+            'salary': np.linspace(1000, 9000, n),
+            'department': np.where(np.arange(n) % 2, 'IT', 'HR')
+        })
+        self.files = []
+        for name in ('first.csv', 'second.csv'):
+            path = os.path.join(self.dir, name)
+            self.frame.to_csv(path, index=False)
+            self.files.append(path)
+        self.out_dir = os.path.join(self.dir, 'reports')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_cli(self, *argv):
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err), patch('webbrowser.open') as browser:
+            code = cli.main(list(argv))
+        browser.assert_not_called()
+        return code, out.getvalue(), err.getvalue()
+
+    def test_reports_for_many_files_in_parallel(self):
+        code, out, _ = self.run_cli(*self.files, '-c', 'histograms,pie_chart', '-o', self.out_dir, '-j', '2',
+                                    '--no-cache')
+        self.assertEqual(code, cli.EXIT_OK)
+        for name in ('first.html', 'second.html'):
+            with open(os.path.join(self.out_dir, name), encoding='utf-8') as f:
+                self.assertIn('plotly', f.read())
+        self.assertIn('first.csv', out)
+
+    def test_failed_file_gives_nonzero_exit_code(self):
+        missing = os.path.join(self.dir, 'missing.csv')
+        code, _, err = self.run_cli(self.files[0], missing, '-o', self.out_dir, '-j', '1', '--no-cache')
+        self.assertEqual(code, cli.EXIT_FAILED)
+        self.assertIn('missing.csv', err)
+        self.assertTrue(os.path.exists(os.path.join(self.out_dir, 'first.html')))
+
+    def test_config_file_and_typed_filter(self):
+        config = os.path.join(self.dir, 'config.json')
+        output = os.path.join(self.dir, 'single.html')
+        with open(config, 'w', encoding='utf-8') as f:
+            json.dump({'charts': ['data_info'], 'where': [['department', '==', 'IT']], 'output': output}, f)
+        with patch('visualizer.UnifiedBrowserVisualizer.apply_filter', autospec=True,
+                   side_effect=lambda self, condition: setattr(self, 'data', self.data.head(0))) as apply_filter:
+            code, _, _ = self.run_cli(self.files[0], '--config', config, '--no-cache')
+        self.assertEqual(code, cli.EXIT_OK)
+        self.assertTrue(os.path.exists(output))
+        self.assertEqual(apply_filter.call_args[0][1].clauses[0].key, ('department', '==', 'IT'))
+
+    def test_usage_errors(self):
+        code, _, err = self.run_cli(self.files[0], '-c', 'unknown_chart')
+        self.assertEqual(code, cli.EXIT_USAGE)
+        self.assertIn('unknown_chart', err)
+        code, _, _ = self.run_cli(self.files[0], '-f', 'age > 1', '-w', 'age', '>', '1')
+        self.assertEqual(code, cli.EXIT_USAGE)
+
+    def test_output_paths_do_not_collide(self):
+        paths = cli.output_paths(['a/data.csv', 'b/data.csv'], 'out')
+        self.assertEqual([p.name for p in paths], ['data.html', 'data_2.html'])
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют запуск анализа из командной строки.
+
+Что тестируется:
+Отчеты по нескольким файлам строятся параллельно в отдельных процессах и записываются в указанный каталог.
+Ошибка в одном файле не мешает остальным и дает ненулевой код завершения.
+Параметры читаются из JSON-файла конфигурации, типизированный фильтр передается в визуализатор.
+Неверные параметры дают код ошибки использования.
+Имена отчетов для одноименных файлов не совпадают.
+Зачем это нужно:
+Убедиться, что отчеты можно строить на сервере по расписанию без графического интерфейса и браузера.'''
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+import pandas as pd
+from column_plan import plan_columns
+from columnar_cache import get_columnar_cache
+from dataset_cache import get_dataset_cache
+from figure_cache import get_figure_cache
+from filters import FilterSpec
+from schema import DataSchema
+from visualizer import UnifiedBrowserVisualizer
+
+class TestPlanColumns(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'wide.csv')
+        rng = np.random.default_rng(0)
+        n = 500
+        self.frame = pd.DataFrame({
+            'id': np.arange(n),
+            'date': pd.date_range('2024-01-01', periods=n, freq='h').strftime('%Y-%m-%d %H:%M:%S'),
+            'region': rng.choice(['North', 'South'], n),
+            'x1': rng.normal(size=n),
+            'x2': rng.normal(size=n),
+            'x3': rng.normal(size=n),
+            'x4': rng.normal(size=n),
+            'note': rng.choice(['a', 'b', 'c'], n),
+        })
+        self.frame.to_csv(self.file_path, index=False)
+        self.schema = DataSchema.from_frame(pd.read_csv(self.file_path))
+        get_dataset_cache().invalidate()
+        get_figure_cache().invalidate()
+        self.cache_dir = get_columnar_cache().cache_dir
+        get_columnar_cache().cache_dir = Path(self.temp_dir.name) / 'cache'
+
+    def tearDown(self):
+        get_dataset_cache().invalidate()
+        get_columnar_cache().cache_dir = self.cache_dir
+        self.temp_dir.cleanup()
+
+    def test_options_map_to_column_prefixes(self):
+        self.assertEqual(plan_columns(self.schema, {"histograms": True}), ['id', 'x1', 'x2'])
+        self.assertEqual(plan_columns(self.schema, {"line_chart": True, "pie_chart": True}), ['id', 'date', 'region'])
+        self.assertEqual(plan_columns(self.schema, {"time_series": True}), ['id', 'date'])
+        self.assertEqual(plan_columns(self.schema, {"correlation": True}), ['id', 'x1', 'x2', 'x3', 'x4'])
+        self.assertIsNone(plan_columns(self.schema, {"data_info": True, "histograms": True}))
+
+    def test_filter_columns_are_included(self):
+        spec = FilterSpec([('note', '==', 'a')])
+        self.assertEqual(plan_columns(self.schema, {"line_chart": True}, spec), ['id', 'note'])
+        self.assertEqual(plan_columns(self.schema, {"line_chart": True}, "x4 > 0"), ['id', 'x4'])
+
+    def figure_titles(self, visualizer, options):
+        visualizer.process_data(options)
+        return [fig.layout.title.text for fig in visualizer.figures]
+
+    def test_projected_load_builds_same_figures(self):
+        options = {"histograms": True, "bar_chart": True, "pie_chart": True, "time_series": True, "scatter": True}
+        full = UnifiedBrowserVisualizer(self.file_path, use_cache=False)
+        projected = UnifiedBrowserVisualizer(self.file_path, use_cache=False, load=False)
+        projected.columns = projected.plan_columns(options)
+        projected.load_data()
+        self.assertLess(len(projected.data.columns), len(full.data.columns))
+        self.assertEqual(self.figure_titles(projected, options), self.figure_titles(full, options))
+
+    def test_projection_reuses_full_dataset_from_disk_cache(self):
+        UnifiedBrowserVisualizer(self.file_path)
+        get_dataset_cache().invalidate()
+        visualizer = UnifiedBrowserVisualizer(self.file_path, load=False, columns=['x1', 'region'])
+        with mock.patch.object(UnifiedBrowserVisualizer, '_read_file') as read_file:
+            visualizer.load_data()
+        read_file.assert_not_called()
+        self.assertEqual(list(visualizer.data.columns), ['region', 'x1'])
+
+    def test_projection_reuses_wider_projection(self):
+        UnifiedBrowserVisualizer(self.file_path, columns=['region', 'x1', 'x2'])
+        cache_dir = get_columnar_cache().cache_dir
+        files = set(cache_dir.glob('*.feather'))
+        for drop_memory in (False, True):
+            if drop_memory:
+                get_dataset_cache().invalidate()
+            visualizer = UnifiedBrowserVisualizer(self.file_path, load=False, columns=['x2', 'region'])
+            with mock.patch.object(UnifiedBrowserVisualizer, '_read_file') as read_file:
+                visualizer.load_data()
+            read_file.assert_not_called()
+            self.assertEqual(list(visualizer.data.columns), ['region', 'x2'])
+        # Проекция, полученная из более широкой, своего файла в кэше на диске не создает
+        self.assertEqual(set(cache_dir.glob('*.feather')), files)
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют планирование столбцов перед загрузкой.
+
+Что тестируется:
+Каждый тип графика требует свои первые числовые столбцы и первую категорию; информация о данных требует весь файл.
+Столбцы фильтра (типизированного и строкового) тоже попадают в план.
+Графики по частично загруженному файлу совпадают с графиками по полному.
+Если полный набор уже сохранен в кэше на диске, нужные столбцы берутся оттуда без разбора файла.
+Уже прочитанная более широкая проекция (в памяти или на диске) тоже избавляет от чтения файла и лишней копии на диске.
+Зачем это нужно:
+Убедиться, что из широкого файла читаются только используемые столбцы, а результат анализа не меняется.'''
@@ -0,0 +1,41 @@
+import unittest
+import numpy as np
+import pandas as pd
+from decimation import lttb, stratified_sample
+
+class TestDecimation(unittest.TestCase):
+    def test_lttb_keeps_endpoints_and_peaks(self):
+        x = np.arange(10000)
+        y = np.zeros(10000)
+        y[4321] = 100.0
+        selected = lttb(x, y, 200)
+        self.assertEqual(len(selected), 200)
+        self.assertEqual(selected[0], 0)
+        self.assertEqual(selected[-1], 9999)
+        self.assertIn(4321, selected)
+        self.assertTrue((np.diff(selected) > 0).all())
+
+    def test_stratified_sample_keeps_outliers(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({'x': rng.normal(0, 1, 100000), 'y': rng.normal(0, 1, 100000)})
+        df.loc[123, ['x', 'y']] = [50.0, 50.0]
+        sample = stratified_sample(df, ['x', 'y'], 1000)
+        self.assertLess(len(sample), 1500)
+        self.assertIn(123, sample.index)
+
+    def test_small_frames_untouched(self):
+        df = pd.DataFrame({'x': [1, 2, 3], 'y': [3, 2, 1]})
+        self.assertIs(stratified_sample(df, ['x', 'y'], 1000), df)
+        self.assertEqual(list(lttb(df['x'], df['y'], 1000)), [0, 1, 2])
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют прореживание точек для больших графиков .
+
+Что тестируется:
+LTTB сохраняет первую и последнюю точку и резкие пики линии.
+Стратифицированная выборка сохраняет выбросы из редких областей.
+Небольшие данные передаются без изменений.
+Зачем это нужно:
+Убедиться, что отчет с миллионами строк остается легким, но графики не теряют форму.'''
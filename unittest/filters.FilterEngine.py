@@ -0,0 +1,75 @@
+import unittest
+import numpy as np
+import pandas as pd
+from filters import FilterEngine, FilterSpec, filter_frame
+
+class TestFilterEngine(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 5000
+        self.df = pd.DataFrame({
+            'age': rng.integers(18, 70, n),
+            'salary': rng.normal(50000, 10000, n),
+            'department': pd.Categorical(rng.choice(['IT', 'HR', 'Sales', None], n)),
+            'name': rng.choice(['Anna', 'Boris', 'Vera', None], n).astype(object),
+            'score': pd.array(rng.integers(0, 10, n), dtype='Int8'),
+        })
+        self.df.loc[::9, 'salary'] = np.nan
+        self.df.loc[::4, 'score'] = pd.NA
+        self.engine = FilterEngine()
+
+    def assert_matches_query(self, clause, query):
+        result = self.engine.apply(self.df, FilterSpec([clause]))
+        expected = self.df.query(query)
+        self.assertTrue(result.index.equals(expected.index), f"{clause} != {query}")
+
+    def test_clauses_match_query(self):
+        self.assert_matches_query(('age', '>=', '40'), 'age >= 40')
+        self.assert_matches_query(('salary', '<', '45000'), 'salary < 45000')
+        self.assert_matches_query(('salary', '!=', '45000'), 'salary != 45000')
+        self.assert_matches_query(('department', '==', 'IT'), 'department == "IT"')
+        self.assert_matches_query(('department', '!=', 'IT'), 'department != "IT"')
+        self.assert_matches_query(('name', '==', 'Vera'), 'name == "Vera"')
+        self.assert_matches_query(('score', '>', '5'), 'score > 5')
+
+    def test_contains_is_case_insensitive(self):
+        result = self.engine.apply(self.df, FilterSpec([('name', 'contains', 'OR')]))
+        expected = self.df[self.df['name'].str.contains('or', case=False, na=False)]
+        self.assertTrue(result.index.equals(expected.index))
+
+    def test_and_or(self):
+        clauses = [('age', '<', '30'), ('department', '==', 'HR')]
+        both = self.engine.mask(self.df, FilterSpec(clauses, 'and'))
+        either = self.engine.mask(self.df, FilterSpec(clauses, 'or'))
+        age, hr = (self.df['age'] < 30).to_numpy(), (self.df['department'] == 'HR').to_numpy()
+        np.testing.assert_array_equal(both, age & hr)
+        np.testing.assert_array_equal(either, age | hr)
+
+    def test_changed_clause_recomputes_only_its_mask(self):
+        computed = []
+        original = self.engine._compute
+        self.engine._compute = lambda data, clause: computed.append(clause.key) or original(data, clause)
+        self.engine.mask(self.df, FilterSpec([('age', '<', '30'), ('department', '==', 'HR')]))
+        self.engine.mask(self.df, FilterSpec([('age', '<', '40'), ('department', '==', 'HR')]))
+        self.assertEqual(computed, [('age', '<', '30'), ('department', '==', 'HR'), ('age', '<', '40')])
+
+    def test_non_numeric_value_for_numeric_column(self):
+        with self.assertRaises(ValueError):
+            self.engine.mask(self.df, FilterSpec([('age', '>', 'abc')]))
+
+    def test_string_condition_still_supported(self):
+        self.assertEqual(len(filter_frame(self.df, 'age > 60')), int((self.df['age'] > 60).sum()))
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют типизированный движок фильтрации.
+
+Что тестируется:
+Условия (столбец, оператор, значение) дают те же строки, что и DataFrame.query, в том числе для категорий, строк, пропусков и nullable-типов.
+Поиск подстроки не зависит от регистра.
+Условия объединяются через AND и OR.
+При изменении одного условия пересчитывается только его маска.
+Нечисловое значение для числового столбца вызывает понятную ошибку.
+Зачем это нужно:
+Убедиться, что фильтр сравнивает значения по типу столбца и не пересчитывает неизменившиеся условия.'''
@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+import pandas as pd
+from grouping import group_column, kde_curve
+
+class TestGrouping(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 10000
+        self.df = pd.DataFrame({
+            'department': pd.Categorical(rng.choice(['IT', 'HR', 'Sales', 'Ops'], n)),
+            'salary': rng.normal(50000, 10000, n)
+        })
+        self.df.loc[::97, 'salary'] = np.nan
+
+    def test_split_matches_boolean_masks(self):
+        grouped = group_column(self.df['department'], self.df['salary'])
+        labels, groups = grouped.split(limit=3)
+        self.assertEqual(list(labels), list(self.df['department'].unique()[:3]))
+        for label, values in zip(labels, groups):
+            expected = self.df[self.df['department'] == label]['salary'].dropna().to_numpy()
+            np.testing.assert_array_equal(values, expected)
+
+    def test_means_match_groupby(self):
+        labels, means = group_column(self.df['department'], self.df['salary'], sort=True).means()
+        expected = self.df.groupby('department', observed=True)['salary'].mean()
+        self.assertEqual(list(labels), list(expected.index))
+        np.testing.assert_allclose(means, expected.to_numpy())
+
+    def test_kde_integrates_to_one(self):
+        grid, density = kde_curve(self.df['salary'].dropna().to_numpy())
+        self.assertAlmostEqual(np.trapezoid(density, grid) if hasattr(np, 'trapezoid') else np.trapz(density, grid),
+                               1.0, places=2)
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют группировку числового столбца по категориям за один проход .
+
+Что тестируется:
+Разбиение значений по категориям совпадает с фильтрацией булевой маской.
+Средние по группам совпадают с groupby.
+Предварительно посчитанная KDE для диаграммы скрипки нормирована.
+Зачем это нужно:
+Убедиться, что диаграммы скрипки, столбчатые и радарные строятся за один проход без искажения данных.'''
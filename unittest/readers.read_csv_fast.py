@@ -0,0 +1,128 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+import numpy as np
+import pandas as pd
+import readers
+from progress import Progress, AnalysisCancelled
+from readers import read_csv_fast
+from schema import sniff_csv
+from visualizer import UnifiedBrowserVisualizer
+
+class TestReadCsvFast(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'test.csv')
+        n = 3000
+        self.df = pd.DataFrame({
+            'age': np.arange(n) % 90,
+            'salary': np.linspace(1000.5, 9000.5, n),
+            'department': np.where(np.arange(n) % 2, 'IT', 'HR'),
+            'hired': pd.date_range('2020-01-01', periods=n, freq='h').strftime('%Y-%m-%d %H:%M:%S')
+        })
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read(self, **kwargs):
+        with self.assertLogs('readers', level='INFO') as logs:
+            data = read_csv_fast(self.file_path, **kwargs)
+        return data, '\n'.join(logs.output)
+
+    def test_pyarrow_engine_with_sniffed_delimiter(self):
+        self.df.to_csv(self.file_path, index=False, sep=';')
+        with mock.patch('readers.read_csv_typed') as pandas_reader:
+            data, log = self.read()
+        pandas_reader.assert_not_called()
+        self.assertIn('движок pyarrow', log)
+        self.assertIn('MB/s', log)
+        self.assertEqual(list(data.columns), list(self.df.columns))
+        self.assertEqual(data['age'].dtype, np.uint8)
+        self.assertEqual(data['salary'].dtype, np.float32)
+        self.assertEqual(str(data['department'].dtype), 'category')
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(data['hired']))
+        self.assertEqual(data['department'].tolist(), self.df['department'].tolist())
+
+    def test_headerless_file_is_parsed_once(self):
+        pd.DataFrame({'a': np.arange(500), 'b': np.arange(500) * 0.5}).to_csv(
+            self.file_path, index=False, header=False)
+        self.assertFalse(sniff_csv(self.file_path).has_header)
+        with mock.patch('readers.read_csv_typed') as pandas_reader:
+            data, log = self.read()
+        pandas_reader.assert_not_called()
+        self.assertIn('движок pyarrow', log)
+        self.assertEqual(list(data.columns), [0, 1])
+        self.assertEqual(len(data), 500)
+        self.assertEqual(data[1].dtype, np.float32)
+
+    def test_text_only_file_keeps_header(self):
+        pd.DataFrame({'name': ['Anna', 'Bob', 'Christopher', 'Di'] * 50,
+                      'city': ['Moscow', 'Kazan', 'Saint Petersburg', 'Ufa'] * 50}).to_csv(
+            self.file_path, index=False)
+        self.assertTrue(sniff_csv(self.file_path).has_header)
+        data, _ = self.read()
+        self.assertEqual(list(data.columns), ['name', 'city'])
+        self.assertEqual(data['name'].iloc[0], 'Anna')
+        self.assertEqual(len(data), 200)
+
+    def test_numeric_header_row_is_detected(self):
+        self.df.to_csv(self.file_path, index=False)
+        self.assertTrue(sniff_csv(self.file_path).has_header)
+        self.df[['age', 'salary']].to_csv(self.file_path, index=False, header=False)
+        self.assertFalse(sniff_csv(self.file_path).has_header)
+
+    def test_falls_back_to_pandas_when_pyarrow_fails(self):
+        self.df['salary'] = self.df['salary'].astype(object)
+        self.df.loc[len(self.df) - 1, 'salary'] = 'unknown'
+        self.df.to_csv(self.file_path, index=False)
+        data, log = self.read(usecols=['age', 'salary'])
+        self.assertIn('движок pandas', log)
+        self.assertEqual(list(data.columns), ['age', 'salary'])
+        self.assertEqual(data['salary'].iloc[-1], 'unknown')
+
+    def test_bad_date_value_does_not_fail_pyarrow_read(self):
+        self.df['hired'] = self.df['hired'].astype(object)
+        self.df.loc[len(self.df) - 1, 'hired'] = 'notadate'
+        self.df.to_csv(self.file_path, index=False)
+        with mock.patch('readers.read_csv_typed') as pandas_reader:
+            data, log = self.read()
+        pandas_reader.assert_not_called()
+        self.assertIn('движок pyarrow', log)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(data['hired']))
+        self.assertTrue(pd.isna(data['hired'].iloc[-1]))
+        self.assertEqual(data['hired'].notna().sum(), len(self.df) - 1)
+
+    def test_cancel_interrupts_pyarrow_read(self):
+        self.df.to_csv(self.file_path, index=False)
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(AnalysisCancelled):
+            readers.read_csv_arrow(self.file_path, sniff_csv(self.file_path), {}, {},
+                                   progress=Progress(None, cancel))
+
+    def test_short_file_is_loaded(self):
+        self.df.head(5).to_csv(self.file_path, index=False)
+        with redirect_stdout(io.StringIO()):
+            visualizer = UnifiedBrowserVisualizer(self.file_path, use_cache=False)
+        self.assertEqual(len(visualizer.data), 5)
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют выбор парсера CSV.
+
+Что тестируется:
+Файл читается многопоточным парсером pyarrow с разделителем, определенным по началу файла, и с типами из выборки.
+Файл без заголовка распознается заранее и разбирается один раз парсером pyarrow.
+Чисто текстовый файл всегда читается с заголовком; без заголовка считается только файл, у которого первая строка числовая там же, где и данные.
+Если pyarrow не смог разобрать файл, используется C-парсер pandas с откатом типов по столбцам.
+Отмена прерывает чтение pyarrow.
+Файлы короче 100 строк загружаются.
+Значение, не подошедшее к формату дат из выборки, становится NaT и не срывает чтение pyarrow.
+В журнал (logging) пишется использованный движок и скорость чтения.
+Зачем это нужно:
+Убедиться, что CSV читается быстрым парсером без повторного разбора и с теми же результатами, что и раньше.'''
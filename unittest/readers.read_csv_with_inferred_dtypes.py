@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from readers import read_csv_with_inferred_dtypes
+
+class TestTypedCsvReading(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'test.csv')
+        n = 3000
+        self.df = pd.DataFrame({
+            'age': np.arange(n) % 90,
+            'salary': np.linspace(1000.5, 9000.5, n),
+            'department': np.where(np.arange(n) % 2, 'IT', 'HR'),
+            'hired': pd.date_range('2020-01-01', periods=n, freq='h').strftime('%Y-%m-%d %H:%M:%S')
+        })
+
+    def test_dtypes_applied_at_parse_time(self):
+        self.df.to_csv(self.file_path, index=False)
+        data = read_csv_with_inferred_dtypes(self.file_path, chunksize=1000)
+        self.assertEqual(data['age'].dtype, np.uint8)
+        self.assertEqual(data['salary'].dtype, np.float32)
+        self.assertEqual(str(data['department'].dtype), 'category')
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(data['hired']))
+        self.assertEqual(data['age'].tolist(), self.df['age'].tolist())
+
+    def test_ints_outside_sample_range_are_not_wrapped(self):
+        self.df.loc[len(self.df) - 1, 'age'] = 100000
+        self.df.to_csv(self.file_path, index=False)
+        data = read_csv_with_inferred_dtypes(self.file_path, chunksize=1000)
+        self.assertEqual(data['age'].iloc[-1], 100000)
+
+    def test_fallback_when_sample_guess_fails(self):
+        self.df['salary'] = self.df['salary'].astype(object)
+        self.df.loc[len(self.df) - 1, 'salary'] = 'unknown'
+        self.df.to_csv(self.file_path, index=False)
+        data = read_csv_with_inferred_dtypes(self.file_path, chunksize=1000)
+        self.assertEqual(len(data), len(self.df))
+        self.assertEqual(data['salary'].iloc[-1], 'unknown')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют чтение CSV с типами, выбранными по выборке .
+
+Что тестируется:
+Передача category, float32 и дат в парсер и сужение целых по каждому блоку.
+Отсутствие переполнения, если значение вне диапазона выборки.
+Откат к типу по умолчанию для столбца, на котором догадка по выборке не сработала.
+Зачем это нужно:
+Убедиться, что пик памяти при загрузке близок к итоговому размеру и данные не искажаются.'''
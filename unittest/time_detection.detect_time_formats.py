@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+import pandas as pd
+from time_detection import detect_time_formats, to_datetime_column
+
+class TestTimeDetection(unittest.TestCase):
+    def setUp(self):
+        n = 2000
+        self.df = pd.DataFrame({
+            'created': pd.date_range('2021-01-01', periods=n, freq='h').astype(str),
+            'birthday': np.tile(pd.date_range('1990-01-01', periods=100, freq='D').strftime('%d.%m.%Y'), n // 100),
+            'salary': np.linspace(1000, 9000, n),
+            'department': np.where(np.arange(n) % 2, 'IT', 'HR'),
+            'version': np.where(np.arange(n) % 2, '1.25', '3.75'),
+            'id': np.arange(n).astype(str)
+        })
+
+    def test_only_time_columns_detected(self):
+        formats = detect_time_formats(self.df)
+        self.assertEqual(formats, {'created': 'ISO8601', 'birthday': '%d.%m.%Y'})
+
+    def test_category_conversion_uses_format(self):
+        birthday = self.df['birthday'].astype('category')
+        converted = to_datetime_column(birthday, '%d.%m.%Y')
+        self.assertEqual(converted.iloc[1], pd.Timestamp('1990-01-02'))
+        self.assertEqual(converted.notna().sum(), len(self.df))
+
+if __name__ == '__main__':
+    unittest.main()
+
+'''Эти тесты проверяют определение столбцов времени .
+
+Что тестируется:
+Распознавание столбцов с датами и их формата по небольшой выборке.
+Отсутствие ложных срабатываний на числовых, текстовых столбцах и идентификаторах.
+Преобразование категориального столбца в даты с известным форматом.
+Зачем это нужно:
+Убедиться, что временные ряды строятся только по настоящим датам, а определение не замедляет загрузку.'''